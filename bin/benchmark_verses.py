@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark verse resolution over every slot of each display mode.
+"""
+
+import sys
+import json
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+def main():
+    load_dotenv()
+    
+    parser = argparse.ArgumentParser(description='Measure verse lookups per second, resolution paths and allocations')
+    parser.add_argument('--impl', action='append', metavar='MODULE:CLASS',
+                        help='Implementation to benchmark; repeat to compare (default: verse_manager:VerseManager)')
+    parser.add_argument('--scenario', action='append', choices=['time-12h', 'time-24h', 'date', 'random'],
+                        help='Scenario to run; repeat for several (default: all)')
+    parser.add_argument('--api', choices=['off', 'mock'], default='off',
+                        help='Resolve with the network off or against the in-process mock API')
+    parser.add_argument('--year', type=int, help='Year for date mode and the day simulated (default: this year)')
+    parser.add_argument('--date-days', type=int, default=365, help='Days of date mode to resolve (default: 365)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed shared by every implementation')
+    parser.add_argument('--allocation-samples', type=int, default=200,
+                        help='Lookups per scenario traced for allocations (0 to skip)')
+    parser.add_argument('--json', metavar='FILE', help='Also write the full report as JSON')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    
+    from verse_benchmark import VerseBenchmark, format_report
+    
+    try:
+        benchmark = VerseBenchmark(
+            implementations=args.impl, scenarios=args.scenario, api=args.api,
+            start=date(args.year, 1, 1) if args.year else None, date_days=args.date_days,
+            seed=args.seed, allocation_samples=args.allocation_samples
+        )
+        report = benchmark.run()
+    except Exception as e:
+        print(f"✗ Benchmark failed: {e}")
+        return 1
+    
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    
+    # Non-zero exit if an implementation resolved different verses than the first
+    mismatched = [f"{spec} {name}" for spec, scenarios in report['implementations'].items()
+                  for name, result in scenarios.items() if not result['matches_baseline']]
+    if mismatched:
+        print("✗ Different verses than the baseline: " + ", ".join(mismatched))
+        return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
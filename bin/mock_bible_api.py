@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Serve a local stand-in for bible-api.com with configurable latency and faults.
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+def main():
+    parser = argparse.ArgumentParser(description='Local bible-api.com stand-in for tests and benchmarks')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--latency', default='0', help='Latency in ms, or fixed:MS, uniform:LOW,HIGH, '
+                        'normal:MEAN,STDDEV, lognormal:MEDIAN,SIGMA or exponential:MEAN')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503, help='Status code of injected errors')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests never answered')
+    parser.add_argument('--hang-seconds', type=float, default=60.0, help='How long unanswered requests are held')
+    parser.add_argument('--slow-body-rate', type=float, default=0.0, help='Fraction of responses sent slowly')
+    parser.add_argument('--slow-body-seconds', type=float, default=5.0, help='Time taken to send a slow body')
+    parser.add_argument('--fixtures', help='JSON file of {translation: {"Book ch:v": text}} overrides')
+    parser.add_argument('--seed', type=int, help='Seed for latency and fault injection')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    from mock_bible_api import MockBibleAPI, MockBibleAPIServer
+    
+    try:
+        api = MockBibleAPI(latency=args.latency, failure_rate=args.error_rate, seed=args.seed,
+                           fixtures=args.fixtures, error_status=args.error_status, timeout_rate=args.timeout_rate,
+                           slow_body_rate=args.slow_body_rate, slow_body_seconds=args.slow_body_seconds)
+        server = MockBibleAPIServer(api, host=args.host, port=args.port, hang_seconds=args.hang_seconds)
+    except (ValueError, OSError) as e:
+        print(f"✗ Could not start mock Bible API: {e}")
+        return 1
+    
+    print(f"Set BIBLE_API_URL={server.url} to use this server")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
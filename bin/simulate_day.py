@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Drive Bible Clock through simulated days against the panel emulator and a mock Bible API.
+"""
+
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+def main():
+    load_dotenv()
+    
+    parser = argparse.ArgumentParser(description='Simulate Bible Clock days as fast as possible')
+    parser.add_argument('--days', type=float, default=1.0, help='Simulated days to run (default: 1)')
+    parser.add_argument('--minutes', type=int, help='Simulated minutes to run (overrides --days)')
+    parser.add_argument('--start', help='Start time, ISO format (default: today 00:00)')
+    parser.add_argument('--mode', choices=['time', 'date', 'random'], help='Display mode')
+    parser.add_argument('--api-latency', default='0', help='Mock API latency in ms, or a distribution '
+                        'such as uniform:20,200 or lognormal:80,0.6')
+    parser.add_argument('--api-failure-rate', type=float, default=0.0, help='Fraction of mock API requests that fail')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for injected failures')
+    parser.add_argument('--offline', action='store_true', help='Resolve verses from local data only')
+    parser.add_argument('--json', metavar='FILE', help='Also write the full report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Show service logging')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    from day_simulation import DaySimulation, format_report
+    from mock_bible_api import MockBibleAPI
+    
+    start = datetime.fromisoformat(args.start) if args.start else datetime.now().replace(hour=0, minute=0)
+    minutes = args.minutes or int(args.days * 1440)
+    
+    try:
+        api = MockBibleAPI(latency=args.api_latency, failure_rate=args.api_failure_rate, seed=args.seed)
+        simulation = DaySimulation(start, minutes, api=api, offline=args.offline, mode=args.mode)
+        report = simulation.run()
+    except Exception as e:
+        print(f"✗ Simulation failed: {e}")
+        return 1
+    
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
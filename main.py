@@ -49,6 +49,38 @@ def load_environment():
                     key, value = line.split('=', 1)
                     os.environ[key] = value
 
+def request_profile(seconds: float, output: str = None) -> bool:
+    """Ask the running service to profile itself and save the collapsed stacks."""
+    import requests
+    
+    port = os.getenv('WEB_PORT', '5000')
+    token = os.getenv('ADMIN_TOKEN', '')
+    if not token:
+        print("ADMIN_TOKEN must be set (in .env or the environment) to profile the running service")
+        return False
+    
+    try:
+        response = requests.post(
+            f"http://127.0.0.1:{port}/api/admin/profile",
+            params={'seconds': seconds},
+            headers={'Authorization': f'Bearer {token}'},
+            timeout=seconds + 30
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"Could not reach the running service on port {port}: {e}")
+        return False
+    
+    if response.status_code != 200:
+        print(f"Profiling failed ({response.status_code}): {response.text.strip()}")
+        return False
+    
+    output = output or f"bible-clock-profile-{int(seconds)}s.collapsed"
+    with open(output, 'w') as f:
+        f.write(response.text)
+    print(f"Wrote {response.headers.get('X-Profile-Samples', '?')} samples to {output}")
+    print(f"Render with: flamegraph.pl {output} > profile.svg (or open it in speedscope.app)")
+    return True
+
 def validate_environment():
     """Validate required directories and environment setup."""
     required_dirs = [
@@ -114,6 +146,7 @@ Examples:
   python main.py --web-only         # Run only web interface
   python main.py --disable-voice    # Run without voice control
   python main.py --debug            # Run with debug logging
+  python main.py --emulate          # Benchmark against the IT8951 emulator
   python main.py --log-file app.log # Log to file
         """
     )
@@ -139,9 +172,17 @@ Examples:
                         help='Run in simulation mode (save to file instead of e-ink)')
     parser.add_argument('--hardware', action='store_true',
                         help='Force hardware mode (use e-ink display)')
+    parser.add_argument('--emulate', action='store_true',
+                        help='Use the IT8951 software emulator instead of the e-ink display')
     parser.add_argument('--config', type=str,
                         help='Path to configuration file')
     
+    # Diagnostics
+    parser.add_argument('--profile', type=float, metavar='SECONDS',
+                        help='Profile the already running service for SECONDS and exit')
+    parser.add_argument('--profile-output', type=str, metavar='FILE',
+                        help='Where to write the collapsed stacks from --profile')
+    
     args = parser.parse_args()
     
     # Set up logging
@@ -154,12 +195,18 @@ Examples:
     # Load environment configuration
     load_environment()
     
+    if args.profile:
+        sys.exit(0 if request_profile(args.profile, args.profile_output) else 1)
+    
     # Set environment variables based on arguments
     if args.simulation:
         os.environ['SIMULATION_MODE'] = 'true'
     elif args.hardware:
         os.environ['SIMULATION_MODE'] = 'false'
     
+    if args.emulate:
+        os.environ['DISPLAY_EMULATION'] = 'true'
+    
     if args.web_only:
         os.environ['WEB_ONLY'] = 'true'
         # Disable display updates in web-only mode
@@ -176,6 +223,7 @@ Examples:
         # Display startup information
         logger.info("Bible Clock v2.0.0")
         logger.info(f"Simulation mode: {os.getenv('SIMULATION_MODE', 'false')}")
+        logger.info(f"Display emulation: {os.getenv('DISPLAY_EMULATION', 'false')}")
         logger.info(f"Web interface: {'disabled' if args.disable_web else 'enabled'}")
         logger.info(f"Voice control: {'disabled' if args.disable_voice else 'auto'}")
         
@@ -14,6 +14,9 @@ from pathlib import Path
 from typing import Optional, Callable, Dict, Any, List
 import openai
 
+from stall_watchdog import stall_watchdog
+from current_state import current_state
+
 class ChatGPTPiperVoiceControl:
     def __init__(self, verse_manager, image_generator, display_manager):
         self.logger = logging.getLogger(__name__)
@@ -184,12 +187,13 @@ class ChatGPTPiperVoiceControl:
                 {"role": "user", "content": question}
             ]
             
-            response = openai.ChatCompletion.create(
-                model=self.chatgpt_model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
-            )
+            with stall_watchdog.watch('chatgpt', 60):
+                response = openai.ChatCompletion.create(
+                    model=self.chatgpt_model,
+                    messages=messages,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature
+                )
             
             answer = response.choices[0].message.content.strip()
             self.logger.info(f"ChatGPT response: {answer[:100]}...")
@@ -211,11 +215,11 @@ class ChatGPTPiperVoiceControl:
         self.listening = True
         
         # Start listening thread
-        self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.listen_thread = threading.Thread(target=self._listen_loop, name='voice-listen', daemon=True)
         self.listen_thread.start()
         
         # Start command processing thread
-        self.command_thread = threading.Thread(target=self._command_processing_loop, daemon=True)
+        self.command_thread = threading.Thread(target=self._command_processing_loop, name='voice-commands', daemon=True)
         self.command_thread.start()
         
         # Welcome message
@@ -319,7 +323,7 @@ class ChatGPTPiperVoiceControl:
                 response = f"Previous verse: {current_verse.get('reference', '')} - {current_verse.get('text', '')}"
                 
             elif 'current verse' in command_text or 'read verse' in command_text:
-                current_verse = self.verse_manager.get_current_verse()
+                current_verse = current_state.verse_data(self.verse_manager)
                 if current_verse:
                     response = f"{current_verse.get('reference', '')}: {current_verse.get('text', '')}"
                 else:
@@ -0,0 +1,63 @@
+"""
+Injectable wall-clock source, so the service can be driven through simulated days.
+"""
+
+import time as _time
+import threading
+from datetime import datetime, timedelta
+from typing import Union
+
+class SystemClock:
+    """The real wall clock."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def time(self) -> float:
+        return _time.time()
+
+class SimulatedClock:
+    """A clock that stands still until it is moved.
+
+    Used for time-travel runs: install it with use(), then set() or
+    advance() it between steps. Monotonic timing (budgets, latencies)
+    keeps using the real clock, so measurements stay real.
+    """
+
+    def __init__(self, start: datetime):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def time(self) -> float:
+        return self.now().timestamp()
+
+    def set(self, when: datetime):
+        with self._lock:
+            self._now = when
+
+    def advance(self, delta: Union[timedelta, float]):
+        """Move forward by a timedelta or a number of seconds."""
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        with self._lock:
+            self._now += delta
+
+_source = SystemClock()
+
+def now() -> datetime:
+    """Current local time from the installed clock (datetime.now() by default)."""
+    return _source.now()
+
+def time() -> float:
+    """Current epoch seconds from the installed clock (time.time() by default)."""
+    return _source.time()
+
+def use(source) -> object:
+    """Install a clock for every component and return the previous one."""
+    global _source
+    previous, _source = _source, source
+    return previous
@@ -83,8 +83,9 @@ class ConfigValidator:
     def _validate_hardware_config(self):
         """Validate hardware configuration."""
         simulation_mode = os.getenv('SIMULATION_MODE', 'false').lower() == 'true'
+        emulation_mode = os.getenv('DISPLAY_EMULATION', 'false').lower() == 'true'
         
-        if not simulation_mode:
+        if not simulation_mode and not emulation_mode:
             # Check for hardware libraries
             try:
                 import RPi.GPIO
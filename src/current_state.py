@@ -0,0 +1,103 @@
+"""
+Immutable snapshot of what the panel is showing, for read-only consumers.
+"""
+
+import copy
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+import clock
+from event_bus import event_bus
+
+@dataclass(frozen=True)
+class FrameSnapshot:
+    """One committed frame: the verse on the panel and when it got there."""
+    frame_id: int
+    verse: Mapping[str, Any]  # Read-only view of the verse data
+    content_key: Optional[Tuple]
+    mode: Optional[str]
+    rendered_at: datetime
+    committed_at: datetime
+    
+    def verse_data(self) -> Dict[str, Any]:
+        """Copy of the verse data that the caller may modify."""
+        return dict(self.verse)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'frame_id': self.frame_id,
+            'mode': self.mode,
+            'rendered_at': self.rendered_at.isoformat(),
+            'committed_at': self.committed_at.isoformat()
+        }
+
+class CurrentState:
+    """Publishes a new FrameSnapshot each time a frame is committed to the panel.
+    
+    The web interface and voice commands that only need to know what is on
+    screen read the snapshot instead of calling get_current_verse(), which
+    resolves the verse again (possibly from the API) and counts it in the
+    display statistics. Snapshots are never modified after publishing, so
+    readers take no lock; publish() swaps in a new one.
+    
+    Minutes that only redraw the clock text publish a snapshot too; minutes
+    where nothing on the panel changes keep the previous one. Each snapshot
+    is also pushed to the dashboard as a 'verse' event.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()  # Serialises publishers only
+        self.snapshot = None
+        self.frames = 0
+    
+    def publish(self, verse_data: Dict[str, Any], content_key: Optional[Tuple] = None,
+                mode: Optional[str] = None, rendered_at: Optional[datetime] = None) -> FrameSnapshot:
+        """Record a committed frame and return its snapshot."""
+        committed_at = clock.now()
+        with self.lock:
+            self.frames += 1
+            snapshot = FrameSnapshot(
+                frame_id=self.frames,
+                verse=MappingProxyType(copy.deepcopy(verse_data)),
+                content_key=content_key,
+                mode=mode,
+                rendered_at=rendered_at or committed_at,
+                committed_at=committed_at
+            )
+            self.snapshot = snapshot
+        self.logger.debug(f"Frame {snapshot.frame_id} published: {verse_data.get('reference')}")
+        event_bus.publish('verse', {**snapshot.verse, 'frame': snapshot.to_dict()})
+        return snapshot
+    
+    def get(self) -> Optional[FrameSnapshot]:
+        """Latest snapshot, or None before the first frame is committed."""
+        return self.snapshot
+    
+    def verse_data(self, verse_manager=None) -> Dict[str, Any]:
+        """Copy of the verse on the panel.
+        
+        Before any frame is committed (or in web-only mode) the verse is
+        resolved from local data through verse_manager, without counting
+        it in the display statistics.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot.verse_data()
+        if verse_manager is None:
+            return {}
+        return verse_manager.get_current_verse(offline=True, record=False)
+    
+    def get_status(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            'frames_published': self.frames,
+            'current': snapshot.to_dict() if snapshot else None
+        }
+
+# Global snapshot shared by the service, web interface and voice control
+current_state = CurrentState()
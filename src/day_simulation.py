@@ -0,0 +1,241 @@
+"""
+Time-travel runner that drives the full verse, render and display pipeline through simulated days.
+"""
+
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import clock
+from mock_bible_api import MockBibleAPI, MockBibleAPIAdapter
+from performance_monitor import performance_monitor, OPERATIONS
+from timeseries_store import timeseries_store
+
+# Pipeline and panel stages reported by a simulation
+SIMULATED_STAGES = tuple(name for name in OPERATIONS if not name.startswith('voice_'))
+
+# Settings a simulation needs even without a .env file
+SIMULATION_DEFAULTS = {
+    'DISPLAY_WIDTH': '1872',
+    'DISPLAY_HEIGHT': '1404',
+    'BIBLE_API_URL': 'https://bible-api.com'
+}
+
+# Periodic service jobs replayed during a simulation: (name, every N simulated minutes)
+PERIODIC_JOBS = (
+    ('force_refresh', 60),
+    ('cycle_background', 240)
+)
+
+class DaySimulation:
+    """Runs the service's minute loop against a simulated clock as fast as it will go.
+    
+    Each minute is driven the way the scheduler would: resolve() at the
+    resolve lead and render() at the render lead before every boundary
+    whose verse changes, then the minute tick itself, with quiet hours,
+    hourly full refreshes and background cycling replayed on time. The
+    panel is the IT8951 emulator and the Bible API is a MockBibleAPI
+    mounted in-process, so nothing touches hardware or the network.
+    
+    Only wall-clock time is simulated: stage budgets and latencies use the
+    real monotonic clock, so the reported distributions are real costs.
+    """
+    
+    def __init__(self, start: datetime, minutes: int = 1440, api: Optional[MockBibleAPI] = None,
+                 offline: bool = False, mode: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.start = start.replace(second=0, microsecond=0)
+        self.minutes = minutes
+        self.api = api or MockBibleAPI()
+        self.offline = offline
+        self.mode = mode
+        
+        self.clock = clock.SimulatedClock(self.start)
+        self.service = None
+        self.slots = []  # Minutes that fell back or failed
+        self.ticks = {'full': 0, 'clock': 0, 'quiet': 0}
+    
+    def setup(self):
+        """Build the service with the emulator, the mock API and the simulated clock."""
+        for name, value in SIMULATION_DEFAULTS.items():
+            os.environ.setdefault(name, value)
+        os.environ['DISPLAY_EMULATION'] = 'true'
+        os.environ['SIMULATION_MODE'] = 'false'
+        timeseries_store.enabled = False  # Simulated samples would land in the real archives
+        clock.use(self.clock)
+        
+        from verse_manager import VerseManager
+        from image_generator import ImageGenerator
+        from display_manager import DisplayManager
+        from service_manager import ServiceManager
+        
+        verse_manager = VerseManager()
+        if self.offline:
+            verse_manager.api_url = ''
+        elif verse_manager.api_url:
+            verse_manager.session.mount(verse_manager.api_url, MockBibleAPIAdapter(self.api))
+        if self.mode:
+            verse_manager.set_display_mode(self.mode)
+        
+        self.service = ServiceManager(verse_manager, ImageGenerator(), DisplayManager())
+    
+    def run(self) -> Dict[str, Any]:
+        """Simulate every minute from start and return the report."""
+        if self.service is None:
+            self.setup()
+        service = self.service
+        pipeline = service.render_pipeline
+        verse_manager = service.verse_manager
+        counters_before = performance_monitor.get_counters()
+        started = time.perf_counter()
+        
+        try:
+            if service.quiet_hours.is_quiet(self.start):
+                service._enter_quiet_hours()
+            else:
+                service._update_verse()
+            
+            next_change = verse_manager.get_next_content_change(self.start)
+            for minute in range(1, self.minutes + 1):
+                boundary = self.start + timedelta(minutes=minute)
+                
+                if service.quiet_hours.is_quiet(boundary):
+                    self.clock.set(boundary)
+                    service._enter_quiet_hours()
+                    self.ticks['quiet'] += 1
+                    next_change = verse_manager.get_next_content_change(boundary)
+                    continue
+                if service.quiet_active:
+                    self.clock.set(boundary)
+                    service._exit_quiet_hours()
+                    next_change = verse_manager.get_next_content_change(boundary)
+                    continue
+                
+                if boundary >= next_change:
+                    self.clock.set(boundary - timedelta(seconds=pipeline.resolve_lead))
+                    pipeline.resolve(boundary)
+                    self.clock.set(boundary - timedelta(seconds=pipeline.render_lead))
+                    pipeline.render(boundary)
+                    next_change = verse_manager.get_next_content_change(boundary)
+                
+                self.clock.set(boundary)
+                self._tick(boundary)
+                self._run_periodic_jobs(minute)
+        finally:
+            pipeline.shutdown()
+        
+        return self.get_report(time.perf_counter() - started, counters_before)
+    
+    def _tick(self, boundary: datetime):
+        """One minute boundary, noting whether it fell back or failed."""
+        pipeline = self.service.render_pipeline
+        full = pipeline.needs_full_update(boundary)
+        before = self._slot_counts()
+        
+        self.service._update_verse(boundary)
+        
+        after = self._slot_counts()
+        self.ticks['full' if full else 'clock'] += 1
+        issues = [name for name in after if after[name] > before[name]]
+        if issues:
+            self.slots.append({
+                'time': boundary.isoformat(),
+                'kind': 'full' if full else 'clock',
+                'failed': 'update_errors' in issues,
+                'issues': issues
+            })
+    
+    def _slot_counts(self) -> Dict[str, int]:
+        pipeline = self.service.render_pipeline
+        counters = performance_monitor.get_counters()
+        counts = {
+            'fallback_frames': pipeline.fallback_frames,
+            'api_failures': counters['api_failures'],
+            'verses_from_fallback': counters['verses_from_fallback'],
+            'update_errors': self.service.error_count
+        }
+        for stage, stats in pipeline.stats.items():
+            counts[f'{stage}_misses'] = stats['misses']
+            counts[f'{stage}_failures'] = stats['failures']
+        return counts
+    
+    def _run_periodic_jobs(self, minute: int):
+        if self.service.quiet_active:
+            return
+        for name, every in PERIODIC_JOBS:
+            if minute % every == 0:
+                getattr(self.service, f'_{name}')()
+    
+    def get_report(self, elapsed: float, counters_before: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Throughput, per-stage latency distributions and the slots that fell back or failed."""
+        counters_before = counters_before or {}
+        histograms = performance_monitor.get_histograms()
+        stages = {}
+        for name in SIMULATED_STAGES:
+            histogram = histograms.get(name)
+            if histogram is None or not histogram.count:
+                continue
+            summary = histogram.get_summary()
+            stages[name] = {
+                'count': summary['count'],
+                'p50_ms': round(summary['p50'] * 1000, 2),
+                'p95_ms': round(summary['p95'] * 1000, 2),
+                'p99_ms': round(summary['p99'] * 1000, 2),
+                'max_ms': round(summary['max'] * 1000, 2)
+            }
+        
+        pipeline = self.service.render_pipeline
+        counters = performance_monitor.get_counters()
+        return {
+            'start': self.start.isoformat(),
+            'end': (self.start + timedelta(minutes=self.minutes)).isoformat(),
+            'simulated_minutes': self.minutes,
+            'wall_seconds': round(elapsed, 2),
+            'minutes_per_second': round(self.minutes / elapsed, 1) if elapsed else None,
+            'ticks': dict(self.ticks),
+            'stages': stages,
+            'pipeline': {
+                'fallback_frames': pipeline.fallback_frames,
+                'skipped_renders': pipeline.render_skips,
+                'stages': {stage: dict(stats) for stage, stats in pipeline.stats.items()}
+            },
+            'counters': {name: value - counters_before.get(name, 0) for name, value in counters.items()
+                         if value - counters_before.get(name, 0)},
+            'mock_api': None if self.offline else self.api.get_stats(),
+            'panel': self.service.display_manager.get_emulator_stats(),
+            'problem_slots': self.slots
+        }
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text summary of a simulation report."""
+    lines = [
+        f"Simulated {report['start']} to {report['end']} ({report['simulated_minutes']} minutes)",
+        f"Wall time {report['wall_seconds']}s, {report['minutes_per_second']} simulated minutes/s",
+        "Ticks: " + ", ".join(f"{kind} {count}" for kind, count in report['ticks'].items()),
+        "",
+        f"{'stage':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    ]
+    for name, stage in report['stages'].items():
+        lines.append(f"{name:<18}{stage['count']:>7}{stage['p50_ms']:>10.2f}{stage['p95_ms']:>10.2f}"
+                     f"{stage['p99_ms']:>10.2f}{stage['max_ms']:>10.2f}")
+    
+    lines.append("")
+    lines.append(f"Fallback frames: {report['pipeline']['fallback_frames']}, "
+                 f"skipped renders: {report['pipeline']['skipped_renders']}")
+    if report['mock_api']:
+        lines.append("Mock API: " + ", ".join(f"{key} {value}" for key, value in report['mock_api'].items()))
+    panel = report['panel']
+    if panel:
+        lines.append(f"Panel: {panel['updates']} updates ({panel['full_updates']} full), "
+                     f"{panel['panel_time']:.1f}s modelled panel time")
+    
+    slots: List[Dict[str, Any]] = report['problem_slots']
+    lines.append(f"Slots that fell back or failed: {len(slots)}")
+    for slot in slots[:20]:
+        status = 'FAILED' if slot['failed'] else 'fallback'
+        lines.append(f"  {slot['time']} {slot['kind']:<5} {status}: {', '.join(slot['issues'])}")
+    if len(slots) > 20:
+        lines.append(f"  ... and {len(slots) - 20} more")
+    return "\n".join(lines)
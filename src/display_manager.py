@@ -4,18 +4,24 @@ Manages e-ink display output and simulation.
 
 import os
 import logging
-import psutil
 from PIL import Image, ImageDraw, ImageFont
-from typing import Optional
+from typing import Any, Optional, Tuple
 import time
 import threading
+from contextlib import contextmanager
 
 from display_constants import DisplayModes
+import clock
+from performance_monitor import span
+from system_metrics import system_metrics
+from memory_diagnostics import memory_diagnostics
+from stall_watchdog import stall_watchdog
 
 class DisplayManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.simulation_mode = os.getenv('SIMULATION_MODE', 'false').lower() == 'true'
+        self.emulation_mode = os.getenv('DISPLAY_EMULATION', 'false').lower() == 'true'
         self.width = int(os.getenv('DISPLAY_WIDTH', '1872'))
         self.height = int(os.getenv('DISPLAY_HEIGHT', '1404'))
         self.rotation = int(os.getenv('DISPLAY_ROTATION', '0'))
@@ -23,10 +29,34 @@ class DisplayManager:
         self.force_refresh_interval = int(os.getenv('FORCE_REFRESH_INTERVAL', '60'))
         
         self.last_image_hash = None
-        self.last_full_refresh = time.time()
+        self.last_full_refresh = clock.time()
         self.display_device = None
+        self.simulation_sink = None
+        self.display_lock = threading.RLock()
         
-        if not self.simulation_mode:
+        # Content frame currently on the panel, without any status badge
+        self.current_frame = None
+        self.current_content_key = None
+        self.current_clock_layout = None  # ImageGenerator.ClockLayout of current_frame
+        self.panel_sleeping = False
+        self.skip_counts = {'content_key': 0, 'hash': 0}  # Updates avoided, by detection method
+        
+        # Status badge layer for voice feedback
+        self.badge_box = (16, 16, 16 + 576, 16 + 112)  # left, top, right, bottom (4-pixel aligned)
+        self.badge_debounce = float(os.getenv('STATUS_BADGE_DEBOUNCE', '0.3'))
+        self.badge_refresh_mode = getattr(DisplayModes, os.getenv('STATUS_BADGE_MODE', 'DU').upper(), DisplayModes.DU)
+        self.badge_lock = threading.Lock()
+        self.active_badge = None
+        self.pending_badge = None
+        self.badge_sequence = 0
+        self.badge_timer = None
+        self.badge_expiry_timer = None
+        self.last_badge_refresh = 0.0
+        self.badge_font = None
+        
+        if self.emulation_mode:
+            self._initialize_emulator()
+        elif not self.simulation_mode:
             self._initialize_hardware()
     
     def _initialize_hardware(self):
@@ -50,45 +80,127 @@ class DisplayManager:
             self.logger.error(f"Display initialization failed: {e}")
             self.simulation_mode = True
     
-    def display_image(self, image: Image.Image, force_refresh: bool = False):
-        """Display image on e-ink screen or save for simulation."""
+    def _initialize_emulator(self):
+        """Initialize the software IT8951 emulator in place of the panel."""
+        from it8951_emulator import EmulatedEPDDisplay
+        
+        self.display_device = EmulatedEPDDisplay(
+            vcom=self.vcom_voltage,
+            rotate=self.rotation,
+            spi_hz=int(os.getenv('EMULATOR_SPI_HZ', '24000000')),
+            width=self.width,
+            height=self.height,
+            realtime=os.getenv('EMULATOR_REALTIME', 'false').lower() == 'true'
+        )
+        # Updates go through the hardware path so panel timing is modelled
+        self.simulation_mode = False
+        self.logger.info("Using IT8951 emulator instead of e-ink hardware")
+    
+    def display_image(self, image: Image.Image, force_refresh: bool = False, content_key=None, clock_layout=None):
+        """Display image on e-ink screen or save for simulation.
+        
+        Callers that know what the image shows can pass a content_key (see
+        ImageGenerator.get_content_key); it replaces the full-frame hash for
+        change detection. clock_layout, returned with the image by
+        ImageGenerator.create_verse_frame, is kept with the frame so the next
+        minute can redraw only the clock text.
+        """
         try:
+            if content_key is not None and not force_refresh and self.is_showing(content_key) \
+                    and not self._should_force_refresh():
+                self.skip_counts['content_key'] += 1
+                self.logger.debug("Content unchanged, skipping update")
+                return
+            
             # Resize image to display dimensions
             if image.size != (self.width, self.height):
                 image = image.resize((self.width, self.height), Image.Resampling.LANCZOS)
+                clock_layout = None
             
             # Convert to grayscale for e-ink
             if image.mode != 'L':
                 image = image.convert('L')
             
-            # Check if image has changed
-            image_hash = hash(image.tobytes())
+            # Check if image has changed (a differing content key already says it has)
+            image_hash = hash(image.tobytes()) if content_key is None else None
             needs_update = (
                 force_refresh or 
+                content_key is not None or
                 image_hash != self.last_image_hash or
                 self._should_force_refresh()
             )
             
             if not needs_update:
+                self.skip_counts['hash'] += 1
                 self.logger.debug("Image unchanged, skipping update")
                 return
             
-            if self.simulation_mode:
-                self._simulate_display(image)
-            else:
-                self._display_on_hardware(image, force_refresh)
+            with self.display_lock, stall_watchdog.watch('panel'):
+                self.current_frame = image
+                self.current_clock_layout = clock_layout
+                frame = self._compose_badge(image, self.active_badge) if self.active_badge else image
+                
+                if self.simulation_mode:
+                    self._simulate_display(frame)
+                else:
+                    with self._panel_awake():
+                        self._display_on_hardware(frame, force_refresh)
             
             self.last_image_hash = image_hash
+            self.current_content_key = content_key
             self._check_memory_usage()
             
         except Exception as e:
             self.logger.error(f"Display update failed: {e}")
     
+    def get_current_frame(self) -> Tuple[Optional[Image.Image], Any]:
+        """The content frame on the panel and its clock layout, read together."""
+        with self.display_lock:
+            return self.current_frame, self.current_clock_layout
+    
+    def is_showing(self, content_key) -> bool:
+        """Whether the panel already shows the frame for this content key."""
+        return content_key is not None and content_key == self.current_content_key
+    
     def _simulate_display(self, image: Image.Image):
-        """Simulate display by saving image to file."""
-        simulation_path = 'current_display.png'
-        image.save(simulation_path)
-        self.logger.info(f"Display simulated - image saved to {simulation_path}")
+        """Simulate display by writing the frame to the configured sink."""
+        if self.simulation_sink is None:
+            self.simulation_sink = self._create_simulation_sink()
+        
+        with span('panel_transfer'):
+            self.simulation_sink.write(image)
+        self.logger.debug(f"Display simulated - frame written to {self.simulation_sink.name} sink")
+    
+    def _create_simulation_sink(self):
+        """Create the simulation output sink from SIMULATION_SINK."""
+        from simulation_sinks import create_sink, MemoryRingSink
+        
+        kind = os.getenv('SIMULATION_SINK', 'memory')
+        try:
+            sink = create_sink(kind, self.width, self.height)
+        except Exception as e:
+            self.logger.error(f"Simulation sink '{kind}' unavailable ({e}), using memory sink")
+            sink = MemoryRingSink()
+        
+        self.logger.info(f"Simulation output: {sink.name} sink")
+        return sink
+    
+    def get_latest_frame(self) -> Optional[Image.Image]:
+        """Get the most recent simulated frame, if the sink keeps one."""
+        if self.simulation_sink is None:
+            return None
+        return self.simulation_sink.get_latest_frame()
+    
+    def close(self):
+        """Release display resources."""
+        with self.badge_lock:
+            for timer in (self.badge_timer, self.badge_expiry_timer):
+                if timer is not None:
+                    timer.cancel()
+        
+        if self.simulation_sink is not None:
+            self.simulation_sink.close()
+            self.simulation_sink = None
     
     def _display_on_hardware(self, image: Image.Image, force_refresh: bool):
         """Display image on actual e-ink hardware."""
@@ -97,30 +209,73 @@ class DisplayManager:
         
         # Use our local display constants instead of IT8951 constants
         # Determine refresh mode
+        with span('panel_transfer'):
+            self.display_device.frame_buf.paste(image, (0, 0))
+        
         if force_refresh or self._should_force_refresh():
             # Full refresh for better quality
-            self.display_device.frame_buf.paste(image, (0, 0))
-            self.display_device.draw_full(DisplayModes.GC16)
-            self.last_full_refresh = time.time()
+            with span('panel_refresh'):
+                self.display_device.draw_full(DisplayModes.GC16)
+            self.last_full_refresh = clock.time()
             self.logger.debug("Full display refresh")
         else:
             # Fast partial refresh
-            self.display_device.frame_buf.paste(image, (0, 0))
-            self.display_device.draw_partial(DisplayModes.DU)
+            with span('panel_refresh'):
+                self.display_device.draw_partial(DisplayModes.DU)
             self.logger.debug("Partial display refresh")
     
+    def sleep(self):
+        """Put the panel into low-power sleep; it keeps showing the last frame."""
+        with self.display_lock:
+            if self.panel_sleeping:
+                return
+            self._set_panel_power('sleep')
+            self.panel_sleeping = True
+            self.logger.info("Display panel sleeping")
+    
+    def wake(self):
+        """Bring the panel out of sleep."""
+        with self.display_lock:
+            if not self.panel_sleeping:
+                return
+            self._set_panel_power('run')
+            self.panel_sleeping = False
+            self.logger.info("Display panel awake")
+    
+    @contextmanager
+    def _panel_awake(self):
+        """Wake a sleeping panel for one update and put it back to sleep (caller holds display_lock)."""
+        if not self.panel_sleeping:
+            yield
+            return
+        
+        self._set_panel_power('run')
+        try:
+            yield
+        finally:
+            self._set_panel_power('sleep')
+    
+    def _set_panel_power(self, state: str):
+        """Switch the IT8951 controller power state ('run', 'standby' or 'sleep')."""
+        epd = getattr(self.display_device, 'epd', None)
+        if self.simulation_mode or epd is None:
+            return
+        try:
+            getattr(epd, state)()
+        except Exception as e:
+            self.logger.error(f"Failed to set panel power state '{state}': {e}")
+    
     def _should_force_refresh(self) -> bool:
         """Check if a full refresh is needed based on time interval."""
-        return (time.time() - self.last_full_refresh) > (self.force_refresh_interval * 60)
+        return (clock.time() - self.last_full_refresh) > (self.force_refresh_interval * 60)
     
     def _check_memory_usage(self):
         """Monitor memory usage and trigger garbage collection if needed."""
-        memory_percent = psutil.virtual_memory().percent
+        memory_percent = system_metrics.latest().memory_percent
         threshold = int(os.getenv('MEMORY_THRESHOLD', '80'))
         
         if memory_percent > threshold:
-            import gc
-            gc.collect()
+            memory_diagnostics.collect_garbage('display_threshold')
             self.logger.warning(f"High memory usage ({memory_percent}%), garbage collection triggered")
     
     def clear_display(self):
@@ -128,72 +283,136 @@ class DisplayManager:
         white_image = Image.new('L', (self.width, self.height), 255)
         self.display_image(white_image, force_refresh=True)
     
+    STATUS_MESSAGES = {
+        "wake_detected": "🎤 Listening...",
+        "listening": "🎤 Listening...",
+        "recording": "🎙️ Recording...",
+        "processing": "💭 Processing...",
+        "thinking": "🤔 Thinking...",
+        "speaking": "🔊 Speaking...",
+        "ready": "✅ Ready",
+        "error": "❌ Error",
+        "interrupted": "⏸️ Interrupted"
+    }
+    
+    # States whose badge is removed again after the message duration
+    TRANSIENT_STATES = ("wake_detected", "listening", "recording", "ready")
+    
     def show_transient_message(self, state: str, message: str = None, duration: float = 2.0):
-        """Show a temporary message overlay on the display."""
+        """Show a voice status badge over the current frame.
+        
+        The badge occupies a small fixed region and is refreshed with a fast
+        partial waveform, so the verse stays on screen. Rapid state changes
+        are coalesced to at most one refresh per debounce interval, and
+        transient badges restore the region underneath when they expire.
+        """
         try:
-            # Map voice states to display messages
-            display_messages = {
-                "wake_detected": "🎤 Listening...",
-                "listening": "🎤 Listening...",
-                "recording": "🎙️ Recording...",
-                "processing": "💭 Processing...",
-                "thinking": "🤔 Thinking...",
-                "speaking": "🔊 Speaking...",
-                "ready": "✅ Ready",
-                "error": "❌ Error",
-                "interrupted": "⏸️ Interrupted"
-            }
-            
-            # Get display text
-            display_text = display_messages.get(state, message or state)
-            
-            # Create a simple overlay image
-            overlay = Image.new('L', (self.width, self.height), 255)  # white background
-            draw = ImageDraw.Draw(overlay)
-            
-            # Use a simple font for the message
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48)
-            except:
-                try:
-                    font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 48)
-                except:
-                    font = ImageFont.load_default()
-            
-            # Calculate text size and position
-            text_bbox = draw.textbbox((0, 0), display_text, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
+            display_text = self.STATUS_MESSAGES.get(state, message or state)
+            expires = duration if state in self.TRANSIENT_STATES else None
             
-            # Position in top-left corner with padding
-            x, y = 30, 30
-            
-            # Draw white rectangle background with black border
-            draw.rectangle((x - 15, y - 15, x + text_width + 30, y + text_height + 30), 
-                          fill=255, outline=0, width=4)
-            
-            # Draw black text
-            draw.text((x, y), display_text, font=font, fill=0)
-            
-            # Display the overlay
-            self.display_image(overlay, force_refresh=True)
+            with self.badge_lock:
+                self.pending_badge = (state, display_text, expires)
+                if self.badge_timer is not None:
+                    self.badge_timer.cancel()
+                
+                delay = max(0.0, self.badge_debounce - (time.monotonic() - self.last_badge_refresh))
+                self.badge_timer = threading.Timer(delay, self._apply_pending_badge)
+                self.badge_timer.name = 'display-badge'
+                self.badge_timer.daemon = True
+                self.badge_timer.start()
             
             self.logger.info(f"Showing visual feedback: {state} -> {display_text}")
             
-            # Start a timer to restore normal display (only for certain states)
-            if state in ["wake_detected", "listening", "recording", "ready"]:
-                def restore_display():
-                    time.sleep(duration)
-                    # Force a display update to clear the message
-                    # The next scheduled update will restore normal content
-                    self.logger.info("Visual feedback expired")
-                
-                timer_thread = threading.Thread(target=restore_display, daemon=True)
-                timer_thread.start()
+        except Exception as e:
+            self.logger.error(f"Failed to show visual feedback: {e}")
+    
+    def _apply_pending_badge(self):
+        """Draw the most recent requested badge (debounce timer callback)."""
+        with self.badge_lock:
+            if self.pending_badge is None:
+                return
+            state, display_text, expires = self.pending_badge
+            self.pending_badge = None
+            self.badge_timer = None
+            self.badge_sequence += 1
+            sequence = self.badge_sequence
+            self.last_badge_refresh = time.monotonic()
             
+            if self.badge_expiry_timer is not None:
+                self.badge_expiry_timer.cancel()
+                self.badge_expiry_timer = None
+            if expires:
+                self.badge_expiry_timer = threading.Timer(expires, self._expire_badge, args=(sequence,))
+                self.badge_expiry_timer.name = 'display-badge-expiry'
+                self.badge_expiry_timer.daemon = True
+                self.badge_expiry_timer.start()
+        
+        try:
+            with self.display_lock:
+                self.active_badge = display_text
+                base = self.current_frame or Image.new('L', (self.width, self.height), 255)
+                self._push_badge_region(self._compose_badge(base, display_text), self.badge_refresh_mode)
         except Exception as e:
             self.logger.error(f"Failed to show visual feedback: {e}")
     
+    def _expire_badge(self, sequence: int):
+        """Remove a badge and restore the content underneath it."""
+        with self.badge_lock:
+            if sequence != self.badge_sequence or self.pending_badge is not None:
+                return  # Superseded by a newer badge
+            self.badge_expiry_timer = None
+        
+        try:
+            with self.display_lock:
+                self.active_badge = None
+                base = self.current_frame or Image.new('L', (self.width, self.height), 255)
+                # GL16 restores the grayscale background without a full flash
+                self._push_badge_region(base, DisplayModes.GL16)
+            self.logger.info("Visual feedback expired")
+        except Exception as e:
+            self.logger.error(f"Failed to restore display after visual feedback: {e}")
+    
+    def _compose_badge(self, base: Image.Image, display_text: str) -> Image.Image:
+        """Return a copy of base with the status badge drawn in its fixed region."""
+        frame = base.copy()
+        draw = ImageDraw.Draw(frame)
+        font = self._get_badge_font()
+        
+        left, top, right, bottom = self.badge_box
+        draw.rectangle((left, top, right - 1, bottom - 1), fill=255, outline=0, width=4)
+        
+        text_bbox = draw.textbbox((0, 0), display_text, font=font)
+        text_height = text_bbox[3] - text_bbox[1]
+        text_y = top + (bottom - top - text_height) // 2 - text_bbox[1]
+        draw.text((left + 24, text_y), display_text, font=font, fill=0)
+        
+        return frame
+    
+    def _push_badge_region(self, frame: Image.Image, mode: int):
+        """Send only the badge region of frame to the panel (caller holds display_lock)."""
+        if self.simulation_mode:
+            self._simulate_display(frame)
+        elif self.display_device:
+            region = frame.crop(self.badge_box)
+            self.display_device.frame_buf.paste(region, self.badge_box[:2])
+            with self._panel_awake():
+                self.display_device.draw_partial(mode)
+    
+    def _get_badge_font(self):
+        """Load the badge font once."""
+        if self.badge_font is None:
+            for font_path in ('data/fonts/DejaVuSans-Bold.ttf',
+                              '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+                              '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'):
+                try:
+                    self.badge_font = ImageFont.truetype(font_path, 48)
+                    break
+                except OSError:
+                    continue
+            else:
+                self.badge_font = ImageFont.load_default()
+        return self.badge_font
+    
     def get_display_info(self) -> dict:
         """Get display information."""
         return {
@@ -201,5 +420,15 @@ class DisplayManager:
             'height': self.height,
             'rotation': self.rotation,
             'simulation_mode': self.simulation_mode,
+            'emulation_mode': self.emulation_mode,
+            'simulation_sink': self.simulation_sink.get_info() if self.simulation_sink else None,
+            'skipped_updates': dict(self.skip_counts),
+            'panel_sleeping': self.panel_sleeping,
             'last_refresh': self.last_full_refresh
-        }
\ No newline at end of file
+        }
+    
+    def get_emulator_stats(self) -> Optional[dict]:
+        """Get panel statistics from the IT8951 emulator, if in use."""
+        if self.emulation_mode and self.display_device:
+            return self.display_device.get_stats()
+        return None
\ No newline at end of file
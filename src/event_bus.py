@@ -0,0 +1,135 @@
+"""
+In-process event bus behind the web interface's Server-Sent Events stream.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+@dataclass(frozen=True)
+class Event:
+    """One published event, serialised once for every subscriber."""
+    id: int
+    type: str
+    data: str  # JSON
+    timestamp: float
+    
+    def encode(self) -> bytes:
+        """Event in text/event-stream format."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode('utf-8')
+
+class Subscription:
+    """Bounded queue of events for one connected client."""
+    
+    def __init__(self, maxsize: int):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+        self.overflowed = False
+    
+    def put(self, event: Optional[Event]):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A client this far behind reconnects and catches up from the history
+            self.overflowed = True
+            self.closed = True
+    
+    def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None if none arrived within timeout or the subscription closed."""
+        if self.closed and self.queue.empty():
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBus:
+    """Fans events out to Server-Sent Events subscribers.
+    
+    Each subscriber gets a bounded queue; one that falls behind is closed
+    rather than allowed to grow, and its client reconnects with the
+    Last-Event-ID header and replays what it missed from a short history.
+    Every open stream holds a web server worker, so the number of
+    subscribers is capped (EVENTS_MAX_SUBSCRIBERS) below the worker count;
+    clients beyond the cap are refused and keep polling instead.
+    
+    Publishing with no subscribers only appends to the history.
+    """
+    
+    def __init__(self, max_subscribers: Optional[int] = None, queue_size: int = 64, history: int = 100):
+        self.logger = logging.getLogger(__name__)
+        self.max_subscribers = max_subscribers or int(os.getenv('EVENTS_MAX_SUBSCRIBERS', '4'))
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.history = deque(maxlen=history)
+        self.last_id = 0
+        self.stats = {'published': 0, 'subscribed': 0, 'refused': 0, 'overflowed': 0}
+    
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Send an event to every subscriber and return its id."""
+        payload = json.dumps(data, default=str, separators=(',', ':'))
+        with self.lock:
+            self.last_id += 1
+            event = Event(self.last_id, event_type, payload, time.time())
+            self.history.append(event)
+            self.stats['published'] += 1
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+        return event.id
+    
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscription]:
+        """New subscription, or None when the subscriber limit is reached.
+        
+        With last_event_id, events published after it that are still in the
+        history are queued first.
+        """
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                self.stats['refused'] += 1
+                return None
+            subscription = Subscription(self.queue_size)
+            if last_event_id and last_event_id.isdigit():
+                for event in self.history:
+                    if event.id > int(last_event_id):
+                        subscription.put(event)
+            self.subscribers.add(subscription)
+            self.stats['subscribed'] += 1
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+            if subscription.overflowed:
+                self.stats['overflowed'] += 1
+        subscription.closed = True
+    
+    def has_subscribers(self) -> bool:
+        return bool(self.subscribers)
+    
+    def close(self):
+        """End every open stream, e.g. before the web server shuts down."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.closed = True
+            subscription.put(None)
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'subscribers': len(self.subscribers),
+                'max_subscribers': self.max_subscribers,
+                'last_event_id': self.last_id,
+                **self.stats
+            }
+
+# Global bus shared by the service, web interface and voice control
+event_bus = EventBus()
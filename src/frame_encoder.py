@@ -0,0 +1,144 @@
+"""
+In-memory encoding of panel frames and previews for the web interface.
+"""
+
+import io
+import os
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+from PIL import Image, features
+
+from performance_monitor import span
+
+# Format name -> (Pillow format, MIME type, save options)
+FORMATS = {
+    'png': ('PNG', 'image/png', {'compress_level': 1}),
+    'webp': ('WEBP', 'image/webp', {'quality': 85, 'method': 2})
+}
+
+# Narrowest width a frame is downscaled to
+MIN_WIDTH = 64
+
+@dataclass(frozen=True)
+class EncodedFrame:
+    """An encoded image and the ETag that identifies its content."""
+    data: bytes
+    mimetype: str
+    etag: str
+
+class FrameEncoder:
+    """Encodes frames to PNG or WebP, optionally downscaled, with content-hash ETags.
+    
+    An image's digest is computed once from its pixels and remembered for
+    as long as the image object lives, so polling the same panel frame
+    only hashes it once; encoded variants are kept in a small LRU cache
+    keyed by (digest, format, width). Identical pixels always get the same
+    ETag, so a browser holding the frame gets a 304 even after the panel
+    was redrawn with the same content.
+    
+    Previews are kept here too, in a short list of rendered images keyed
+    by digest, so each preview has its own URL and nothing is written to
+    disk.
+    """
+    
+    def __init__(self, cache_size: Optional[int] = None, preview_slots: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_size = cache_size or int(os.getenv('FRAME_CACHE_SIZE', '8'))
+        self.preview_slots = preview_slots or int(os.getenv('PREVIEW_CACHE_SIZE', '4'))
+        self.webp = features.check('webp')
+        
+        self.lock = threading.Lock()
+        self.digests = {}  # id(image) -> digest, dropped when the image is freed
+        self.cache = OrderedDict()  # (digest, format, width) -> EncodedFrame
+        self.previews = OrderedDict()  # digest -> Image
+        self.stats = {'encodes': 0, 'cache_hits': 0}
+    
+    def negotiate(self, requested: Optional[str], accept: str = '') -> str:
+        """Format to send: the one asked for if available, else WebP when the client accepts it."""
+        if requested:
+            requested = requested.lower()
+            if requested not in FORMATS:
+                raise ValueError(f"Unsupported image format: {requested}")
+            return requested if requested != 'webp' or self.webp else 'png'
+        return 'webp' if self.webp and 'image/webp' in accept else 'png'
+    
+    def digest(self, image: Image.Image) -> str:
+        """Content hash of an image's pixels."""
+        with self.lock:
+            digest = self.digests.get(id(image))
+        if digest is None:
+            hasher = hashlib.sha1(f"{image.mode}{image.size}".encode())
+            hasher.update(image.tobytes())
+            digest = hasher.hexdigest()[:20]
+            with self.lock:
+                self.digests[id(image)] = digest
+            # Images are unhashable, so key by id and forget the id once it can be reused
+            weakref.finalize(image, self._forget, id(image))
+        return digest
+    
+    def _forget(self, image_id: int):
+        with self.lock:
+            self.digests.pop(image_id, None)
+    
+    def encode(self, image: Image.Image, fmt: str = 'png', width: Optional[int] = None) -> EncodedFrame:
+        """Encoded image, downscaled to width if it is narrower than the image."""
+        if width is not None:
+            width = max(MIN_WIDTH, width)
+            if width >= image.width:
+                width = None
+        key = (self.digest(image), fmt, width)
+        
+        with self.lock:
+            encoded = self.cache.get(key)
+            if encoded is not None:
+                self.cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return encoded
+        
+        with span('frame_encode'):
+            if width is not None:
+                if image.mode in ('1', 'P'):
+                    image = image.convert('L')
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.BILINEAR, reducing_gap=2.0)
+            pil_format, mimetype, options = FORMATS[fmt]
+            buffer = io.BytesIO()
+            image.save(buffer, format=pil_format, **options)
+        encoded = EncodedFrame(buffer.getvalue(), mimetype, f"{key[0]}-{width or 'full'}-{fmt}")
+        
+        with self.lock:
+            self.stats['encodes'] += 1
+            self.cache[key] = encoded
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return encoded
+    
+    def add_preview(self, image: Image.Image) -> str:
+        """Keep a rendered preview and return the id it is served under."""
+        preview_id = self.digest(image)
+        with self.lock:
+            self.previews[preview_id] = image
+            self.previews.move_to_end(preview_id)
+            while len(self.previews) > self.preview_slots:
+                self.previews.popitem(last=False)
+        return preview_id
+    
+    def get_preview(self, preview_id: str) -> Optional[Image.Image]:
+        with self.lock:
+            return self.previews.get(preview_id)
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'webp': self.webp,
+                'cached_variants': len(self.cache),
+                'cached_bytes': sum(len(encoded.data) for encoded in self.cache.values()),
+                'previews': len(self.previews),
+                **self.stats
+            }
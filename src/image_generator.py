@@ -9,8 +9,19 @@ from PIL import Image, ImageDraw, ImageFont
 from pathlib import Path
 from typing import Dict, Tuple, Optional, List
 import textwrap
+from dataclasses import dataclass
 from datetime import datetime
 
+from performance_monitor import span
+import clock
+
+@dataclass(frozen=True)
+class ClockLayout:
+    """Where a frame's date-mode clock text was drawn, and with what style."""
+    box: Tuple[int, int, int, int]  # Ink box of the clock text
+    background_index: int
+    font: ImageFont.ImageFont
+
 class ImageGenerator:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -29,7 +40,7 @@ class ImageGenerator:
         # Background cycling settings
         self.background_cycling_enabled = False
         self.background_cycling_interval = 30  # minutes
-        self.last_background_cycle = datetime.now()
+        self.last_background_cycle = clock.now()
         
         self._discover_fonts()
         
@@ -148,57 +159,140 @@ class ImageGenerator:
     
     def create_verse_image(self, verse_data: Dict) -> Image.Image:
         """Create an image for a Bible verse."""
-        # Get current background with safe indexing
+        return self.create_verse_frame(verse_data)[0]
+    
+    def create_verse_frame(self, verse_data: Dict) -> Tuple[Image.Image, Optional[ClockLayout]]:
+        """Create an image for a Bible verse, with the layout of its clock text.
+        
+        The layout is None unless the frame shows date-mode clock text; keep
+        it with the frame and pass it to render_clock_update for the next minute.
+        """
+        background = self._get_background()
+        
+        with span('layout'):
+            # Create overlay for text
+            overlay = Image.new('RGBA', (self.width, self.height), (255, 255, 255, 0))
+            draw = ImageDraw.Draw(overlay)
+            
+            # Define text areas
+            margin = 80
+            content_width = self.width - (2 * margin)
+            
+            # Check for different verse types
+            is_summary = verse_data.get('is_summary', False)
+            is_date_event = verse_data.get('is_date_event', False)
+            is_parallel = verse_data.get('parallel_mode', False)
+            
+            if is_date_event:
+                clock_box = self._draw_date_event(draw, verse_data, margin, content_width)
+            elif is_summary:
+                clock_box = self._draw_book_summary(draw, verse_data, margin, content_width)
+            elif is_parallel:
+                clock_box = self._draw_parallel_verse(draw, verse_data, margin, content_width)
+            else:
+                clock_box = self._draw_verse(draw, verse_data, margin, content_width)
+        
+        with span('composite'):
+            # Composite overlay onto background
+            # Convert overlay to grayscale for e-ink
+            overlay_gray = overlay.convert('L')
+            
+            # Create a proper mask based on alpha channel
+            # Where text exists (alpha > 0), use the text; elsewhere use background
+            alpha_channel = overlay.split()[-1]  # Get alpha channel
+            
+            # Convert alpha to proper mask: 255 where text exists, 0 where transparent
+            mask = alpha_channel.point(lambda x: 255 if x > 0 else 0)
+            
+            # Use paste with mask to preserve background where there's no text
+            result = background.copy()
+            result.paste(overlay_gray, mask=mask)
+        
+        clock_layout = None
+        if clock_box is not None:
+            clock_layout = ClockLayout(clock_box, self.current_background_index, self.reference_font)
+        return result, clock_layout
+    
+    def get_content_key(self, verse_data: Dict) -> Tuple:
+        """Cheap key of everything that affects the rendered frame.
+        
+        Verse data with equal keys renders to the same image, so callers can
+        skip rendering (and hashing the result) when the key matches the
+        frame on screen.
+        """
+        return (
+            verse_data.get('reference'),
+            verse_data.get('book'),
+            verse_data.get('text'),
+            verse_data.get('secondary_text'),
+            verse_data.get('primary_translation'),
+            verse_data.get('secondary_translation'),
+            bool(verse_data.get('is_summary')),
+            bool(verse_data.get('is_date_event')),
+            bool(verse_data.get('parallel_mode')),
+            verse_data.get('event_name'),
+            verse_data.get('event_description'),
+            verse_data.get('date_match'),
+            self._get_reference_display_text(verse_data),
+            self.current_background_index,
+            self.current_font_name,
+            (self.title_size, self.verse_size, self.reference_size),
+            (self.width, self.height)
+        )
+    
+    def _get_background(self) -> Image.Image:
+        """Current background image with safe indexing (shared, do not modify)."""
         try:
             if 0 <= self.current_background_index < len(self.backgrounds):
-                background = self.backgrounds[self.current_background_index].copy()
-            else:
-                self.logger.warning(f"Invalid background index {self.current_background_index}, using index 0")
-                self.current_background_index = 0
-                background = self.backgrounds[0].copy()
+                return self.backgrounds[self.current_background_index]
+            self.logger.warning(f"Invalid background index {self.current_background_index}, using index 0")
+            self.current_background_index = 0
+            return self.backgrounds[0]
         except Exception as e:
             self.logger.error(f"Error loading background: {e}")
             # Create a default white background
-            background = Image.new('L', (self.width, self.height), 255)
-        
-        # Create overlay for text
-        overlay = Image.new('RGBA', (self.width, self.height), (255, 255, 255, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Define text areas
-        margin = 80
-        content_width = self.width - (2 * margin)
-        
-        # Check for different verse types
-        is_summary = verse_data.get('is_summary', False)
-        is_date_event = verse_data.get('is_date_event', False)
-        is_parallel = verse_data.get('parallel_mode', False)
-        
-        if is_date_event:
-            self._draw_date_event(draw, verse_data, margin, content_width)
-        elif is_summary:
-            self._draw_book_summary(draw, verse_data, margin, content_width)
-        elif is_parallel:
-            self._draw_parallel_verse(draw, verse_data, margin, content_width)
-        else:
-            self._draw_verse(draw, verse_data, margin, content_width)
-        
-        # Composite overlay onto background
-        # Convert overlay to grayscale for e-ink
-        overlay_gray = overlay.convert('L')
-        
-        # Create a proper mask based on alpha channel
-        # Where text exists (alpha > 0), use the text; elsewhere use background
-        alpha_channel = overlay.split()[-1]  # Get alpha channel
-        
-        # Convert alpha to proper mask: 255 where text exists, 0 where transparent
-        mask = alpha_channel.point(lambda x: 255 if x > 0 else 0)
-        
-        # Use paste with mask to preserve background where there's no text
-        result = background.copy()
-        result.paste(overlay_gray, mask=mask)
-        
-        return result
+            return Image.new('L', (self.width, self.height), 255)
+    
+    def render_clock_update(self, frame: Image.Image, verse_data: Dict, clock_layout: Optional[ClockLayout]
+                            ) -> Optional[Tuple[Image.Image, Tuple[int, int, int, int], ClockLayout]]:
+        """Redraw only the date-mode clock text on a previously rendered frame.
+        
+        clock_layout is the one returned with that frame. Restores the
+        background under the old and new text, then draws the new text the
+        same way create_verse_image does. Returns the new frame, the updated
+        box and the new frame's clock layout, or None if a full render is needed.
+        """
+        if not verse_data.get('is_date_event') or not self.reference_font or clock_layout is None:
+            return None
+        if (clock_layout.background_index, clock_layout.font) != (self.current_background_index, self.reference_font):
+            # Background or font changed since the frame was rendered
+            return None
+        old_box = clock_layout.box
+        
+        with span('layout'):
+            draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+            lines = self._layout_reference_display(draw, self._get_reference_display_text(verse_data))
+            text_box = self._get_lines_box(draw, lines)
+            
+            left = max(0, min(text_box[0], old_box[0]) - 2)
+            top = max(0, min(text_box[1], old_box[1]) - 2)
+            right = min(self.width, max(text_box[2], old_box[2]) + 2)
+            bottom = min(self.height, max(text_box[3], old_box[3]) + 2)
+            box = (left, top, right, bottom)
+            
+            overlay = Image.new('RGBA', (right - left, bottom - top), (255, 255, 255, 0))
+            overlay_draw = ImageDraw.Draw(overlay)
+            for line_x, line_y, line in lines:
+                overlay_draw.text((line_x - left, line_y - top), line, fill=0, font=self.reference_font)
+        
+        with span('composite'):
+            region = self._get_background().crop(box)
+            mask = overlay.split()[-1].point(lambda x: 255 if x > 0 else 0)
+            region.paste(overlay.convert('L'), mask=mask)
+            
+            result = frame.copy()
+            result.paste(region, box[:2])
+        return result, box, ClockLayout(text_box, clock_layout.background_index, clock_layout.font)
     
     def _draw_verse(self, draw: ImageDraw.Draw, verse_data: Dict, margin: int, content_width: int):
         """Draw a regular Bible verse."""
@@ -228,7 +322,7 @@ class ImageGenerator:
                 y_position += line_bbox[3] - line_bbox[1] + 20
         
         # Add verse reference in bottom-right corner
-        self._add_verse_reference_display(draw, verse_data)
+        return self._add_verse_reference_display(draw, verse_data)
     
     def _draw_book_summary(self, draw: ImageDraw.Draw, verse_data: Dict, margin: int, content_width: int):
         """Draw a book summary."""
@@ -256,7 +350,7 @@ class ImageGenerator:
                 y_position += line_bbox[3] - line_bbox[1] + 25
         
         # Add verse reference in bottom-right corner
-        self._add_verse_reference_display(draw, verse_data)
+        return self._add_verse_reference_display(draw, verse_data)
     
     def _get_optimal_font_size(self, text: str, content_width: int, margin: int) -> ImageFont.ImageFont:
         """Get optimal font size that fits the text within the display bounds."""
@@ -519,7 +613,7 @@ class ImageGenerator:
         self.background_cycling_enabled = enabled
         self.background_cycling_interval = interval_minutes
         if enabled:
-            self.last_background_cycle = datetime.now()
+            self.last_background_cycle = clock.now()
             self.logger.info(f"Background cycling enabled: every {interval_minutes} minutes")
         else:
             self.logger.info("Background cycling disabled")
@@ -529,7 +623,7 @@ class ImageGenerator:
         if not self.background_cycling_enabled:
             return False
             
-        now = datetime.now()
+        now = clock.now()
         time_diff = (now - self.last_background_cycle).total_seconds() / 60  # minutes
         
         if time_diff >= self.background_cycling_interval:
@@ -546,7 +640,7 @@ class ImageGenerator:
             'enabled': self.background_cycling_enabled,
             'interval_minutes': self.background_cycling_interval,
             'next_cycle_in_minutes': max(0, self.background_cycling_interval - 
-                                       int((datetime.now() - self.last_background_cycle).total_seconds() / 60))
+                                       int((clock.now() - self.last_background_cycle).total_seconds() / 60))
         }
     
     def get_available_fonts(self) -> List[Dict]:
@@ -629,13 +723,14 @@ class ImageGenerator:
             y_position += title_bbox[3] - title_bbox[1] + 40
         
         # Draw date match type indicator
+        now = self._get_slot_time(verse_data)
         match_type = verse_data.get('date_match', 'exact')
         match_text = {
-            'exact': f"Today - {datetime.now().strftime('%B %d')}",
-            'week': f"This Week - {datetime.now().strftime('%B %d')}",
-            'month': f"This Month - {datetime.now().strftime('%B')}",
-            'season': f"This Season - {datetime.now().strftime('%B')}",
-            'fallback': f"Daily Blessing - {datetime.now().strftime('%B %d')}"
+            'exact': f"Today - {now.strftime('%B %d')}",
+            'week': f"This Week - {now.strftime('%B %d')}",
+            'month': f"This Month - {now.strftime('%B')}",
+            'season': f"This Season - {now.strftime('%B')}",
+            'fallback': f"Daily Blessing - {now.strftime('%B %d')}"
         }.get(match_type, "Today")
         
         if self.reference_font:
@@ -681,7 +776,7 @@ class ImageGenerator:
                         y_position += line_bbox[3] - line_bbox[1] + 15
         
         # Add verse reference in bottom-right corner
-        self._add_verse_reference_display(draw, verse_data)
+        return self._add_verse_reference_display(draw, verse_data)
     
     def _draw_parallel_verse(self, draw: ImageDraw.Draw, verse_data: Dict, margin: int, content_width: int):
         """Draw verse with parallel translations side by side."""
@@ -747,60 +842,97 @@ class ImageGenerator:
         draw.line([(separator_x, separator_start_y), (separator_x, separator_end_y)], fill=128, width=1)
         
         # Add verse reference in bottom-right corner for parallel mode too
-        self._add_verse_reference_display(draw, verse_data)
+        return self._add_verse_reference_display(draw, verse_data)
+    
+    def _add_verse_reference_display(self, draw: ImageDraw.Draw, verse_data: Dict) -> Optional[Tuple[int, int, int, int]]:
+        """Add verse reference in bottom-right corner, or date for date-based mode.
+        
+        Returns the ink box of the date-mode clock text, so the next minute
+        can redraw just that; None for a verse reference.
+        """
+        display_text = self._get_reference_display_text(verse_data)
+        
+        if self.reference_font:
+            lines = self._layout_reference_display(draw, display_text)
+            for line_x, line_y, line in lines:
+                draw.text((line_x, line_y), line, fill=0, font=self.reference_font)
+            
+            if verse_data.get('is_date_event'):
+                return self._get_lines_box(draw, lines)
+        return None
     
-    def _add_verse_reference_display(self, draw: ImageDraw.Draw, verse_data: Dict):
-        """Add verse reference in bottom-right corner, or date for date-based mode."""
+    def _get_reference_display_text(self, verse_data: Dict) -> str:
+        """Text for the bottom-right corner: the reference, or the clock in date mode."""
         # Check if this is date-based mode
         if verse_data.get('is_date_event'):
             # Show the actual date instead of reference for date-based mode
-            now = datetime.now()
+            now = self._get_slot_time(verse_data)
             
             # Add cycling information if available
             cycle_info = verse_data.get('verse_cycle_position', '')
             next_change = verse_data.get('next_verse_minutes', 0)
             
             if cycle_info and next_change:
-                display_text = f"{now.strftime('%I:%M %p')} • {now.strftime('%B %d, %Y')}\n{cycle_info} • Next: {next_change}m"
-            else:
-                display_text = f"{now.strftime('%I:%M %p')} • {now.strftime('%B %d, %Y')}"
-        else:
-            # Regular verse mode - show reference
-            display_text = verse_data.get('reference', 'Unknown')
-        
-        if self.reference_font:
-            # Position in bottom-right corner with margin
-            margin_x = 40
-            margin_y = 40
-            
-            # Handle multi-line text for date mode
-            lines = display_text.split('\n')
-            total_height = 0
-            max_width = 0
-            
-            # Calculate total dimensions
-            for line in lines:
-                ref_bbox = draw.textbbox((0, 0), line, font=self.reference_font)
-                line_width = ref_bbox[2] - ref_bbox[0]
-                line_height = ref_bbox[3] - ref_bbox[1]
-                max_width = max(max_width, line_width)
-                total_height += line_height + 5  # Small spacing between lines
-            
-            total_height -= 5  # Remove extra spacing from last line
-            
-            # Calculate position (bottom-right aligned)
-            x = self.width - max_width - margin_x
-            y = self.height - total_height - margin_y
-            
-            # Draw text (line by line for multi-line support)
-            current_y = y
-            for line in lines:
-                if line.strip():  # Only draw non-empty lines
-                    line_bbox = draw.textbbox((0, 0), line, font=self.reference_font)
-                    line_width = line_bbox[2] - line_bbox[0]
-                    line_height = line_bbox[3] - line_bbox[1]
-                    
-                    # Right-align each line
-                    line_x = self.width - line_width - margin_x
-                    draw.text((line_x, current_y), line, fill=0, font=self.reference_font)
-                    current_y += line_height + 5
\ No newline at end of file
+                return f"{now.strftime('%I:%M %p')} • {now.strftime('%B %d, %Y')}\n{cycle_info} • Next: {next_change}m"
+            return f"{now.strftime('%I:%M %p')} • {now.strftime('%B %d, %Y')}"
+        
+        # Regular verse mode - show reference
+        return verse_data.get('reference', 'Unknown')
+    
+    def _layout_reference_display(self, draw: ImageDraw.Draw, display_text: str) -> List[Tuple[int, int, str]]:
+        """Position each line of the corner text, bottom-right aligned."""
+        # Position in bottom-right corner with margin
+        margin_x = 40
+        margin_y = 40
+        
+        # Handle multi-line text for date mode
+        lines = display_text.split('\n')
+        total_height = 0
+        max_width = 0
+        
+        # Calculate total dimensions
+        for line in lines:
+            ref_bbox = draw.textbbox((0, 0), line, font=self.reference_font)
+            line_width = ref_bbox[2] - ref_bbox[0]
+            line_height = ref_bbox[3] - ref_bbox[1]
+            max_width = max(max_width, line_width)
+            total_height += line_height + 5  # Small spacing between lines
+        
+        total_height -= 5  # Remove extra spacing from last line
+        
+        # Calculate position (bottom-right aligned)
+        y = self.height - total_height - margin_y
+        
+        # Lay out line by line for multi-line support
+        positions = []
+        current_y = y
+        for line in lines:
+            if line.strip():  # Only draw non-empty lines
+                line_bbox = draw.textbbox((0, 0), line, font=self.reference_font)
+                line_width = line_bbox[2] - line_bbox[0]
+                line_height = line_bbox[3] - line_bbox[1]
+                
+                # Right-align each line
+                line_x = self.width - line_width - margin_x
+                positions.append((line_x, current_y, line))
+                current_y += line_height + 5
+        
+        return positions
+    
+    def _get_lines_box(self, draw: ImageDraw.Draw, lines: List[Tuple[int, int, str]]) -> Tuple[int, int, int, int]:
+        """Bounding box of laid-out corner text lines."""
+        boxes = [draw.textbbox((x, y), line, font=self.reference_font) for x, y, line in lines]
+        return (
+            min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes)
+        )
+    
+    def _get_slot_time(self, verse_data: Dict) -> datetime:
+        """Time slot the verse was resolved for, so frames rendered ahead show the right time."""
+        slot_time = verse_data.get('slot_time')
+        if slot_time:
+            try:
+                return datetime.fromisoformat(slot_time)
+            except ValueError:
+                pass
+        return clock.now()
\ No newline at end of file
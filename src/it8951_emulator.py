@@ -0,0 +1,276 @@
+"""
+Software emulation of the IT8951 e-ink controller for hardware-free testing.
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from display_constants import DisplayModes
+
+# Approximate panel refresh times (seconds) for a 10.3" IT8951 panel
+REFRESH_TIMES = {
+    DisplayModes.INIT: 2.0,
+    DisplayModes.DU: 0.26,
+    DisplayModes.GC16: 0.45,
+    DisplayModes.GL16: 0.45,
+    DisplayModes.GLR16: 0.45,
+    DisplayModes.GLD16: 0.45,
+    DisplayModes.A2: 0.12,
+    DisplayModes.DU4: 0.29
+}
+
+# Ghosting added per update by waveform mode (GC16 and INIT clear it)
+GHOST_WEIGHTS = {
+    DisplayModes.DU: 0.6,
+    DisplayModes.GL16: 0.3,
+    DisplayModes.GLR16: 0.3,
+    DisplayModes.GLD16: 0.3,
+    DisplayModes.A2: 1.0,
+    DisplayModes.DU4: 0.5
+}
+
+MODE_NAMES = {
+    value: name for name, value in vars(DisplayModes).items()
+    if not name.startswith('_')
+}
+
+@dataclass
+class EmulatedUpdate:
+    """A single update sent to the emulated panel."""
+    sequence: int
+    timestamp: float
+    mode: str
+    full: bool
+    region: Tuple[int, int, int, int]  # (left, top, right, bottom)
+    pixels: int
+    bytes_transferred: int
+    transfer_time: float
+    refresh_time: float
+    wait_time: float
+    ghost_level: float
+
+class EmulatedEPDDisplay:
+    """Stand-in for IT8951.display.AutoEPDDisplay.
+    
+    Exposes the same frame_buf / draw_full / draw_partial interface and
+    models SPI transfer time from the bytes moved, refresh time per waveform
+    mode and ghost build-up from repeated partial updates.
+    """
+    
+    def __init__(self, vcom: float = -1.21, rotate=None, spi_hz: int = 24000000,
+                 width: int = 1872, height: int = 1404, bits_per_pixel: int = 4,
+                 realtime: bool = False, history_size: int = 1000, ghost_grid: Tuple[int, int] = (16, 12)):
+        self.logger = logging.getLogger(__name__)
+        self.vcom = vcom
+        self.rotate = rotate
+        self.spi_hz = spi_hz
+        self.width = width
+        self.height = height
+        self.bits_per_pixel = bits_per_pixel
+        self.realtime = realtime
+        
+        self.frame_buf = Image.new('L', (width, height), 0xFF)
+        self.prev_frame = None
+        
+        self.updates = deque(maxlen=history_size)
+        self.sequence = 0
+        self.busy_until = 0.0
+        self.lock = threading.Lock()
+        self.power_state = 'run'
+        
+        # Coarse grid of ghost levels, one cell per panel tile
+        self.grid_cols, self.grid_rows = ghost_grid
+        self.ghost_map = [[0.0] * self.grid_cols for _ in range(self.grid_rows)]
+        
+        self.totals = {
+            'updates': 0,
+            'full_updates': 0,
+            'partial_updates': 0,
+            'skipped_partials': 0,
+            'bytes_transferred': 0,
+            'transfer_time': 0.0,
+            'refresh_time': 0.0,
+            'wait_time': 0.0,
+            'updates_while_asleep': 0,
+            'mode_counts': {}
+        }
+        
+        self.logger.info(f"IT8951 emulator initialized: {width}x{height}, {spi_hz / 1e6:.0f} MHz SPI")
+    
+    def draw_full(self, mode: int):
+        """Send the whole frame buffer and refresh the full panel."""
+        with self.lock:
+            region = (0, 0, self.width, self.height)
+            self._update(region, mode, full=True)
+            self.prev_frame = self.frame_buf.copy()
+    
+    def draw_partial(self, mode: int):
+        """Send only the changed area of the frame buffer and refresh it."""
+        with self.lock:
+            if self.prev_frame is None:
+                region = (0, 0, self.width, self.height)
+            else:
+                region = self._compute_diff_box()
+                if region is None:
+                    self.totals['skipped_partials'] += 1
+                    return
+            
+            self._update(region, mode, full=False)
+            self.prev_frame = self.frame_buf.copy()
+    
+    @property
+    def epd(self):
+        """Controller power interface, mirroring AutoEPDDisplay.epd."""
+        return self
+    
+    def run(self):
+        """Wake the controller."""
+        self.power_state = 'run'
+    
+    def standby(self):
+        """Put the controller in standby."""
+        self.power_state = 'standby'
+    
+    def sleep(self):
+        """Put the controller to sleep."""
+        self.power_state = 'sleep'
+    
+    def clear(self):
+        """Clear the panel to white with an INIT refresh."""
+        self.frame_buf.paste(0xFF, box=(0, 0, self.width, self.height))
+        self.draw_full(DisplayModes.INIT)
+    
+    def _compute_diff_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Bounding box of changed pixels, aligned to 4 pixels like the controller requires."""
+        bbox = ImageChops.difference(self.prev_frame, self.frame_buf).getbbox()
+        if bbox is None:
+            return None
+        
+        left, top, right, bottom = bbox
+        left = left - (left % 4)
+        right = min(self.width, right + (-right % 4))
+        return (left, top, right, bottom)
+    
+    def _update(self, region: Tuple[int, int, int, int], mode: int, full: bool):
+        """Model the cost of one update and record it."""
+        if self.power_state != 'run':
+            # The real controller ignores display commands until woken
+            self.totals['updates_while_asleep'] += 1
+            self.logger.warning(f"Update sent while controller is in {self.power_state}")
+        
+        left, top, right, bottom = region
+        pixels = (right - left) * (bottom - top)
+        bytes_transferred = math.ceil(pixels * self.bits_per_pixel / 8)
+        transfer_time = bytes_transferred * 8 / self.spi_hz
+        refresh_time = REFRESH_TIMES.get(mode, REFRESH_TIMES[DisplayModes.GC16])
+        
+        # The controller blocks new transfers until the previous refresh is done
+        now = time.monotonic()
+        wait_time = max(0.0, self.busy_until - now)
+        
+        if self.realtime:
+            time.sleep(wait_time + transfer_time)
+            self.busy_until = time.monotonic() + refresh_time
+        else:
+            self.busy_until = now + wait_time + transfer_time + refresh_time
+        
+        ghost_level = self._apply_ghosting(region, mode)
+        
+        mode_name = MODE_NAMES.get(mode, str(mode))
+        self.sequence += 1
+        self.updates.append(EmulatedUpdate(
+            sequence=self.sequence,
+            timestamp=time.time(),
+            mode=mode_name,
+            full=full,
+            region=region,
+            pixels=pixels,
+            bytes_transferred=bytes_transferred,
+            transfer_time=transfer_time,
+            refresh_time=refresh_time,
+            wait_time=wait_time,
+            ghost_level=ghost_level
+        ))
+        
+        self.totals['updates'] += 1
+        self.totals['full_updates' if full else 'partial_updates'] += 1
+        self.totals['bytes_transferred'] += bytes_transferred
+        self.totals['transfer_time'] += transfer_time
+        self.totals['refresh_time'] += refresh_time
+        self.totals['wait_time'] += wait_time
+        self.totals['mode_counts'][mode_name] = self.totals['mode_counts'].get(mode_name, 0) + 1
+        
+        self.logger.debug(
+            f"Emulated {mode_name} {'full' if full else 'partial'} update {region}: "
+            f"{bytes_transferred} bytes, {transfer_time * 1000:.1f}ms transfer, "
+            f"{refresh_time * 1000:.0f}ms refresh"
+        )
+    
+    def _apply_ghosting(self, region: Tuple[int, int, int, int], mode: int) -> float:
+        """Update ghost levels for the tiles covered by an update and return the panel maximum."""
+        left, top, right, bottom = region
+        tile_w = self.width / self.grid_cols
+        tile_h = self.height / self.grid_rows
+        
+        first_col = int(left // tile_w)
+        last_col = min(self.grid_cols - 1, int((right - 1) // tile_w))
+        first_row = int(top // tile_h)
+        last_row = min(self.grid_rows - 1, int((bottom - 1) // tile_h))
+        
+        clears = mode in (DisplayModes.GC16, DisplayModes.INIT)
+        weight = GHOST_WEIGHTS.get(mode, 0.0)
+        
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                if clears:
+                    self.ghost_map[row][col] = 0.0
+                else:
+                    self.ghost_map[row][col] += weight
+        
+        return self.get_ghost_level()
+    
+    def get_ghost_level(self) -> float:
+        """Highest accumulated ghost level on the panel."""
+        return max(max(row) for row in self.ghost_map)
+    
+    def get_updates(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded updates, oldest first."""
+        updates = list(self.updates)
+        if limit is not None:
+            updates = updates[-limit:]
+        return [asdict(update) for update in updates]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregate emulator statistics."""
+        stats = dict(self.totals)
+        stats['mode_counts'] = dict(self.totals['mode_counts'])
+        stats['panel_time'] = stats['transfer_time'] + stats['refresh_time']
+        stats['ghost_level'] = self.get_ghost_level()
+        stats['spi_hz'] = self.spi_hz
+        stats['realtime'] = self.realtime
+        stats['power_state'] = self.power_state
+        return stats
+    
+    def reset_stats(self):
+        """Clear recorded updates and totals, keeping the panel contents."""
+        with self.lock:
+            self.updates.clear()
+            self.totals.update({
+                'updates': 0,
+                'full_updates': 0,
+                'partial_updates': 0,
+                'skipped_partials': 0,
+                'bytes_transferred': 0,
+                'transfer_time': 0.0,
+                'refresh_time': 0.0,
+                'wait_time': 0.0,
+                'updates_while_asleep': 0,
+                'mode_counts': {}
+            })
@@ -0,0 +1,222 @@
+"""
+Memory diagnostics for long-running Bible Clock installations.
+"""
+
+import gc
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from system_metrics import system_metrics
+
+# Allocation sites reported when two snapshots are compared
+TOP_SITES = 15
+
+# Objects visited per component before its size estimate is cut short
+ESTIMATE_LIMIT = 500000
+
+# Frames that belong to the diagnostics themselves
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+def estimate_size(root: Any, limit: int = ESTIMATE_LIMIT) -> Tuple[int, bool]:
+    """Approximate bytes retained by an object graph.
+    
+    Follows containers and instance dicts. Pixel data of PIL images and
+    font files of FreeType fonts are counted from their dimensions and file
+    size, since sys.getsizeof does not see them. Returns (bytes, complete);
+    complete is False when the walk stopped at the object limit.
+    """
+    seen = set()
+    stack = [root]
+    total = 0
+    
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, (type, ModuleType, logging.Logger)):
+            continue
+        if len(seen) >= limit:
+            return total, False
+        seen.add(id(obj))
+        
+        if hasattr(obj, 'getbands') and hasattr(obj, 'size'):
+            # PIL image: pixel buffer lives outside the Python heap
+            width, height = obj.size
+            total += sys.getsizeof(obj) + width * height * len(obj.getbands())
+            continue
+        if hasattr(obj, 'getbbox') and isinstance(getattr(obj, 'path', None), str):
+            # FreeType font: the face is loaded from its file
+            try:
+                total += os.path.getsize(obj.path)
+            except OSError:
+                pass
+            continue
+        
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+    
+    return total, True
+
+class MemoryDiagnostics:
+    """Tracemalloc snapshots, allocation-growth diffs and per-component sizes.
+    
+    Tracing is off unless MEMORY_TRACEMALLOC is set, because it slows every
+    allocation. Component sizes are estimates from walking the objects each
+    component registers, cached for MEMORY_COMPONENT_TTL seconds.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.tracemalloc_enabled = os.getenv('MEMORY_TRACEMALLOC', 'false').lower() == 'true'
+        self.trace_frames = int(os.getenv('MEMORY_TRACE_FRAMES', '1'))
+        self.snapshot_interval = float(os.getenv('MEMORY_SNAPSHOT_INTERVAL', '3600'))
+        self.component_ttl = float(os.getenv('MEMORY_COMPONENT_TTL', '300'))
+        
+        self.components = {}  # name -> callable returning the objects to measure
+        self.component_sizes = {}
+        self.components_measured = None  # monotonic time of the last measurement
+        
+        self.snapshots = deque(maxlen=2)  # (taken at, tracemalloc.Snapshot)
+        self.top_growth = []
+        self.gc_runs = {}  # reason -> count
+        self.last_gc = None
+        self.lock = threading.Lock()
+    
+    def start(self):
+        """Start tracing allocations if MEMORY_TRACEMALLOC is enabled."""
+        if self.tracemalloc_enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self.logger.info(f"tracemalloc started ({self.trace_frames} frame(s) per allocation)")
+    
+    def stop(self):
+        """Stop tracing allocations, releasing tracemalloc's own bookkeeping."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    def register(self, name: str, source: Callable[[], Any]):
+        """Register a component; source returns the objects it retains."""
+        self.components[name] = source
+    
+    def collect_garbage(self, reason: str) -> Tuple[float, float]:
+        """Run a full collection and return memory percent before and after."""
+        before = system_metrics.latest().memory_percent
+        unreachable = gc.collect()
+        after = system_metrics.refresh().memory_percent
+        
+        with self.lock:
+            self.gc_runs[reason] = self.gc_runs.get(reason, 0) + 1
+            self.last_gc = {
+                'time': datetime.now().isoformat(),
+                'reason': reason,
+                'unreachable_objects': unreachable,
+                'memory_before': before,
+                'memory_after': after
+            }
+        if before - after > 1:  # Only log if significant reduction
+            self.logger.info(f"Garbage collection ({reason}): {before:.1f}% -> {after:.1f}% memory")
+        return before, after
+    
+    def take_snapshot(self) -> Optional[List[Dict[str, Any]]]:
+        """Snapshot traced allocations and diff against the previous snapshot."""
+        if not tracemalloc.is_tracing():
+            return None
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        with self.lock:
+            previous = self.snapshots[-1][1] if self.snapshots else None
+            self.snapshots.append((datetime.now(), snapshot))
+        
+        if previous is not None:
+            growth = [
+                {
+                    'site': str(stat.traceback),
+                    'size_kb': round(stat.size / 1024, 1),
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'count_diff': stat.count_diff
+                }
+                for stat in snapshot.compare_to(previous, 'lineno')[:TOP_SITES]
+            ]
+            with self.lock:
+                self.top_growth = growth
+            if growth:
+                self.logger.info(f"Largest allocation growth since last snapshot: {growth[0]['site']} "
+                                 f"({growth[0]['size_diff_kb']:+.1f} KB)")
+        
+        self.measure_components(force=True)
+        return self.top_growth
+    
+    def dump_snapshot(self) -> Optional[bytes]:
+        """Current traced allocations in tracemalloc's dump format (Snapshot.load reads it)."""
+        if not tracemalloc.is_tracing():
+            return None
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        with tempfile.NamedTemporaryFile(suffix='.tracemalloc') as f:
+            snapshot.dump(f.name)
+            return f.read()
+    
+    def measure_components(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Estimated retained size of each registered component."""
+        with self.lock:
+            fresh = self.components_measured and time.monotonic() - self.components_measured < self.component_ttl
+            if fresh and not force:
+                return dict(self.component_sizes)
+        
+        sizes = {}
+        for name, source in list(self.components.items()):
+            try:
+                size, complete = estimate_size(source())
+                sizes[name] = {'bytes': size, 'mb': round(size / 1048576, 2), 'complete': complete}
+            except Exception as e:
+                self.logger.error(f"Could not measure component '{name}': {e}")
+        
+        with self.lock:
+            self.component_sizes = sizes
+            self.components_measured = time.monotonic()
+        return sizes
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Memory status for /api/status."""
+        snapshot = system_metrics.latest()
+        status = {
+            'process_rss_mb': round(snapshot.process_rss / 1048576, 1),
+            'components': self.measure_components(),
+            'gc': {'runs': dict(self.gc_runs), 'last': self.last_gc}
+        }
+        
+        tracing = {'enabled': tracemalloc.is_tracing()}
+        if tracing['enabled']:
+            current, peak = tracemalloc.get_traced_memory()
+            with self.lock:
+                tracing.update({
+                    'traced_mb': round(current / 1048576, 2),
+                    'peak_mb': round(peak / 1048576, 2),
+                    'snapshots': len(self.snapshots),
+                    'last_snapshot': self.snapshots[-1][0].isoformat() if self.snapshots else None,
+                    'top_growth': list(self.top_growth[:5])
+                })
+        status['tracemalloc'] = tracing
+        return status
+
+# Global diagnostics shared by the service, display and web interface
+memory_diagnostics = MemoryDiagnostics()
@@ -0,0 +1,155 @@
+"""
+Prometheus text exposition of Bible Clock metrics.
+"""
+
+import logging
+import threading
+from typing import List, Tuple
+
+from performance_monitor import COUNTERS, HISTOGRAM_BOUNDS, LatencyHistogram
+from system_metrics import system_metrics
+from thread_registry import thread_registry
+from stall_watchdog import stall_watchdog
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'bibleclock'
+
+# Operation name prefixes exported as their own histogram family: prefix -> (metric, label)
+LABELLED_OPERATIONS = {
+    'scheduler_jitter.': ('scheduler_jitter_seconds', 'job'),
+    'http.': ('http_request_duration_seconds', 'route')
+}
+
+# Every other operation histogram goes into this family, labelled by operation
+OPERATION_FAMILY = ('operation_duration_seconds', 'operation')
+
+# Bucket labels, formatted once
+BUCKET_LABELS = [format(bound, 'g') for bound in HISTOGRAM_BOUNDS] + ['+Inf']
+
+# System gauges taken from the last shared sample: metric -> (snapshot field, help text)
+SYSTEM_GAUGES = {
+    'cpu_percent': ('cpu_percent', 'CPU usage in percent'),
+    'memory_percent': ('memory_percent', 'Memory usage in percent'),
+    'disk_percent': ('disk_percent', 'Root filesystem usage in percent'),
+    'cpu_temperature_celsius': ('temperature', 'CPU temperature in degrees Celsius'),
+    'uptime_seconds': ('uptime_seconds', 'System uptime in seconds')
+}
+
+class MetricsExporter:
+    """Formats the monitor's counters and histograms for Prometheus.
+    
+    Everything comes from counters that are already in memory; a scrape
+    never samples psutil or reads files. The text for each histogram is
+    cached and only rebuilt after it has recorded new samples.
+    """
+    
+    def __init__(self, performance_monitor, service_manager=None):
+        self.logger = logging.getLogger(__name__)
+        self.performance_monitor = performance_monitor
+        self.service_manager = service_manager
+        self.lock = threading.Lock()
+        self._histogram_text = {}  # operation name -> (sample count, exposition lines)
+        self.scrapes = 0
+    
+    def render(self) -> str:
+        """Current metrics in the Prometheus text format."""
+        with self.lock:
+            self.scrapes += 1
+            lines = []
+            self._render_counters(lines)
+            self._render_histograms(lines)
+            self._render_service(lines)
+            self._render_threads(lines)
+            self._render_stalls(lines)
+            self._render_system(lines)
+            lines.append('')
+            return '\n'.join(lines)
+    
+    def _render_counters(self, lines: List[str]):
+        counters = self.performance_monitor.get_counters()
+        for name, help_text in COUNTERS.items():
+            self._family(lines, f'{name}_total', 'counter', help_text)
+            lines.append(f'{PREFIX}_{name}_total {counters.get(name, 0)}')
+    
+    def _render_histograms(self, lines: List[str]):
+        families = {}  # metric -> [(label, value, histogram)]
+        for name, histogram in sorted(self.performance_monitor.get_histograms().items()):
+            metric, label, value = self._histogram_family(name)
+            families.setdefault(metric, (label, []))[1].append((name, value, histogram))
+        
+        for metric, (label, members) in families.items():
+            self._family(lines, metric, 'histogram', f'Latency in seconds by {label}')
+            for name, value, histogram in members:
+                lines.extend(self._histogram_lines(name, metric, f'{label}="{value}"', histogram))
+    
+    def _histogram_family(self, name: str) -> Tuple[str, str, str]:
+        for prefix, (metric, label) in LABELLED_OPERATIONS.items():
+            if name.startswith(prefix):
+                return metric, label, name[len(prefix):]
+        return OPERATION_FAMILY[0], OPERATION_FAMILY[1], name
+    
+    def _histogram_lines(self, name: str, metric: str, labels: str, histogram: LatencyHistogram) -> List[str]:
+        cached = self._histogram_text.get(name)
+        if cached and cached[0] == histogram.count:
+            return cached[1]
+        
+        counts, count, total = histogram.snapshot()
+        series = f'{PREFIX}_{metric}'
+        text = []
+        cumulative = 0
+        for bucket_label, bucket_count in zip(BUCKET_LABELS, counts):
+            cumulative += bucket_count
+            text.append(f'{series}_bucket{{{labels},le="{bucket_label}"}} {cumulative}')
+        text.append(f'{series}_sum{{{labels}}} {total!r}')
+        text.append(f'{series}_count{{{labels}}} {count}')
+        
+        self._histogram_text[name] = (count, text)
+        return text
+    
+    def _render_service(self, lines: List[str]):
+        """Pipeline counters kept by the running service, if there is one."""
+        pipeline = getattr(self.service_manager, 'render_pipeline', None)
+        if pipeline is None:
+            return
+        
+        self._family(lines, 'minute_ticks_total', 'counter', 'Minute ticks by how the frame was produced')
+        for kind, count in pipeline.tick_counts.items():
+            lines.append(f'{PREFIX}_minute_ticks_total{{kind="{kind}"}} {count}')
+        
+        self._family(lines, 'fallback_frames_total', 'counter', 'Frames rendered from local data after a stage missed its budget')
+        lines.append(f'{PREFIX}_fallback_frames_total {pipeline.fallback_frames}')
+        
+        self._family(lines, 'pipeline_stage_misses_total', 'counter', 'Pipeline stages that missed their budget')
+        for stage, stats in pipeline.stats.items():
+            lines.append(f'{PREFIX}_pipeline_stage_misses_total{{stage="{stage}"}} {stats["misses"]}')
+    
+    def _render_threads(self, lines: List[str]):
+        self._family(lines, 'thread_cpu_seconds_total', 'counter', 'CPU time used by each subsystem\'s threads')
+        for subsystem, seconds in sorted(thread_registry.get_totals().items()):
+            lines.append(f'{PREFIX}_thread_cpu_seconds_total{{subsystem="{subsystem}"}} {seconds!r}')
+    
+    def _render_stalls(self, lines: List[str]):
+        degraded = set(stall_watchdog.degraded())
+        counts = sorted(stall_watchdog.get_stall_counts().items())
+        self._family(lines, 'stalls_total', 'counter', 'Heartbeats missed, by component')
+        for component, stalls in counts:
+            lines.append(f'{PREFIX}_stalls_total{{component="{component}"}} {stalls}')
+        self._family(lines, 'component_stalled', 'gauge', 'Whether a component is currently stalled')
+        for component, _ in counts:
+            lines.append(f'{PREFIX}_component_stalled{{component="{component}"}} {int(component in degraded)}')
+    
+    def _render_system(self, lines: List[str]):
+        snapshot = system_metrics.peek()
+        if snapshot is None:
+            return
+        
+        for metric, (field, help_text) in SYSTEM_GAUGES.items():
+            value = getattr(snapshot, field)
+            if value is None:
+                continue
+            self._family(lines, metric, 'gauge', help_text)
+            lines.append(f'{PREFIX}_{metric} {value}')
+    
+    def _family(self, lines: List[str], metric: str, kind: str, help_text: str):
+        lines.append(f'# HELP {PREFIX}_{metric} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{metric} {kind}')
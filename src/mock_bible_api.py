@@ -0,0 +1,358 @@
+"""
+Offline stand-in for bible-api.com, for simulations, tests and benchmarks.
+"""
+
+import json
+import math
+import time
+import random
+import logging
+import threading
+from collections import namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+from urllib.parse import urlsplit, unquote, parse_qs
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+TRANSLATION_NAMES = {
+    'kjv': 'King James Version',
+    'web': 'World English Bible',
+    'asv': 'American Standard Version (1901)',
+    'bbe': 'Bible in Basic English',
+    'ylt': "Young's Literal Translation (NT only)"
+}
+
+# Latency distributions: name -> number of parameters (milliseconds unless noted)
+DISTRIBUTIONS = {
+    'fixed': 1,        # fixed:MS
+    'uniform': 2,      # uniform:LOW,HIGH
+    'normal': 2,       # normal:MEAN,STDDEV (clipped at zero)
+    'lognormal': 2,    # lognormal:MEDIAN,SIGMA (sigma is unitless)
+    'exponential': 1   # exponential:MEAN
+}
+
+# What the upstream does with one request: delay in seconds before the response
+# starts, and the injected fault, if any ('error', 'timeout' or 'slow_body')
+Outcome = namedtuple('Outcome', ['latency', 'fault'])
+
+def status_phrase(status: int) -> str:
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ''
+
+class LatencyModel:
+    """Response latency drawn from a named distribution.
+    
+    Built from specs such as "80", "uniform:20,200" or "lognormal:80,0.6";
+    see DISTRIBUTIONS.
+    """
+    
+    def __init__(self, distribution: str = 'fixed', *params: float):
+        if DISTRIBUTIONS.get(distribution) != len(params):
+            raise ValueError(f"Latency distribution {distribution} needs {DISTRIBUTIONS.get(distribution, 0)} "
+                             f"parameter(s), got {len(params)}")
+        self.distribution = distribution
+        self.params = params
+    
+    @classmethod
+    def parse(cls, spec: Union[str, float, 'LatencyModel']) -> 'LatencyModel':
+        if isinstance(spec, LatencyModel):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls('fixed', float(spec) * 1000)
+        name, _, values = str(spec).partition(':')
+        if not values:
+            name, values = 'fixed', name
+        try:
+            params = [float(value) for value in values.split(',')]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        return cls(name, *params)
+    
+    def sample(self, rng: random.Random) -> float:
+        """One latency in seconds."""
+        p = self.params
+        if self.distribution == 'fixed':
+            ms = p[0]
+        elif self.distribution == 'uniform':
+            ms = rng.uniform(p[0], p[1])
+        elif self.distribution == 'normal':
+            ms = rng.gauss(p[0], p[1])
+        elif self.distribution == 'lognormal':
+            ms = rng.lognormvariate(math.log(p[0]), p[1]) if p[0] > 0 else 0.0
+        else:
+            ms = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, ms) / 1000
+    
+    def __str__(self) -> str:
+        return f"{self.distribution}:{','.join(f'{value:g}' for value in self.params)}"
+
+class MockBibleAPI:
+    """Answers bible-api.com verse lookups from the bundled data or fixtures.
+    
+    Text comes from a fixtures file ({translation: {"Book ch:v": text}})
+    when it has the verse, then the offline KJV; other verses listed in
+    data/bible_structure.json get deterministic placeholder text, so every
+    reference the clock can ask for resolves. Responses have the same shape
+    as the real API.
+    
+    draw() decides how the upstream behaves for one request: a latency from
+    the LatencyModel, and with the given rates an error status, a timeout
+    (no response at all) or a slow body trickled out over slow_body_seconds.
+    The same seed gives the same sequence of outcomes.
+    """
+    
+    def __init__(self, latency: Union[str, float, LatencyModel] = 0.0, failure_rate: float = 0.0,
+                 seed: Optional[int] = None, data_dir: str = 'data', fixtures: Optional[str] = None,
+                 error_status: int = 503, timeout_rate: float = 0.0, slow_body_rate: float = 0.0,
+                 slow_body_seconds: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.latency = LatencyModel.parse(latency)
+        self.failure_rate = failure_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.slow_body_rate = slow_body_rate
+        self.slow_body_seconds = slow_body_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'not_found': 0, 'injected_failures': 0, 'timeouts': 0,
+                      'slow_bodies': 0}
+        
+        self.kjv = self._load(Path(data_dir) / 'translations' / 'bible_kjv.json')
+        self.structure = self._load(Path(data_dir) / 'bible_structure.json')
+        self.fixtures = self._load(Path(fixtures)) if fixtures else {}
+    
+    def _load(self, path: Path) -> Dict:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Failed to load {path}: {e}")
+            return {}
+    
+    def draw(self) -> Outcome:
+        """Latency and injected fault for the next request."""
+        with self.lock:
+            self.stats['requests'] += 1
+            latency = self.latency.sample(self.random)
+            roll = self.random.random()
+            fault = None
+            for name, rate, counter in (('error', self.failure_rate, 'injected_failures'),
+                                        ('timeout', self.timeout_rate, 'timeouts'),
+                                        ('slow_body', self.slow_body_rate, 'slow_bodies')):
+                if roll < rate:
+                    fault = name
+                    self.stats[counter] += 1
+                    break
+                roll -= rate
+        return Outcome(latency, fault)
+    
+    def error_response(self) -> Tuple[int, Dict[str, Any]]:
+        return self.error_status, {'error': f'injected error {self.error_status}'}
+    
+    def lookup(self, reference: str, translation: str = 'kjv') -> Tuple[int, Dict[str, Any]]:
+        """Resolve a "Book chapter:verse" reference; returns (status code, JSON body)."""
+        parsed = self._parse_reference(reference)
+        text = self._verse_text(*parsed, translation) if parsed else None
+        if text is None:
+            self._count('not_found')
+            return 404, {'error': 'not found'}
+        
+        book, chapter, verse = parsed
+        self._count('ok')
+        return 200, {
+            'reference': f"{book} {chapter}:{verse}",
+            'verses': [{
+                'book_id': book[:3].upper(),
+                'book_name': book,
+                'chapter': chapter,
+                'verse': verse,
+                'text': text + '\n'
+            }],
+            'text': text + '\n',
+            'translation_id': translation,
+            'translation_name': TRANSLATION_NAMES.get(translation, translation.upper()),
+            'translation_note': 'Simulated response'
+        }
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+    
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+    
+    def _parse_reference(self, reference: str) -> Optional[Tuple[str, int, int]]:
+        book, _, location = reference.strip().rpartition(' ')
+        chapter, _, verse = location.partition(':')
+        try:
+            return book, int(chapter), int(verse)
+        except ValueError:
+            return None
+    
+    def _verse_text(self, book: str, chapter: int, verse: int, translation: str) -> Optional[str]:
+        fixture = self.fixtures.get(translation, {}).get(f"{book} {chapter}:{verse}")
+        if fixture:
+            return fixture
+        if translation == 'kjv':
+            text = self.kjv.get(book, {}).get(str(chapter), {}).get(str(verse))
+            if text:
+                return text
+        
+        verse_count = self.structure.get(book, {}).get(str(chapter))
+        if not verse_count or not 1 <= verse <= verse_count:
+            return None
+        return f"Simulated {translation.upper()} text of {book} chapter {chapter}, verse {verse}."
+
+class MockBibleAPIAdapter(BaseAdapter):
+    """requests transport adapter that serves a MockBibleAPI in-process.
+    
+    Mount it on a session for the API's base URL; requests then never leave
+    the process. Waits behave like the real transport: a response that does
+    not start within the read timeout raises ReadTimeout after the timeout,
+    while a slow body, whose chunks each arrive in time, is never cut short.
+    """
+    
+    def __init__(self, api: MockBibleAPI):
+        super().__init__()
+        self.api = api
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        
+        outcome = self.api.draw()
+        if outcome.fault == 'timeout' or (timeout is not None and outcome.latency > timeout):
+            time.sleep(timeout if timeout is not None else outcome.latency)
+            raise requests.exceptions.ReadTimeout(f"Mock API did not answer within {timeout}s", request=request)
+        time.sleep(outcome.latency)
+        
+        if outcome.fault == 'error':
+            status, body = self.api.error_response()
+        else:
+            url = urlsplit(request.url)
+            translation = parse_qs(url.query).get('translation', ['kjv'])[0]
+            status, body = self.api.lookup(unquote(url.path).lstrip('/'), translation)
+        if outcome.fault == 'slow_body':
+            time.sleep(self.api.slow_body_seconds)
+        return self._build_response(request, status, body)
+    
+    def _build_response(self, request, status: int, body: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = status_phrase(status)
+        response._content = json.dumps(body).encode('utf-8')
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json; charset=utf-8'})
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def close(self):
+        pass
+
+class MockBibleAPIServer:
+    """Serves a MockBibleAPI over HTTP on a local port, in a background thread.
+    
+    Implements the /{book} {chapter}:{verse}?translation= route of
+    bible-api.com, so BIBLE_API_URL can point at it (see url) and the
+    service, benchmarks or other processes talk to it over real sockets.
+    A timeout holds the connection open for hang_seconds and closes it
+    without answering; a slow body is sent in chunks spread over the
+    API's slow_body_seconds. GET /_stats returns the API's counters.
+    """
+    
+    def __init__(self, api: Optional[MockBibleAPI] = None, host: str = '127.0.0.1', port: int = 0,
+                 hang_seconds: float = 60.0, body_chunks: int = 10):
+        self.logger = logging.getLogger(__name__)
+        self.api = api or MockBibleAPI()
+        self.hang_seconds = hang_seconds
+        self.body_chunks = body_chunks
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'MockBibleAPIServer':
+        """Serve in a background thread; returns self so it can be chained."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='mock-bible-api', daemon=True)
+        self.thread.start()
+        self.logger.info(f"Mock Bible API serving on {self.url} (latency {self.api.latency})")
+        return self
+    
+    def serve_forever(self):
+        self.logger.info(f"Mock Bible API serving on {self.url} (latency {self.api.latency})")
+        self.httpd.serve_forever()
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=1)
+    
+    def __enter__(self) -> 'MockBibleAPIServer':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+            
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == '/_stats':
+                    self._send(200, server.api.get_stats())
+                    return
+                
+                outcome = server.api.draw()
+                time.sleep(outcome.latency)
+                if outcome.fault == 'timeout':
+                    time.sleep(server.hang_seconds)
+                    self.close_connection = True
+                    return
+                if outcome.fault == 'error':
+                    self._send(*server.api.error_response())
+                    return
+                
+                translation = parse_qs(url.query).get('translation', ['kjv'])[0]
+                status, body = server.api.lookup(unquote(url.path).lstrip('/'), translation)
+                self._send(status, body, slow=outcome.fault == 'slow_body')
+            
+            def _send(self, status: int, body: Dict[str, Any], slow: bool = False):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                try:
+                    if not slow:
+                        self.wfile.write(payload)
+                        return
+                    chunk = max(1, math.ceil(len(payload) / server.body_chunks))
+                    delay = server.api.slow_body_seconds / math.ceil(len(payload) / chunk)
+                    for offset in range(0, len(payload), chunk):
+                        time.sleep(delay)
+                        self.wfile.write(payload[offset:offset + chunk])
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # Client gave up
+            
+            def log_message(self, format, *args):
+                server.logger.debug(f"{self.address_string()} {format % args}")
+        
+        return Handler
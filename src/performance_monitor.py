@@ -2,14 +2,208 @@
 Performance monitoring and optimization for Bible Clock.
 """
 
-import psutil
 import time
 import logging
 import threading
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-from collections import deque
-import gc
+from typing import Dict, List, Any, Optional, Tuple
+from collections import deque, OrderedDict
+from memory_diagnostics import memory_diagnostics
+from system_metrics import system_metrics
+from thread_registry import thread_registry
+from stall_watchdog import stall_watchdog
+from timeseries_store import timeseries_store
+
+# Histogram bucket upper bounds in seconds: ten steps per decade (R10 series)
+# from 0.1 ms to 60 s, so a percentile estimate is within about 12% of the truth
+HISTOGRAM_BOUNDS = tuple(
+    round(mantissa * 10.0 ** exponent, 7)
+    for exponent in range(-4, 2)
+    for mantissa in (1.0, 1.25, 1.6, 2.0, 2.5, 3.15, 4.0, 5.0, 6.3, 8.0)
+    if mantissa * 10.0 ** exponent < 60
+) + (60.0,)
+
+# Percentiles reported for every histogram
+PERCENTILES = (50, 95, 99)
+
+# Minute ticks whose spans are kept for inspection
+TRACE_HISTORY = 30
+
+# Counters, allocated up front so incrementing never allocates: name -> help text
+COUNTERS = {
+    'api_requests': 'Bible API requests made',
+    'api_failures': 'Bible API requests that failed or returned an error status',
+    'verses_from_api': 'Verses resolved from the Bible API',
+    'verses_from_local': 'Verses resolved from local data without a network request',
+    'verses_from_fallback': 'Verses resolved to a summary or fallback verse',
+    'render_cache_hits': 'Frame renders skipped because the panel already showed the content',
+    'voice_commands': 'Voice commands processed',
+    'chatgpt_requests': 'ChatGPT requests made',
+    'chatgpt_failures': 'ChatGPT requests that failed',
+    'chatgpt_prompt_tokens': 'ChatGPT prompt tokens used',
+    'chatgpt_completion_tokens': 'ChatGPT completion tokens used'
+}
+
+# Operations whose histograms exist from startup, so they are exported before the first sample
+OPERATIONS = (
+    'pipeline_resolve', 'pipeline_render', 'pipeline_commit', 'pipeline_clock',
+    'verse_resolve', 'api_fetch', 'layout', 'composite', 'panel_transfer', 'panel_refresh',
+    'voice_listen', 'voice_recognize', 'voice_command', 'voice_chatgpt', 'voice_speak'
+)
+
+# Operations whose durations are also kept long-term, as milliseconds (see timeseries_store)
+TIMESERIES_OPERATIONS = {
+    'pipeline_render': 'render_ms',
+    'pipeline_commit': 'commit_ms',
+    'scheduler_jitter.verse_update': 'update_jitter_ms'
+}
+
+# Trace and span stack of the current thread (see PerformanceMonitor.trace_tick)
+_trace_context = threading.local()
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram backed by an array of counters.
+    
+    Recording is a bisect and a few integer increments, so it costs the
+    same after a million samples as after one; percentiles are
+    interpolated within the bucket they fall in.
+    """
+    
+    def __init__(self, bounds: Tuple[float, ...] = HISTOGRAM_BOUNDS):
+        self.bounds = bounds
+        self.counts = array('Q', [0] * (len(bounds) + 1))  # Last bucket holds overflow
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+        self.last = None
+        self.lock = threading.Lock()
+    
+    def observe(self, seconds: float):
+        """Record one duration in seconds."""
+        index = bisect_left(self.bounds, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            self.last = seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+    
+    def percentile(self, percent: float) -> Optional[float]:
+        """Estimated duration below which the given percentage of samples fall."""
+        with self.lock:
+            counts = self.counts.tolist()
+            count, low, high = self.count, self.min, self.max
+        if not count:
+            return None
+        
+        rank = count * percent / 100.0
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else high
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, low), high)
+            seen += bucket_count
+        return high
+    
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Consistent copy of (bucket counts, count, sum) for exporters."""
+        with self.lock:
+            return self.counts.tolist(), self.count, self.sum
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """Count, average, min, max and percentiles, in seconds."""
+        summary = {
+            'count': self.count,
+            'average': self.sum / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'last': self.last
+        }
+        for percent in PERCENTILES:
+            summary[f'p{percent}'] = self.percentile(percent)
+        return summary
+
+class TickTrace:
+    """Spans recorded for one minute tick, from whichever threads worked on it."""
+    
+    def __init__(self, boundary: datetime):
+        self.boundary = boundary
+        self.started = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+    
+    def add(self, name: str, parent: Optional[str], start: float, duration: float):
+        with self.lock:
+            self.spans.append((name, parent, threading.current_thread().name, start - self.started, duration))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span[3])
+        return {
+            'boundary': self.boundary.isoformat(),
+            'spans': [
+                {
+                    'name': name,
+                    'parent': parent,
+                    'thread': thread,
+                    'start_ms': round(offset * 1000, 2),
+                    'duration_ms': round(duration * 1000, 2)
+                }
+                for name, parent, thread, offset, duration in spans
+            ]
+        }
+
+class RequestTrace:
+    """Spans recorded while serving one web request."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+    
+    def add(self, name: str, parent: Optional[str], start: float, duration: float):
+        self.spans.append((name, duration))
+    
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value: the whole request, then each span name's total."""
+        durations = OrderedDict()
+        for name, duration in self.spans:
+            durations[name] = durations.get(name, 0.0) + duration
+        entries = [f'total;dur={total * 1000:.1f}']
+        entries += [f'{name};dur={duration * 1000:.1f}' for name, duration in durations.items()]
+        return ', '.join(entries)
+
+@contextmanager
+def span(name: str):
+    """Time a stage of the current minute tick or web request, nested under any enclosing span.
+    
+    Outside PerformanceMonitor.trace_tick() and trace_request() this records
+    nothing, so components can be instrumented without knowing who calls them.
+    """
+    trace = getattr(_trace_context, 'trace', None)
+    if trace is None:
+        yield
+        return
+    
+    stack = _trace_context.stack
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+        trace.add(name, parent, start, duration)
+        _trace_context.monitor.record_operation_time(name, duration)
 
 class PerformanceMonitor:
     """Monitor system performance and optimize resource usage."""
@@ -23,10 +217,17 @@ class PerformanceMonitor:
         self.memory_history = deque(maxlen=history_size)
         self.temperature_history = deque(maxlen=history_size)
         
-        # Timing metrics
-        self.operation_times = {}
+        # Timing metrics: operation name -> LatencyHistogram
+        self.operation_times = {name: LatencyHistogram() for name in OPERATIONS}
+        self.operation_lock = threading.Lock()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.counter_lock = threading.Lock()
+        self.tick_traces = OrderedDict()  # boundary -> TickTrace
         self.monitoring = False
         self.monitor_thread = None
+        self.interval = 30.0
+        self.wakeups = 0  # Monitoring loop iterations, for activity reporting
+        self._wakeup = threading.Event()
     
     def start_monitoring(self, interval: float = 30.0):
         """Start performance monitoring."""
@@ -34,9 +235,11 @@ class PerformanceMonitor:
             return
         
         self.monitoring = True
+        self.interval = interval
+        self._wakeup.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
-            args=(interval,),
+            name='performance-monitor',
             daemon=True
         )
         self.monitor_thread.start()
@@ -45,42 +248,46 @@ class PerformanceMonitor:
     def stop_monitoring(self):
         """Stop performance monitoring."""
         self.monitoring = False
+        self._wakeup.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=1)
+        stall_watchdog.forget('performance_monitor')
         self.logger.info("Performance monitoring stopped")
     
-    def _monitor_loop(self, interval: float):
+    def set_interval(self, interval: float):
+        """Change the sampling interval, e.g. to back off during quiet hours."""
+        self.interval = interval
+        self._wakeup.set()
+    
+    def _monitor_loop(self):
         """Main monitoring loop."""
         while self.monitoring:
+            self.wakeups += 1
+            stall_watchdog.beat('performance_monitor', self.interval * 2 + 30)
             try:
                 self._collect_metrics()
+                timeseries_store.flush()
+                thread_registry.sample()
                 self._check_thresholds()
-                time.sleep(interval)
             except Exception as e:
                 self.logger.error(f"Monitoring error: {e}")
-                time.sleep(interval)
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
     
     def _collect_metrics(self):
-        """Collect current performance metrics."""
-        timestamp = datetime.now()
-        
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self.cpu_history.append((timestamp, cpu_percent))
+        """Collect current performance metrics from the shared sampler."""
+        metrics = system_metrics.latest()
+        timestamp = datetime.fromtimestamp(metrics.timestamp)
         
-        # Memory usage
-        memory = psutil.virtual_memory()
-        self.memory_history.append((timestamp, memory.percent))
+        self.cpu_history.append((timestamp, metrics.cpu_percent))
+        self.memory_history.append((timestamp, metrics.memory_percent))
+        timeseries_store.record('cpu_percent', metrics.cpu_percent, metrics.timestamp)
+        timeseries_store.record('memory_percent', metrics.memory_percent, metrics.timestamp)
         
-        # Temperature (Raspberry Pi specific)
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp_raw = int(f.read().strip())
-                temp_celsius = temp_raw / 1000.0
-                self.temperature_history.append((timestamp, temp_celsius))
-        except (FileNotFoundError, ValueError):
-            # Not on Raspberry Pi or thermal info not available
-            pass
+        # Temperature (not available off the Raspberry Pi)
+        if metrics.temperature is not None:
+            self.temperature_history.append((timestamp, metrics.temperature))
+            timeseries_store.record('temperature', metrics.temperature, metrics.timestamp)
     
     def _check_thresholds(self):
         """Check performance thresholds and take action."""
@@ -96,11 +303,8 @@ class PerformanceMonitor:
                 self.logger.warning(f"High CPU temperature: {current_temp:.1f}°C")
     
     def _trigger_gc(self):
-        """Force garbage collection."""
-        before = psutil.virtual_memory().percent
-        gc.collect()
-        after = psutil.virtual_memory().percent
-        self.logger.info(f"Garbage collection: {before:.1f}% -> {after:.1f}% memory")
+        """Force garbage collection (collect_garbage logs the result)."""
+        memory_diagnostics.collect_garbage('monitor_threshold')
     
     def time_operation(self, operation_name: str):
         """Context manager for timing operations."""
@@ -108,10 +312,70 @@ class PerformanceMonitor:
     
     def record_operation_time(self, operation_name: str, duration: float):
         """Record operation timing."""
-        if operation_name not in self.operation_times:
-            self.operation_times[operation_name] = deque(maxlen=50)
+        histogram = self.operation_times.get(operation_name)
+        if histogram is None:
+            with self.operation_lock:
+                histogram = self.operation_times.setdefault(operation_name, LatencyHistogram())
+        
+        histogram.observe(duration)
+        
+        series = TIMESERIES_OPERATIONS.get(operation_name)
+        if series:
+            timeseries_store.record(series, duration * 1000)
+    
+    def increment(self, counter: str, amount: int = 1):
+        """Add to one of the COUNTERS."""
+        with self.counter_lock:
+            self.counters[counter] += amount
+    
+    def get_counters(self) -> Dict[str, int]:
+        """Current value of every counter."""
+        with self.counter_lock:
+            return dict(self.counters)
+    
+    def get_histograms(self) -> Dict[str, LatencyHistogram]:
+        """Every operation histogram by name (shared, do not modify)."""
+        with self.operation_lock:
+            return dict(self.operation_times)
+    
+    @contextmanager
+    def trace_tick(self, boundary: datetime):
+        """Attribute spans on this thread to the minute tick for a boundary.
+        
+        Each pipeline stage enters the same boundary's trace on its own
+        thread, so one tick collects resolve, render and commit spans.
+        """
+        with self.operation_lock:
+            trace = self.tick_traces.get(boundary)
+            if trace is None:
+                trace = self.tick_traces[boundary] = TickTrace(boundary)
+                while len(self.tick_traces) > TRACE_HISTORY:
+                    self.tick_traces.popitem(last=False)
         
-        self.operation_times[operation_name].append(duration)
+        with self._activate_trace(trace):
+            yield trace
+    
+    @contextmanager
+    def trace_request(self):
+        """Attribute spans on this thread to a web request (see RequestTrace)."""
+        with self._activate_trace(RequestTrace()) as trace:
+            yield trace
+    
+    @contextmanager
+    def _activate_trace(self, trace):
+        saved = (getattr(_trace_context, 'trace', None), getattr(_trace_context, 'stack', None),
+                 getattr(_trace_context, 'monitor', None))
+        _trace_context.trace, _trace_context.stack, _trace_context.monitor = trace, [], self
+        try:
+            yield trace
+        finally:
+            _trace_context.trace, _trace_context.stack, _trace_context.monitor = saved
+    
+    def get_tick_traces(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Spans of the most recent minute ticks, newest first."""
+        with self.operation_lock:
+            traces = list(self.tick_traces.values())[-limit:]
+        return [trace.to_dict() for trace in reversed(traces)]
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary."""
@@ -145,16 +409,15 @@ class PerformanceMonitor:
             }
         
         # Operation timing summary
-        timing_summary = {}
-        for op_name, times in self.operation_times.items():
-            if times:
-                timing_summary[op_name] = {
-                    'count': len(times),
-                    'average': sum(times) / len(times),
-                    'min': min(times),
-                    'max': max(times)
-                }
-        summary['operation_times'] = timing_summary
+        with self.operation_lock:
+            histograms = list(self.operation_times.items())
+        summary['operation_times'] = {
+            op_name: histogram.get_summary()
+            for op_name, histogram in histograms
+            if histogram.count
+        }
+        summary['counters'] = self.get_counters()
+        summary['recent_ticks'] = self.get_tick_traces(limit=3)
         
         return summary
 
@@ -167,10 +430,13 @@ class OperationTimer:
         self.start_time = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.start_time:
-            duration = time.time() - self.start_time
-            self.monitor.record_operation_time(self.operation_name, duration)
\ No newline at end of file
+            duration = time.perf_counter() - self.start_time
+            self.monitor.record_operation_time(self.operation_name, duration)
+
+# Global monitor shared by the service, voice control and the web interface
+performance_monitor = PerformanceMonitor()
@@ -11,6 +11,8 @@ import queue
 import numpy as np
 from typing import Optional, Callable, Dict, Any, List
 
+from current_state import current_state
+
 class PorcupineVoiceControl:
     def __init__(self, verse_manager, image_generator, display_manager):
         self.logger = logging.getLogger(__name__)
@@ -247,11 +249,11 @@ class PorcupineVoiceControl:
         self.listening = True
         
         # Start wake word detection thread
-        self.listen_thread = threading.Thread(target=self._porcupine_listen_loop, daemon=True)
+        self.listen_thread = threading.Thread(target=self._porcupine_listen_loop, name='voice-porcupine', daemon=True)
         self.listen_thread.start()
         
         # Start command processing thread
-        self.command_thread = threading.Thread(target=self._command_processing_loop, daemon=True)
+        self.command_thread = threading.Thread(target=self._command_processing_loop, name='voice-commands', daemon=True)
         self.command_thread.start()
         
         self.logger.info("Started Porcupine wake word detection")
@@ -370,7 +372,7 @@ class PorcupineVoiceControl:
                 self.verse_manager.previous_verse()
                 response = "Showing previous verse."
             elif 'speak verse' in command_text or 'read verse' in command_text:
-                current_verse = self.verse_manager.get_current_verse()
+                current_verse = current_state.verse_data(self.verse_manager)
                 if current_verse:
                     response = f"{current_verse.get('reference', '')}: {current_verse.get('text', '')}"
                 else:
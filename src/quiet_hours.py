@@ -0,0 +1,118 @@
+"""
+Quiet-hours schedule and activity accounting for Bible Clock.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, time as dtime
+from typing import Callable, Dict, Any, List, Optional
+
+import clock
+
+def parse_clock_time(value: str) -> dtime:
+    """Parse an HH:MM string."""
+    hour, minute = value.strip().split(':')
+    return dtime(int(hour), int(minute))
+
+class QuietHours:
+    """Daily window (possibly spanning midnight) during which the clock rests."""
+    
+    def __init__(self, start: str = '23:00', end: str = '06:00', enabled: bool = False,
+                 backoff: float = 3600.0, monitor_interval: float = 900.0):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = enabled
+        self.start = parse_clock_time(start)
+        self.end = parse_clock_time(end)
+        self.backoff = backoff                    # Longest gap between periodic jobs while quiet
+        self.monitor_interval = monitor_interval  # Performance sampling interval while quiet
+        
+        if self.start == self.end:
+            self.logger.warning("Quiet hours start and end are equal, disabling quiet hours")
+            self.enabled = False
+    
+    @classmethod
+    def from_env(cls) -> 'QuietHours':
+        """Build the schedule from QUIET_HOURS_* settings."""
+        return cls(
+            start=os.getenv('QUIET_HOURS_START', '23:00'),
+            end=os.getenv('QUIET_HOURS_END', '06:00'),
+            enabled=os.getenv('QUIET_HOURS_ENABLED', 'false').lower() == 'true',
+            backoff=float(os.getenv('QUIET_HOURS_BACKOFF', '3600')),
+            monitor_interval=float(os.getenv('QUIET_MONITOR_INTERVAL', '900'))
+        )
+    
+    def is_quiet(self, at: Optional[datetime] = None) -> bool:
+        """Whether the given time falls inside the quiet window."""
+        if not self.enabled:
+            return False
+        
+        t = (at or clock.now()).time()
+        if self.start < self.end:
+            return self.start <= t < self.end
+        return t >= self.start or t < self.end
+    
+    def window_end(self, at: datetime) -> datetime:
+        """End of the quiet window containing the given time."""
+        end = at.replace(hour=self.end.hour, minute=self.end.minute, second=0, microsecond=0)
+        if end <= at:
+            end += timedelta(days=1)
+        return end
+    
+    def get_info(self) -> Dict[str, Any]:
+        """Get quiet-hours configuration."""
+        return {
+            'enabled': self.enabled,
+            'start': self.start.strftime('%H:%M'),
+            'end': self.end.strftime('%H:%M'),
+            'backoff': self.backoff,
+            'monitor_interval': self.monitor_interval
+        }
+
+class ActivityMeter:
+    """Wakeups and CPU time per hour, kept separately for active and quiet periods."""
+    
+    def __init__(self, wakeup_sources: List[Callable[[], int]]):
+        self.wakeup_sources = wakeup_sources
+        self.totals = {}
+        self.period = 'active'
+        self.lock = threading.Lock()
+        self._mark = self._sample()
+    
+    def _sample(self):
+        return time.monotonic(), time.process_time(), sum(source() for source in self.wakeup_sources)
+    
+    def switch(self, period: str):
+        """Close the running period and start accounting to another one."""
+        with self.lock:
+            self._accumulate()
+            self.period = period
+    
+    def _accumulate(self):
+        now = self._sample()
+        elapsed, cpu, wakeups = (now[i] - self._mark[i] for i in range(3))
+        self._mark = now
+        
+        totals = self.totals.setdefault(self.period, {'seconds': 0.0, 'cpu_seconds': 0.0, 'wakeups': 0})
+        totals['seconds'] += elapsed
+        totals['cpu_seconds'] += cpu
+        totals['wakeups'] += wakeups
+    
+    def get_report(self) -> Dict[str, Any]:
+        """Per-period totals and hourly rates, including the period in progress."""
+        with self.lock:
+            self._accumulate()
+            totals_by_period = {period: dict(totals) for period, totals in self.totals.items()}
+        
+        report = {'current_period': self.period}
+        for period, totals in totals_by_period.items():
+            hours = totals['seconds'] / 3600
+            report[period] = {
+                'hours': round(hours, 3),
+                'cpu_seconds': round(totals['cpu_seconds'], 3),
+                'wakeups': totals['wakeups'],
+                'wakeups_per_hour': round(totals['wakeups'] / hours, 1) if hours else None,
+                'cpu_seconds_per_hour': round(totals['cpu_seconds'] / hours, 3) if hours else None
+            }
+        return report
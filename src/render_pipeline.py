@@ -0,0 +1,359 @@
+"""
+Render-ahead pipeline that prepares each minute's frame before it is shown.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from performance_monitor import span
+from stall_watchdog import stall_watchdog
+from current_state import current_state
+import clock
+
+STAGES = ('resolve', 'render', 'commit')
+
+@dataclass
+class StagedFrame:
+    """Work in flight for one minute boundary."""
+    boundary: datetime
+    resolve_future: Optional[Future] = None
+    resolve_started: float = 0.0
+    render_future: Optional[Future] = None
+    render_started: float = 0.0
+    rendered_at: Optional[datetime] = None  # None when the render was skipped
+
+class RenderPipeline:
+    """Resolve, render and commit the next minute's frame in separate stages.
+    
+    The scheduler calls resolve() about 30 seconds and render() about 15
+    seconds before each boundary; both hand their work to a small worker pool
+    and return at once. commit() runs at :00 and only pushes the staged frame
+    to the panel. A stage that misses its budget is replaced by a local-only
+    fallback so the boundary is never skipped because of a slow API.
+    
+    Every stage runs inside the performance monitor's trace for its
+    boundary, so the spans below it (API fetch, layout, panel refresh, ...)
+    are attributed to the minute tick they were prepared for.
+    
+    Minutes where the verse does not change (most of date mode) skip the
+    resolve and render stages; commit_clock() then only redraws the clock
+    text, or does nothing when no clock text is on screen.
+    
+    Each frame that reaches the panel is published to current_state, where
+    the web interface and voice commands read it.
+    """
+    
+    def __init__(self, verse_manager, image_generator, display_manager, performance_monitor=None):
+        self.logger = logging.getLogger(__name__)
+        self.verse_manager = verse_manager
+        self.image_generator = image_generator
+        self.display_manager = display_manager
+        self.performance_monitor = performance_monitor
+        
+        # Seconds before the boundary at which each stage starts
+        self.resolve_lead = float(os.getenv('PIPELINE_RESOLVE_LEAD', '30'))
+        self.render_lead = float(os.getenv('PIPELINE_RENDER_LEAD', '15'))
+        if not 0 < self.render_lead < self.resolve_lead:
+            self.logger.warning(
+                f"Invalid pipeline leads (resolve {self.resolve_lead}s, render {self.render_lead}s), using 30s/15s"
+            )
+            self.resolve_lead, self.render_lead = 30.0, 15.0
+        
+        # Time each stage may take before its fallback is used
+        self.budgets = {
+            'resolve': float(os.getenv('PIPELINE_RESOLVE_BUDGET', '12')),
+            'render': float(os.getenv('PIPELINE_RENDER_BUDGET', '12')),
+            'commit': float(os.getenv('PIPELINE_COMMIT_BUDGET', '3'))
+        }
+        
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='render-pipeline')
+        self.lock = threading.Lock()
+        self.slots = {}  # boundary -> StagedFrame
+        
+        self.stats = {
+            stage: {'runs': 0, 'misses': 0, 'failures': 0, 'last_ms': None, 'max_ms': 0.0}
+            for stage in STAGES
+        }
+        self.fallback_frames = 0
+        self.render_skips = 0  # Renders avoided because the content key was already on screen
+        self.tick_counts = {'full': 0, 'clock': 0, 'idle': 0}
+        self.last_commit = None
+        self.last_verse_data = None
+        self.last_mode = None
+    
+    def resolve(self, boundary: datetime):
+        """Stage 1: start resolving the verse for a boundary."""
+        with self.lock:
+            # Anything older than this boundary can no longer be shown
+            for stale in [b for b in self.slots if b < boundary]:
+                del self.slots[stale]
+            
+            slot = self.slots.setdefault(boundary, StagedFrame(boundary))
+            slot.resolve_started = time.monotonic()
+            slot.resolve_future = self.executor.submit(self._resolve, boundary)
+    
+    def render(self, boundary: datetime):
+        """Stage 2: start rendering the resolved verse into a back buffer."""
+        with self.lock:
+            slot = self.slots.setdefault(boundary, StagedFrame(boundary))
+            slot.render_started = time.monotonic()
+            slot.render_future = self.executor.submit(self._render, slot)
+    
+    def commit(self, boundary: datetime) -> Dict:
+        """Stage 3: push the staged frame to the panel and return its verse data."""
+        with self._trace(boundary):
+            return self._commit(boundary)
+    
+    def _commit(self, boundary: datetime) -> Dict:
+        with stall_watchdog.watch('pipeline_commit'):
+            return self._commit_staged(boundary)
+    
+    def _commit_staged(self, boundary: datetime) -> Dict:
+        with self.lock:
+            slot = self.slots.pop(boundary, None)
+        
+        staged = None
+        rendered_at = None
+        if slot and slot.render_future:
+            staged = self._await_stage('render', slot.render_future, slot.render_started)
+            rendered_at = slot.rendered_at
+        
+        if staged is None:
+            self._count_fallback()
+            self.logger.warning(f"No staged frame for {boundary.strftime('%H:%M')}, rendering locally")
+            staged = self._render_fallback(boundary, record=not self._resolve_records(slot))
+            rendered_at = clock.now() if staged[1] is not None else None
+        
+        verse_data, image, content_key, clock_layout = staged
+        start = time.perf_counter()
+        with span('pipeline_commit'):
+            if image is None and not self.display_manager.is_showing(content_key):
+                # The panel changed since the render was skipped
+                image, clock_layout = self.image_generator.create_verse_frame(verse_data)
+                rendered_at = clock.now()
+            if image is not None:
+                self.display_manager.display_image(image, content_key=content_key, clock_layout=clock_layout)
+        self._record('commit', time.perf_counter() - start)
+        
+        self._mark_committed(verse_data, content_key, rendered_at)
+        return verse_data
+    
+    def show_now(self, force_refresh: bool = False) -> Dict:
+        """Resolve, render and commit the current minute immediately."""
+        with self._trace(clock.now().replace(second=0, microsecond=0)):
+            return self._show_now(force_refresh)
+    
+    def _show_now(self, force_refresh: bool) -> Dict:
+        verse_data = self.verse_manager.get_current_verse()
+        if force_refresh:
+            image, clock_layout = self.image_generator.create_verse_frame(verse_data)
+            content_key = self.image_generator.get_content_key(verse_data)
+        else:
+            image, content_key, clock_layout = self._render_frame(verse_data)
+        rendered_at = clock.now() if image is not None else None
+        if image is not None:
+            self.display_manager.display_image(image, force_refresh=force_refresh, content_key=content_key,
+                                               clock_layout=clock_layout)
+        self._mark_committed(verse_data, content_key, rendered_at)
+        return verse_data
+    
+    def redraw(self) -> Dict:
+        """Re-render the verse on the panel with a full refresh, e.g. after a background change."""
+        with self._trace(clock.now().replace(second=0, microsecond=0)):
+            verse_data = current_state.verse_data(self.verse_manager)
+            image, clock_layout = self.image_generator.create_verse_frame(verse_data)
+            content_key = self.image_generator.get_content_key(verse_data)
+            self.display_manager.display_image(image, force_refresh=True, content_key=content_key,
+                                               clock_layout=clock_layout)
+            self._mark_committed(verse_data, content_key, clock.now())
+            return verse_data
+    
+    def needs_full_update(self, boundary: datetime) -> bool:
+        """Whether a boundary needs a new verse rather than a clock-only tick."""
+        if self.last_verse_data is None or self.last_mode != self.verse_manager.display_mode:
+            return True
+        if self.is_staged(boundary):
+            return True
+        return self.verse_manager.content_changes_at(boundary)
+    
+    def is_staged(self, boundary: datetime) -> bool:
+        """Whether the prepare stages have started on a boundary."""
+        with self.lock:
+            return boundary in self.slots
+    
+    def commit_clock(self, boundary: datetime) -> Dict:
+        """Minute tick without a verse change: redraw only the clock text, if any."""
+        with self._trace(boundary):
+            return self._commit_clock(boundary)
+    
+    def _commit_clock(self, boundary: datetime) -> Dict:
+        verse_data = self.verse_manager.restamp_verse(self.last_verse_data, boundary)
+        if not verse_data.get('is_date_event'):
+            # Nothing on screen depends on the minute
+            self.tick_counts['idle'] += 1
+            return verse_data
+        
+        content_key = self.image_generator.get_content_key(verse_data)
+        if self.display_manager.is_showing(content_key):
+            self._count_render_skip()
+            self.tick_counts['idle'] += 1
+            return verse_data
+        
+        with span('pipeline_clock'):
+            # The clock layout is kept with the committed frame; renders for
+            # previews or the next boundary never touch it
+            frame, clock_layout = self.display_manager.get_current_frame()
+            update = None
+            if frame is not None:
+                update = self.image_generator.render_clock_update(frame, verse_data, clock_layout)
+            if update is not None:
+                self.display_manager.display_image(update[0], content_key=content_key, clock_layout=update[2])
+        if update is None:
+            return self._commit(boundary)
+        
+        self.tick_counts['clock'] += 1
+        self.last_commit = clock.now()
+        self.last_verse_data = verse_data
+        self._publish(verse_data, content_key, self.last_commit)
+        return verse_data
+    
+    def _mark_committed(self, verse_data: Dict, content_key: Optional[Tuple] = None,
+                        rendered_at: Optional[datetime] = None):
+        self.tick_counts['full'] += 1
+        self.last_commit = clock.now()
+        self.last_verse_data = verse_data
+        self.last_mode = self.verse_manager.display_mode
+        self._publish(verse_data, content_key, rendered_at)
+    
+    def _publish(self, verse_data: Dict, content_key: Optional[Tuple], rendered_at: Optional[datetime]):
+        """Publish the committed frame; a skipped render keeps the on-screen frame's render time."""
+        previous = current_state.get()
+        if rendered_at is None and previous is not None and previous.content_key == content_key:
+            rendered_at = previous.rendered_at
+        current_state.publish(verse_data, content_key=content_key, mode=self.verse_manager.display_mode,
+                              rendered_at=rendered_at)
+    
+    def shutdown(self):
+        """Stop accepting work and drop staged frames."""
+        with self.lock:
+            self.slots.clear()
+        self.executor.shutdown(wait=False)
+    
+    def _trace(self, boundary: datetime):
+        """Attribute spans on this thread to the tick for a boundary."""
+        if self.performance_monitor is None:
+            return nullcontext()
+        return self.performance_monitor.trace_tick(boundary)
+    
+    def _resolve(self, boundary: datetime) -> Dict:
+        with self._trace(boundary), span('pipeline_resolve'), stall_watchdog.watch('pipeline_resolve'):
+            start = time.perf_counter()
+            verse_data = self.verse_manager.get_current_verse(at=boundary)
+            self._record('resolve', time.perf_counter() - start)
+        return verse_data
+    
+    def _render(self, slot: StagedFrame) -> Tuple[Dict, Any, Tuple, Any]:
+        with self._trace(slot.boundary), stall_watchdog.watch('pipeline_render'):
+            return self._render_staged(slot)
+    
+    def _render_staged(self, slot: StagedFrame) -> Tuple[Dict, Any, Tuple, Any]:
+        verse_data = None
+        if slot.resolve_future:
+            verse_data = self._await_stage('resolve', slot.resolve_future, slot.resolve_started)
+        if verse_data is None:
+            # Resolve missed its budget or never ran; use local data only
+            self._count_fallback()
+            verse_data = self.verse_manager.get_current_verse(at=slot.boundary, offline=True,
+                                                              record=not self._resolve_records(slot))
+        
+        start = time.perf_counter()
+        with span('pipeline_render'):
+            image, content_key, clock_layout = self._render_frame(verse_data)
+        self._record('render', time.perf_counter() - start)
+        if image is not None:
+            slot.rendered_at = clock.now()
+        return verse_data, image, content_key, clock_layout
+    
+    def _render_fallback(self, boundary: datetime, record: bool = True) -> Tuple[Dict, Any, Tuple, Any]:
+        verse_data = self.verse_manager.get_current_verse(at=boundary, offline=True, record=record)
+        return (verse_data,) + self._render_frame(verse_data)
+    
+    def _resolve_records(self, slot: Optional[StagedFrame]) -> bool:
+        """Whether the slot's resolve stage counts the verse itself.
+        
+        A resolve that missed its budget keeps running and records the verse
+        when it finishes, so a local fallback must not record it again; one
+        that failed or never started recorded nothing.
+        """
+        future = slot.resolve_future if slot else None
+        if future is None:
+            return False
+        return not future.done() or future.exception() is None
+    
+    def _count_fallback(self):
+        with self.lock:
+            self.fallback_frames += 1
+    
+    def _render_frame(self, verse_data: Dict) -> Tuple[Any, Tuple, Any]:
+        """Render verse data unless the panel already shows it.
+        
+        Returns (image, content_key, clock_layout); image and clock_layout
+        are None when rendering was skipped.
+        """
+        content_key = self.image_generator.get_content_key(verse_data)
+        if self.display_manager.is_showing(content_key):
+            self._count_render_skip()
+            return None, content_key, None
+        image, clock_layout = self.image_generator.create_verse_frame(verse_data)
+        return image, content_key, clock_layout
+    
+    def _count_render_skip(self):
+        self.render_skips += 1
+        if self.performance_monitor:
+            self.performance_monitor.increment('render_cache_hits')
+    
+    def _await_stage(self, stage: str, future: Future, started: float):
+        """Wait for a stage until its budget runs out; None if it missed or failed."""
+        remaining = started + self.budgets[stage] - time.monotonic()
+        try:
+            return future.result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            self.stats[stage]['misses'] += 1
+            self.logger.warning(f"Pipeline {stage} stage missed its {self.budgets[stage]:.1f}s budget")
+        except Exception as e:
+            self.stats[stage]['failures'] += 1
+            self.logger.error(f"Pipeline {stage} stage failed: {e}")
+        return None
+    
+    def _record(self, stage: str, duration: float):
+        stats = self.stats[stage]
+        stats['runs'] += 1
+        stats['last_ms'] = round(duration * 1000, 2)
+        stats['max_ms'] = max(stats['max_ms'], stats['last_ms'])
+        
+        if stage == 'commit' and duration > self.budgets['commit']:
+            stats['misses'] += 1
+            self.logger.warning(f"Panel commit took {duration:.2f}s (budget {self.budgets['commit']:.1f}s)")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get pipeline configuration and per-stage statistics."""
+        with self.lock:
+            staged = sorted(b.isoformat() for b in self.slots)
+        return {
+            'resolve_lead': self.resolve_lead,
+            'render_lead': self.render_lead,
+            'budgets': dict(self.budgets),
+            'stages': {stage: dict(stats) for stage, stats in self.stats.items()},
+            'fallback_frames': self.fallback_frames,
+            'ticks': dict(self.tick_counts),
+            'skipped_renders': self.render_skips,
+            'staged_boundaries': staged,
+            'last_commit': self.last_commit.isoformat() if self.last_commit else None
+        }
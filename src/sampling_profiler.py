@@ -0,0 +1,140 @@
+"""
+On-demand stack-sampling profiler for the running Bible Clock service.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+class ProfileResult:
+    """Stack samples collected over one profiling run."""
+    
+    def __init__(self, started: datetime, duration: float, interval: float):
+        self.started = started
+        self.duration = duration
+        self.interval = interval
+        self.samples = 0
+        self.stacks = Counter()        # "thread;outer;...;inner" -> samples
+        self.thread_samples = Counter()
+        self.overhead = 0.0            # Seconds spent taking samples
+    
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+    
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions with the most samples at the top of the stack."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {'function': function, 'samples': count, 'percent': round(100.0 * count / total, 1)}
+            for function, count in leaves.most_common(limit)
+        ]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started': self.started.isoformat(),
+            'duration': round(self.duration, 3),
+            'interval_ms': round(self.interval * 1000, 2),
+            'samples': self.samples,
+            'overhead_percent': round(100.0 * self.overhead / self.duration, 2) if self.duration else None,
+            'threads': dict(self.thread_samples.most_common()),
+            'top_functions': self.top_functions()
+        }
+
+class SamplingProfiler:
+    """Samples the Python stacks of every thread at a fixed interval.
+    
+    Uses sys._current_frames(), so it needs no tracing hooks, costs nothing
+    while idle, and can be started inside the running service. Samples are
+    wall-clock: a thread blocked in a wait shows up in that wait, which is
+    usually what explains a sluggish clock.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.interval = float(os.getenv('PROFILE_INTERVAL', '0.01'))
+        self.max_duration = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+        self.lock = threading.Lock()  # One profiling run at a time
+        self.last_result = None
+        self._labels = {}  # code object -> frame label
+    
+    @property
+    def running(self) -> bool:
+        return self.lock.locked()
+    
+    def profile(self, duration: float, interval: Optional[float] = None) -> ProfileResult:
+        """Sample all threads for the given number of seconds and return the result.
+        
+        Blocks the calling thread, which is left out of the samples. Raises
+        RuntimeError if another run is in progress.
+        """
+        duration = min(max(duration, 0.1), self.max_duration)
+        interval = max(interval or self.interval, 0.001)
+        if not self.lock.acquire(blocking=False):
+            raise RuntimeError("A profiling run is already in progress")
+        
+        try:
+            self.logger.info(f"Profiling all threads for {duration:.1f}s ({interval * 1000:.0f}ms interval)")
+            result = self._sample(duration, interval, exclude={threading.get_ident()})
+            self.last_result = result
+            self.logger.info(f"Profile complete: {result.samples} samples, "
+                             f"{result.to_dict()['overhead_percent']}% overhead")
+            return result
+        finally:
+            self.lock.release()
+    
+    def _sample(self, duration: float, interval: float, exclude: set) -> ProfileResult:
+        result = ProfileResult(datetime.now(), duration, interval)
+        start = time.perf_counter()
+        deadline = start + duration
+        next_sample = start
+        
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+                continue
+            
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in exclude:
+                    continue
+                thread_name = names.get(ident, f'thread-{ident}')
+                result.stacks[self._collapse(thread_name, frame)] += 1
+                result.thread_samples[thread_name] += 1
+            result.samples += 1
+            
+            sampled = time.perf_counter()
+            result.overhead += sampled - now
+            next_sample += interval
+            if next_sample < sampled:
+                # Sampling fell behind; skip missed ticks rather than bursting
+                next_sample = sampled + interval
+        
+        result.duration = time.perf_counter() - start
+        return result
+    
+    def _collapse(self, thread_name: str, frame) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name.replace(';', ':'))
+        return ';'.join(reversed(labels))
+
+# Global profiler shared by the web interface
+profiler = SamplingProfiler()
@@ -2,64 +2,204 @@
 Advanced scheduling system for Bible Clock.
 """
 
-import schedule
+import os
+import heapq
+import queue
 import threading
 import time
 import logging
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime, timedelta, time as dtime
 from typing import Callable, Dict, Any, Optional
 
+from performance_monitor import performance_monitor
+from stall_watchdog import stall_watchdog
+import clock
+
+# Re-anchor deadlines when the wall clock steps by more than this (NTP, RTC sync)
+CLOCK_STEP_TOLERANCE = 0.25
+
+# Longest single sleep, so wall-clock steps are noticed even when no job is due
+MAX_SLEEP = 300.0
+
+# Job priorities; lower values are picked first when workers are busy
+PRIORITY_CRITICAL = 0
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 50
+PRIORITY_LOW = 90
+
+# What to do when a job comes due while its previous run is still in flight
+OVERLAP_POLICIES = ('skip', 'queue', 'cancel')
+
+# How a job behaves during quiet hours: unaffected, stretched out, or not run at all
+QUIET_POLICIES = ('run', 'backoff', 'skip')
+
+def next_minute_boundary(after: datetime) -> datetime:
+    """First :00 second strictly after the given time."""
+    return after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+class ScheduledJob:
+    """A job with an absolute wall-clock target and a monotonic deadline.
+    
+    Overlap policies: 'skip' drops a run that comes due while the previous
+    one is still in flight, 'queue' runs it once the previous one finishes
+    and 'cancel' additionally sets cancel_event, which is passed to the
+    callback so it can stop early. Runs that cannot start within max_delay
+    seconds of their deadline are dropped and counted as missed.
+    
+    Quiet policies: 'run' ignores quiet hours, 'backoff' runs at most once
+    per quiet backoff period and 'skip' waits for the end of quiet hours.
+    """
+    
+    def __init__(self, name: str, callback: Callable, trigger: Callable[[datetime], datetime],
+                 lead_time: float = 0.0, pass_target: bool = False, kwargs: Optional[Dict] = None,
+                 priority: int = PRIORITY_NORMAL, overlap: str = 'skip', max_delay: Optional[float] = None,
+                 quiet: str = 'backoff'):
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Unsupported overlap policy: {overlap}")
+        if quiet not in QUIET_POLICIES:
+            raise ValueError(f"Unsupported quiet policy: {quiet}")
+        
+        self.name = name
+        self.callback = callback
+        self.trigger = trigger  # Maps "previous target" -> next target (wall clock)
+        self.lead_time = lead_time
+        self.pass_target = pass_target
+        self.kwargs = kwargs or {}
+        self.priority = priority
+        self.overlap = overlap
+        self.max_delay = max_delay
+        self.quiet = quiet
+        
+        self.next_target = None  # Wall-clock time the job is aiming for
+        self.deadline = None     # Monotonic time the job should start (target - lead)
+        self.last_run = None
+        self.run_count = 0
+        self.error_count = 0
+        self.jitter = deque(maxlen=100)  # Start lateness in seconds
+        
+        self.in_flight = False   # Queued for or running on a worker
+        self.pending = None      # (deadline, target) of a run waiting for the current one
+        self.cancel_event = threading.Event()
+        self.last_duration = None
+        self.missed_deadlines = 0
+        self.skipped_runs = 0
+        self.cancelled_runs = 0
+    
+    def run(self, target: Optional[datetime] = None):
+        """Invoke the job callback."""
+        kwargs = dict(self.kwargs)
+        if self.overlap == 'cancel':
+            kwargs['cancel_event'] = self.cancel_event
+        if self.pass_target:
+            return self.callback(target or self.next_target, **kwargs)
+        return self.callback(**kwargs)
+    
+    def jitter_summary(self) -> Optional[Dict[str, float]]:
+        """Start-time jitter statistics in milliseconds."""
+        if not self.jitter:
+            return None
+        values = sorted(self.jitter)
+        return {
+            'last_ms': round(self.jitter[-1] * 1000, 2),
+            'avg_ms': round(sum(values) / len(values) * 1000, 2),
+            'p95_ms': round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2),
+            'samples': len(values)
+        }
+
 class AdvancedScheduler:
-    """Enhanced scheduler with more sophisticated timing options."""
+    """Deadline-driven scheduler.
+    
+    Keeps jobs in a heap ordered by their next deadline and sleeps until
+    exactly that deadline on the monotonic clock instead of polling. Targets
+    are absolute wall-clock times, so sleep overshoot never accumulates, and
+    deadlines are re-anchored if the wall clock is stepped.
+    
+    Due jobs are handed to a small worker pool through a priority queue, so
+    a slow maintenance job never delays the verse update.
+    """
     
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
         self.jobs = {}
         self.running = False
         self.thread = None
+        self.worker_count = max(1, workers or int(os.getenv('SCHEDULER_WORKERS', '3')))
+        self.workers = []
+        
+        self._ready = queue.PriorityQueue()
+        self._heap = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._clock_offset = time.time() - time.monotonic()
+        
+        self.quiet_hours = None
+        self.quiet_backoff = 3600.0
+        self.wakeups = 0  # Dispatcher loop iterations, for activity reporting
     
-    def schedule_verse_updates(self, callback: Callable):
-        """Schedule verse updates with smart timing."""
-        # Main update at start of each minute
-        job = schedule.every().minute.at(":00").do(callback)
-        self.jobs['verse_update'] = job
+    def schedule_verse_updates(self, callback: Callable, lead_time: float = 0.0, max_delay: float = 30.0):
+        """Schedule verse updates at the start of each minute.
         
-        # Also update at 30 seconds for book summaries (minute 0)
-        def smart_update():
-            now = datetime.now()
-            if now.minute == 0 and now.second >= 30:
-                callback()
+        The callback runs lead_time seconds before each boundary and receives
+        the boundary as a datetime. A frame that cannot start within
+        max_delay seconds is dropped in favour of the next minute.
+        """
+        self.schedule_minute_job('verse_update', callback, lead_time=lead_time,
+                                 priority=PRIORITY_CRITICAL, overlap='queue', max_delay=max_delay)
+    
+    def schedule_minute_job(self, name: str, callback: Callable, lead_time: float = 0.0,
+                            priority: int = PRIORITY_HIGH, overlap: str = 'skip', max_delay: Optional[float] = None,
+                            next_boundary: Callable[[datetime], datetime] = next_minute_boundary, quiet: str = 'skip'):
+        """Schedule a job lead_time seconds before every minute boundary.
         
-        job = schedule.every(30).seconds.do(smart_update)
-        self.jobs['smart_update'] = job
+        The callback receives the boundary it is working towards, so several
+        jobs with different leads can prepare the same minute in stages.
+        next_boundary can narrow this to the minutes where something changes.
+        """
+        def trigger(last: Optional[datetime]) -> datetime:
+            now = clock.now()
+            return next_boundary(max(now, last) if last else now)
+        
+        self._add_job(ScheduledJob(name, callback, trigger, lead_time=lead_time, pass_target=True,
+                                   priority=priority, overlap=overlap, max_delay=max_delay, quiet=quiet))
     
     def schedule_background_cycling(self, callback: Callable, interval_hours: int = 4):
         """Schedule automatic background cycling."""
-        job = schedule.every(interval_hours).hours.do(callback)
-        self.jobs['background_cycle'] = job
+        self._add_job(ScheduledJob('background_cycle', callback, self._interval_trigger(interval_hours * 3600),
+                                   priority=PRIORITY_LOW, quiet='skip'))
     
     def schedule_maintenance(self, callback: Callable):
         """Schedule maintenance tasks."""
         # Daily maintenance at 3 AM
-        job = schedule.every().day.at("03:00").do(callback)
-        self.jobs['daily_maintenance'] = job
+        self._add_job(ScheduledJob('daily_maintenance', callback, self._daily_trigger(3, 0),
+                                   priority=PRIORITY_LOW, overlap='queue', quiet='run'))
+    
+    def schedule_daily(self, name: str, at: dtime, callback: Callable, priority: int = PRIORITY_NORMAL):
+        """Schedule a job at a fixed local time every day, regardless of quiet hours."""
+        self._add_job(ScheduledJob(name, callback, self._daily_trigger(at.hour, at.minute),
+                                   priority=priority, overlap='queue', quiet='run'))
     
-    def schedule_custom(self, name: str, when: str, callback: Callable, **kwargs):
+    def schedule_custom(self, name: str, when: str, callback: Callable, priority: int = PRIORITY_NORMAL,
+                        overlap: str = 'skip', max_delay: Optional[float] = None, quiet: str = 'backoff', **kwargs):
         """Schedule custom job."""
         if when == 'hourly':
-            job = schedule.every().hour.do(callback, **kwargs)
+            trigger = self._interval_trigger(3600)
         elif when == 'daily':
-            job = schedule.every().day.do(callback, **kwargs)
+            trigger = self._interval_trigger(86400)
         elif when.startswith('every_'):
             # Format: every_30_minutes, every_2_hours
             parts = when.split('_')
             if len(parts) == 3:
                 interval = int(parts[1])
                 unit = parts[2]
-                if unit == 'minutes':
-                    job = schedule.every(interval).minutes.do(callback, **kwargs)
+                if unit == 'seconds':
+                    trigger = self._interval_trigger(interval)
+                elif unit == 'minutes':
+                    trigger = self._interval_trigger(interval * 60)
                 elif unit == 'hours':
-                    job = schedule.every(interval).hours.do(callback, **kwargs)
+                    trigger = self._interval_trigger(interval * 3600)
                 else:
                     raise ValueError(f"Unsupported time unit: {unit}")
             else:
@@ -67,43 +207,245 @@ class AdvancedScheduler:
         else:
             raise ValueError(f"Unsupported schedule type: {when}")
         
-        self.jobs[name] = job
+        self._add_job(ScheduledJob(name, callback, trigger, kwargs=kwargs,
+                                   priority=priority, overlap=overlap, max_delay=max_delay, quiet=quiet))
         self.logger.info(f"Scheduled job '{name}' for {when}")
     
+    def rearm(self, name: str):
+        """Recompute a job's next target, e.g. after the content it tracks changed schedule."""
+        with self._lock:
+            job = self.jobs.get(name)
+            if job is None:
+                return
+            self._arm(job, self._next_target(job, None))
+        self._wakeup.set()
+    
+    def set_quiet_hours(self, quiet_hours, backoff: float = 3600.0):
+        """Apply a QuietHours schedule to every job's quiet policy."""
+        with self._lock:
+            self.quiet_hours = quiet_hours
+            self.quiet_backoff = backoff
+            for job in self.jobs.values():
+                self._arm(job, self._next_target(job, None))
+        self._wakeup.set()
+    
+    def _next_target(self, job: ScheduledJob, last: Optional[datetime]) -> datetime:
+        """Next target from the job's trigger, adjusted for quiet hours."""
+        target = job.trigger(last)
+        quiet = self.quiet_hours
+        if quiet is None or job.quiet == 'run' or not quiet.is_quiet(target):
+            return target
+        
+        end = quiet.window_end(target)
+        if job.quiet == 'skip':
+            return job.trigger(end - timedelta(seconds=1))
+        
+        # Back off: at most one run per backoff period, resuming normally at the window end
+        base = last or clock.now()
+        return min(end, max(target, base + timedelta(seconds=self.quiet_backoff)))
+    
+    def _interval_trigger(self, seconds: float) -> Callable[[Optional[datetime]], datetime]:
+        """Fixed-rate trigger anchored to the previous target rather than the finish time."""
+        if seconds <= 0:
+            raise ValueError(f"Invalid interval: {seconds}")
+        
+        def trigger(last: Optional[datetime]) -> datetime:
+            now = clock.now()
+            if last is None:
+                return now + timedelta(seconds=seconds)
+            target = last + timedelta(seconds=seconds)
+            if target <= now:
+                # Fell behind (suspend, long job); skip missed runs instead of bunching them
+                missed = int((now - target).total_seconds() // seconds) + 1
+                target += timedelta(seconds=seconds * missed)
+            return target
+        return trigger
+    
+    def _daily_trigger(self, hour: int, minute: int) -> Callable[[Optional[datetime]], datetime]:
+        """Trigger at a fixed local time each day."""
+        def trigger(last: Optional[datetime]) -> datetime:
+            # Never return the target just run, even if it ran a fraction early
+            base = max(clock.now(), last) if last else clock.now()
+            target = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= base:
+                target += timedelta(days=1)
+            return target
+        return trigger
+    
+    def _add_job(self, job: ScheduledJob):
+        """Register a job and compute its first deadline."""
+        with self._lock:
+            self.jobs[job.name] = job
+            self._arm(job, self._next_target(job, None))
+        self._wakeup.set()
+    
+    def _arm(self, job: ScheduledJob, target: datetime):
+        """Set a job's target and push its deadline onto the heap (caller holds the lock)."""
+        job.next_target = target
+        job.deadline = target.timestamp() - job.lead_time - self._clock_offset
+        self._sequence += 1
+        heapq.heappush(self._heap, (job.deadline, self._sequence, job))
+    
+    def _reanchor_if_clock_stepped(self):
+        """Recompute deadlines from wall-clock targets if the wall clock jumped."""
+        offset = time.time() - time.monotonic()
+        if abs(offset - self._clock_offset) <= CLOCK_STEP_TOLERANCE:
+            return
+        
+        self.logger.warning(f"Wall clock stepped by {offset - self._clock_offset:+.2f}s, re-anchoring schedule")
+        with self._lock:
+            self._clock_offset = offset
+            self._heap = []
+            for job in self.jobs.values():
+                self._arm(job, self._next_target(job, None) if job.next_target is None else job.next_target)
+    
     def start(self):
-        """Start the scheduler in a background thread."""
+        """Start the dispatcher and worker threads."""
         if self.running:
             return
         
         self.running = True
-        self.thread = threading.Thread(target=self._run_scheduler, daemon=True)
+        self._wakeup.clear()
+        self.workers = [
+            threading.Thread(target=self._run_worker, name=f'scheduler-worker-{i + 1}', daemon=True)
+            for i in range(self.worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+        self.thread = threading.Thread(target=self._run_scheduler, name='scheduler', daemon=True)
         self.thread.start()
-        self.logger.info("Advanced scheduler started")
+        self.logger.info(f"Advanced scheduler started with {self.worker_count} workers")
     
     def stop(self):
         """Stop the scheduler."""
         self.running = False
+        self._wakeup.set()
+        with self._lock:
+            for _ in self.workers:
+                self._sequence += 1
+                self._ready.put((-1, 0.0, self._sequence, None, None))
         if self.thread:
             self.thread.join(timeout=1)
+        for worker in self.workers:
+            worker.join(timeout=1)
+        self.workers = []
+        stall_watchdog.forget('scheduler')
         self.logger.info("Advanced scheduler stopped")
     
     def _run_scheduler(self):
-        """Run the scheduler loop."""
+        """Sleep until the earliest deadline, dispatch the due job and re-arm it."""
         while self.running:
+            self.wakeups += 1
+            stall_watchdog.beat('scheduler', MAX_SLEEP + 60)
             try:
-                schedule.run_pending()
-                time.sleep(1)
+                self._reanchor_if_clock_stepped()
+                
+                timeout = None
+                with self._lock:
+                    self._discard_stale_entries()
+                    if self._heap:
+                        deadline = self._heap[0][0]
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            job = heapq.heappop(self._heap)[2]
+                            self._dispatch(job, deadline, job.next_target)
+                            # Re-arm straight away so run time never shifts the next target
+                            self._arm(job, self._next_target(job, job.next_target))
+                            continue
+                
+                self._wakeup.wait(MAX_SLEEP if timeout is None else min(timeout, MAX_SLEEP))
+                self._wakeup.clear()
             except Exception as e:
                 self.logger.error(f"Scheduler error: {e}")
-                time.sleep(5)  # Wait before retrying
+                self._wakeup.wait(5)  # Wait before retrying
+    
+    def _discard_stale_entries(self):
+        """Drop heap entries for jobs that were re-armed or replaced (caller holds the lock)."""
+        while self._heap:
+            deadline, _, job = self._heap[0]
+            if job.deadline == deadline and self.jobs.get(job.name) is job:
+                return
+            heapq.heappop(self._heap)
+    
+    def _dispatch(self, job: ScheduledJob, deadline: float, target: datetime):
+        """Queue a due run, applying the job's overlap policy (caller holds the lock)."""
+        if job.in_flight:
+            if job.overlap == 'skip':
+                job.skipped_runs += 1
+                self.logger.warning(f"Job '{job.name}' still running, skipping this run")
+                return
+            if job.overlap == 'cancel':
+                job.cancel_event.set()
+                job.cancelled_runs += 1
+            # Only the most recent waiting run is kept
+            job.pending = (deadline, target)
+            return
+        
+        job.in_flight = True
+        self._sequence += 1
+        self._ready.put((job.priority, deadline, self._sequence, job, target))
+    
+    def _run_worker(self):
+        """Take due runs off the priority queue and execute them."""
+        while True:
+            _, deadline, _, job, target = self._ready.get()
+            if job is None:
+                return
+            
+            try:
+                self._execute(job, deadline, target)
+            finally:
+                with self._lock:
+                    job.in_flight = False
+                    if job.pending and self.running:
+                        pending_deadline, pending_target = job.pending
+                        job.pending = None
+                        self._dispatch(job, pending_deadline, pending_target)
+    
+    def _execute(self, job: ScheduledJob, deadline: float, target: datetime):
+        """Run one job, recording its start jitter and duration."""
+        lateness = max(0.0, time.monotonic() - deadline)
+        if job.max_delay is not None and lateness > job.max_delay:
+            job.missed_deadlines += 1
+            self.logger.warning(f"Job '{job.name}' dropped, started {lateness:.1f}s late")
+            return
+        
+        job.jitter.append(lateness)
+        performance_monitor.record_operation_time(f'scheduler_jitter.{job.name}', lateness)
+        job.last_run = clock.now()
+        job.run_count += 1
+        job.cancel_event.clear()
+        start = time.perf_counter()
+        try:
+            job.run(target)
+        except Exception as e:
+            job.error_count += 1
+            self.logger.error(f"Job '{job.name}' failed: {e}")
+        finally:
+            job.last_duration = time.perf_counter() - start
     
     def get_job_status(self) -> Dict[str, Any]:
         """Get status of all scheduled jobs."""
         status = {}
-        for name, job in self.jobs.items():
+        with self._lock:
+            jobs = list(self.jobs.items())
+        for name, job in jobs:
             status[name] = {
-                'next_run': job.next_run.isoformat() if job.next_run else None,
-                'last_run': getattr(job, 'last_run', None),
-                'job_func': job.job_func.__name__ if job.job_func else None
+                'next_run': job.next_target.isoformat() if job.next_target else None,
+                'last_run': job.last_run.isoformat() if job.last_run else None,
+                'job_func': getattr(job.callback, '__name__', None),
+                'lead_time': job.lead_time,
+                'priority': job.priority,
+                'overlap': job.overlap,
+                'max_delay': job.max_delay,
+                'quiet': job.quiet,
+                'running': job.in_flight,
+                'run_count': job.run_count,
+                'error_count': job.error_count,
+                'missed_deadlines': job.missed_deadlines,
+                'skipped_runs': job.skipped_runs,
+                'cancelled_runs': job.cancelled_runs,
+                'last_duration_ms': round(job.last_duration * 1000, 2) if job.last_duration is not None else None,
+                'jitter': job.jitter_summary()
             }
-        return status
\ No newline at end of file
+        return status
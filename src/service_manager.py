@@ -7,14 +7,23 @@ import time
 import logging
 import schedule
 import threading
-import psutil
 from datetime import datetime, timedelta
 from typing import Optional
 
+import clock
 from error_handler import error_handler
 from config_validator import ConfigValidator
-from scheduler import AdvancedScheduler
-from performance_monitor import PerformanceMonitor
+from scheduler import AdvancedScheduler, PRIORITY_CRITICAL, PRIORITY_LOW
+from performance_monitor import performance_monitor
+from render_pipeline import RenderPipeline
+from quiet_hours import QuietHours, ActivityMeter
+from system_metrics import system_metrics
+from memory_diagnostics import memory_diagnostics
+from thread_registry import thread_registry
+from stall_watchdog import stall_watchdog
+from timeseries_store import timeseries_store
+from current_state import current_state
+from event_bus import event_bus
 
 class ServiceManager:
     def __init__(self, verse_manager, image_generator, display_manager, voice_control=None, web_interface=None):
@@ -23,9 +32,11 @@ class ServiceManager:
         self.display_manager = display_manager
         self.voice_control = voice_control
         self.web_interface = web_interface
+        self.web_server = None  # Production WSGI server, when the web interface runs one
         
         self.logger = logging.getLogger(__name__)
         self.running = False
+        self.stop_event = threading.Event()
         self.last_update = None
         self.error_count = 0
         self.max_errors = 10
@@ -37,7 +48,21 @@ class ServiceManager:
         # Initialize new components
         self.config_validator = ConfigValidator()
         self.scheduler = AdvancedScheduler()
-        self.performance_monitor = PerformanceMonitor()
+        self.performance_monitor = performance_monitor
+        self.render_pipeline = RenderPipeline(
+            verse_manager, image_generator, display_manager, self.performance_monitor
+        )
+        
+        # Quiet hours: panel asleep and periodic work backed off overnight
+        self.quiet_hours = QuietHours.from_env()
+        self.quiet_active = False
+        self.monitor_interval = float(os.getenv('MONITOR_INTERVAL', '30'))
+        self.metrics_interval = system_metrics.interval
+        self.activity = ActivityMeter([
+            lambda: self.scheduler.wakeups,
+            lambda: self.performance_monitor.wakeups,
+            lambda: system_metrics.wakeups
+        ])
         
         # Validate configuration on startup
         if not self.config_validator.validate_all():
@@ -49,12 +74,46 @@ class ServiceManager:
             if report['errors']:  # Only fail on errors, not warnings
                 raise RuntimeError("Configuration validation failed")
         
+        self._register_memory_components()
+        
         # Schedule verse updates
         self._schedule_updates()
     
+    def _register_memory_components(self):
+        """Tell memory diagnostics which objects each component retains."""
+        memory_diagnostics.register('backgrounds', lambda: self.image_generator.backgrounds)
+        memory_diagnostics.register('fonts', lambda: [
+            getattr(self.image_generator, name, None) for name in ('title_font', 'verse_font', 'reference_font')
+        ])
+        memory_diagnostics.register('verse_data', lambda: [
+            getattr(self.verse_manager, name, None)
+            for name in ('kjv_bible', 'book_summaries', 'biblical_calendar', 'bible_structure', 'fallback_verses')
+        ])
+        memory_diagnostics.register('frames', lambda: [
+            self.display_manager.current_frame,
+            getattr(self.display_manager.simulation_sink, 'frames', None)
+        ])
+        memory_diagnostics.register('caches', lambda: [
+            self.render_pipeline.slots, self.render_pipeline.last_verse_data,
+            self.performance_monitor.tick_traces, self.performance_monitor.operation_times
+        ])
+        if self.voice_control:
+            # VoiceAssistant (main.py) keeps its history in a ConversationManager and
+            # queues replies for TTS; BibleClockVoiceControl keeps plain lists
+            memory_diagnostics.register('voice', lambda: [
+                getattr(self.voice_control, name, None)
+                for name in ('conversation_manager', 'tts_queue', 'conversation_history', 'token_usage_stats')
+            ])
+    
     def _schedule_updates(self):
         """Schedule regular verse updates using advanced scheduler."""
-        # Use advanced scheduler for verse updates
+        # Resolve and render ahead of each minute whose verse changes, and tick every minute
+        self.scheduler.schedule_minute_job('verse_resolve', self.render_pipeline.resolve,
+                                           lead_time=self.render_pipeline.resolve_lead,
+                                           next_boundary=self.verse_manager.get_next_content_change)
+        self.scheduler.schedule_minute_job('verse_render', self.render_pipeline.render,
+                                           lead_time=self.render_pipeline.render_lead,
+                                           next_boundary=self.verse_manager.get_next_content_change)
         self.scheduler.schedule_verse_updates(self._update_verse)
         
         # Schedule background cycling
@@ -65,8 +124,22 @@ class ServiceManager:
         
         # Schedule performance monitoring
         self.scheduler.schedule_custom('health_check', 'every_5_minutes', self._health_check)
-        self.scheduler.schedule_custom('garbage_collect', f'every_{self.gc_interval//60}_minutes', self._garbage_collect)
-        self.scheduler.schedule_custom('force_refresh', 'hourly', self._force_refresh)
+        self.scheduler.schedule_custom('garbage_collect', f'every_{self.gc_interval//60}_minutes', self._garbage_collect,
+                                       priority=PRIORITY_LOW)
+        self.scheduler.schedule_custom('force_refresh', 'hourly', self._force_refresh, quiet='skip')
+        self.scheduler.schedule_custom('save_statistics', 'every_15_minutes', self.verse_manager.save_statistics,
+                                       priority=PRIORITY_LOW)
+        if memory_diagnostics.tracemalloc_enabled:
+            self.scheduler.schedule_custom('memory_snapshot', f'every_{int(memory_diagnostics.snapshot_interval)}_seconds',
+                                           memory_diagnostics.take_snapshot, priority=PRIORITY_LOW, quiet='run')
+        
+        # Quiet hours
+        if self.quiet_hours.enabled:
+            self.scheduler.set_quiet_hours(self.quiet_hours, backoff=self.quiet_hours.backoff)
+            self.scheduler.schedule_daily('quiet_hours_start', self.quiet_hours.start, self._enter_quiet_hours,
+                                          priority=PRIORITY_CRITICAL)
+            self.scheduler.schedule_daily('quiet_hours_end', self.quiet_hours.end, self._exit_quiet_hours,
+                                          priority=PRIORITY_CRITICAL)
         
         self.logger.info("Advanced update schedule configured")
     
@@ -74,8 +147,11 @@ class ServiceManager:
         """Main service loop."""
         self.running = True
         
-        # Start performance monitoring
-        self.performance_monitor.start_monitoring()
+        # Start the shared metrics sampler, memory tracing, stall watchdog and performance monitoring
+        system_metrics.start()
+        memory_diagnostics.start()
+        stall_watchdog.start()
+        self.performance_monitor.start_monitoring(self.monitor_interval)
         
         # Start advanced scheduler
         self.scheduler.start()
@@ -86,6 +162,7 @@ class ServiceManager:
         
         # Start voice control if available (runs in blocking mode)
         if self.voice_control:
+            thread_registry.register('voice')
             self.voice_control.run_main_loop()
         elif os.getenv('ENABLE_VOICE', 'false').lower() == 'true':
             # Try to initialize voice control if enabled but not provided
@@ -95,21 +172,25 @@ class ServiceManager:
                     self.verse_manager, self.image_generator, self.display_manager
                 )
                 if self.voice_control.enabled:
+                    thread_registry.register('voice')
                     self.voice_control.run_main_loop()
                     self.logger.info("Voice control auto-initialized")
             except Exception as e:
                 self.logger.error(f"Voice control auto-initialization failed: {e}")
         
-        # Initial verse display
-        self._update_verse()
+        # Initial verse display; inside quiet hours the final frame is the only render
+        if self.quiet_hours.is_quiet():
+            self._enter_quiet_hours()
+        else:
+            self._update_verse()
         
         self.logger.info("Bible Clock service started")
         
         try:
             while self.running:
-                # The advanced scheduler runs in its own thread
-                # Just keep the main thread alive
-                time.sleep(1)
+                # The advanced scheduler runs in its own thread; the main thread
+                # only waits to be stopped
+                self.stop_event.wait(3600)
         except KeyboardInterrupt:
             self.logger.info("Service interrupted by user")
         finally:
@@ -118,10 +199,12 @@ class ServiceManager:
     def stop(self):
         """Stop the service."""
         self.running = False
+        self.stop_event.set()
         
         # Stop all components
         self.scheduler.stop()
         self.performance_monitor.stop_monitoring()
+        system_metrics.stop()
         
         if self.voice_control:
             self.voice_control.stop_listening()
@@ -129,54 +212,120 @@ class ServiceManager:
         if self.web_interface:
             self._stop_web_interface()
         
+        self.render_pipeline.shutdown()
+        self.display_manager.close()
+        stall_watchdog.stop()
+        
+        # Keep statistics for the next run
+        self.verse_manager.save_statistics()
+        timeseries_store.flush()
+        memory_diagnostics.stop()
+        
         self.logger.info("Bible Clock service stopped")
     
-    @error_handler.with_retry(max_retries=2)
-    def _update_verse(self):
-        """Update the displayed verse at precise minute boundaries."""
-        now = datetime.now()
-        
-        # Only update if we're at the start of a minute (0-2 seconds)
-        if now.second <= 2:
-            with self.performance_monitor.time_operation('verse_update'):
-                # Get current verse
-                verse_data = self.verse_manager.get_current_verse()
-                
-                # Generate image
-                image = self.image_generator.create_verse_image(verse_data)
-                
-                # Display image
-                self.display_manager.display_image(image)
-                
-                # Update tracking
-                self.last_update = datetime.now()
+    def _update_verse(self, boundary: Optional[datetime] = None):
+        """Show the verse for a minute boundary.
+        
+        At a boundary where the verse changes, the frame staged by the render
+        pipeline is committed to the panel; other minutes only refresh the
+        clock text. Without a boundary (startup, manual refresh) the current
+        minute is resolved and rendered straight away.
+        """
+        target = boundary or clock.now()
+        
+        try:
+            if boundary and not self.render_pipeline.needs_full_update(boundary):
+                self.render_pipeline.commit_clock(boundary)
+                self.last_update = clock.now()
                 self.error_count = 0
-                
-                self.logger.info(f"Verse updated: {verse_data['reference']} at {now.strftime('%H:%M:%S')}")
-        else:
-            self.logger.debug(f"Skipping verse update at {now.strftime('%H:%M:%S')} - not at minute boundary")
+                return
+            
+            if boundary:
+                if not self.render_pipeline.is_staged(boundary):
+                    # Content changed off its expected schedule (e.g. mode switch)
+                    self.scheduler.rearm('verse_resolve')
+                    self.scheduler.rearm('verse_render')
+                verse_data = self.render_pipeline.commit(boundary)
+            else:
+                with self.performance_monitor.time_operation('verse_update'):
+                    verse_data = self.render_pipeline.show_now()
+            
+            # Update tracking
+            self.last_update = clock.now()
+            self.error_count = 0
+            
+            if boundary:
+                lateness = (self.last_update - boundary).total_seconds()
+                self.performance_monitor.record_operation_time('frame_commit_lateness', max(0.0, lateness))
+            
+            self.logger.info(f"Verse updated: {verse_data['reference']} at {self.last_update.strftime('%H:%M:%S.%f')[:-3]}")
+        except Exception as e:
+            self.error_count += 1
+            self.logger.error(f"Verse update failed for {target.strftime('%H:%M')}: {e}")
+            if self.error_count >= self.max_errors:
+                self.logger.critical(f"Verse update failed {self.error_count} times in a row")
+    
+    def _enter_quiet_hours(self):
+        """Show one final frame, put the panel to sleep and back off periodic work."""
+        if self.quiet_active:
+            return
+        
+        self.logger.info(f"Entering quiet hours until {self.quiet_hours.end.strftime('%H:%M')}")
+        self.quiet_active = True
+        self.activity.switch('quiet')
+        
+        try:
+            # Full refresh so the panel holds a clean frame overnight
+            self.render_pipeline.show_now(force_refresh=True)
+            self.last_update = clock.now()
+        except Exception as e:
+            self.logger.error(f"Final frame before quiet hours failed: {e}")
+        
+        self.display_manager.sleep()
+        self.performance_monitor.set_interval(self.quiet_hours.monitor_interval)
+        system_metrics.set_interval(self.quiet_hours.monitor_interval)
+    
+    def _exit_quiet_hours(self):
+        """Wake the panel and resume normal updates."""
+        if not self.quiet_active:
+            return
+        
+        self.logger.info("Leaving quiet hours")
+        self.quiet_active = False
+        self.activity.switch('active')
+        
+        self.display_manager.wake()
+        self.performance_monitor.set_interval(self.monitor_interval)
+        system_metrics.set_interval(self.metrics_interval)
+        self._update_verse()
     
     def _health_check(self):
         """Perform system health checks."""
         try:
+            metrics = system_metrics.latest()
+            
             # Check memory usage
-            memory_percent = psutil.virtual_memory().percent
+            memory_percent = metrics.memory_percent
             if memory_percent > self.memory_threshold:
                 self.logger.warning(f"High memory usage: {memory_percent}%")
             
-            # Check last update time
-            if self.last_update:
-                time_since_update = datetime.now() - self.last_update
+            # Check last update time (none are expected during quiet hours)
+            if self.last_update and not self.quiet_active:
+                time_since_update = clock.now() - self.last_update
                 if time_since_update > timedelta(minutes=5):
                     self.logger.warning(f"No updates for {time_since_update}")
             
+            # Check for components that missed their heartbeat
+            degraded = stall_watchdog.degraded()
+            if degraded:
+                self.logger.warning(f"Stalled components: {', '.join(degraded)}")
+            
             # Check error rate
             if self.error_count > 5:
                 self.logger.warning(f"High error count: {self.error_count}")
             
             # Check disk space
-            disk_usage = psutil.disk_usage('/')
-            disk_percent = (disk_usage.used / disk_usage.total) * 100
+            disk_percent = (metrics.disk_used / metrics.disk_total) * 100
             if disk_percent > 90:
                 self.logger.warning(f"Low disk space: {disk_percent:.1f}% used")
             
@@ -188,14 +337,7 @@ class ServiceManager:
     def _garbage_collect(self):
         """Force garbage collection to free memory."""
         try:
-            import gc
-            before = psutil.virtual_memory().percent
-            gc.collect()
-            after = psutil.virtual_memory().percent
-            
-            if before - after > 1:  # Only log if significant reduction
-                self.logger.info(f"Garbage collection: {before:.1f}% -> {after:.1f}% memory")
-            
+            memory_diagnostics.collect_garbage('scheduled')
         except Exception as e:
             self.logger.error(f"Garbage collection failed: {e}")
     
@@ -203,9 +345,8 @@ class ServiceManager:
         """Force a full display refresh to prevent ghosting."""
         try:
             self.logger.info("Performing scheduled full refresh")
-            verse_data = self.verse_manager.get_current_verse()
-            image = self.image_generator.create_verse_image(verse_data)
-            self.display_manager.display_image(image, force_refresh=True)
+            verse_data = self.render_pipeline.redraw()
+            event_bus.publish('refresh', {'source': 'scheduled', 'reference': verse_data.get('reference')})
         except Exception as e:
             self.logger.error(f"Force refresh failed: {e}")
     
@@ -214,6 +355,7 @@ class ServiceManager:
         try:
             self.image_generator.cycle_background()
             self.logger.info("Background automatically cycled")
+            event_bus.publish('settings', {'changed': ['background']})
         except Exception as e:
             self.logger.error(f"Background cycling failed: {e}")
     
@@ -253,24 +395,34 @@ class ServiceManager:
             port = int(os.getenv('WEB_PORT', '5000'))
             debug = os.getenv('WEB_DEBUG', 'false').lower() == 'true'
             
-            # Start Flask app in a separate thread
-            def run_web_interface():
-                app.run(host=bind_host, port=port, debug=debug, use_reloader=False)
+            if debug:
+                # Werkzeug development server, with the debugger
+                def run_web_interface():
+                    app.run(host=bind_host, port=port, debug=debug, use_reloader=False)
+            else:
+                from web_server import PooledWSGIServer
+                self.web_server = PooledWSGIServer.from_env(bind_host, port, app)
+                run_web_interface = self.web_server.serve_forever
             
-            self.web_thread = threading.Thread(target=run_web_interface, daemon=True)
+            self.web_thread = threading.Thread(target=run_web_interface, name='web-server', daemon=True)
             self.web_thread.start()
             
-            self.logger.info(f"Web interface started on http://{display_host}:{port}")
+            server = 'development server' if debug else f"{self.web_server.workers} workers"
+            self.logger.info(f"Web interface started on http://{display_host}:{port} ({server})")
             
         except Exception as e:
             self.logger.error(f"Failed to start web interface: {e}")
     
     def _stop_web_interface(self):
-        """Stop the web interface."""
+        """Stop the web interface, letting open requests finish."""
         try:
-            # Flask server will stop when the main thread exits
-            # since we're using daemon threads
-            if hasattr(self, 'web_thread') and self.web_thread.is_alive():
+            event_bus.close()  # Open event streams would hold workers until the grace period ends
+            if self.web_server:
+                self.logger.info("Web interface stopping...")
+                self.web_server.stop(grace=float(os.getenv('WEB_SHUTDOWN_GRACE', '10')))
+                self.web_server = None
+            elif hasattr(self, 'web_thread') and self.web_thread.is_alive():
+                # The development server stops with the process (daemon thread)
                 self.logger.info("Web interface stopping...")
         except Exception as e:
             self.logger.error(f"Error stopping web interface: {e}")
@@ -281,10 +433,19 @@ class ServiceManager:
             'running': self.running,
             'last_update': self.last_update.isoformat() if self.last_update else None,
             'error_count': self.error_count,
-            'memory_usage': psutil.virtual_memory().percent,
+            'memory_usage': system_metrics.latest().memory_percent,
             'display_info': self.display_manager.get_display_info(),
             'background_info': self.image_generator.get_current_background_info(),
             'scheduler_jobs': self.scheduler.get_job_status(),
+            'render_pipeline': self.render_pipeline.get_status(),
+            'quiet_hours': dict(self.quiet_hours.get_info(), active=self.quiet_active,
+                                activity=self.activity.get_report()),
+            'memory': memory_diagnostics.get_status(),
+            'threads': thread_registry.get_report(),
+            'watchdog': stall_watchdog.get_status(),
+            'current_state': current_state.get_status(),
+            'web_server': self.web_server.get_status() if self.web_server else None,
+            'events': event_bus.get_status(),
             'performance_summary': self.performance_monitor.get_performance_summary()
         }
         
@@ -0,0 +1,251 @@
+"""
+Output sinks for simulation mode.
+"""
+
+import os
+import mmap
+import time
+import struct
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from PIL import Image
+
+# Shared framebuffer header: magic, width, height, sequence, timestamp
+SHM_HEADER = struct.Struct('<4sIIQd')
+SHM_MAGIC = b'BCFB'
+
+class SimulationSink(ABC):
+    """Base class for simulation outputs."""
+    
+    name = 'base'
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.frames_written = 0
+        self.last_write_time = 0.0
+    
+    def write(self, image: Image.Image):
+        """Write a frame to the sink."""
+        start = time.perf_counter()
+        self._write(image)
+        self.last_write_time = time.perf_counter() - start
+        self.frames_written += 1
+    
+    @abstractmethod
+    def _write(self, image: Image.Image):
+        """Store or emit one frame."""
+    
+    def get_latest_frame(self) -> Optional[Image.Image]:
+        """Return the most recent frame if the sink keeps one in memory."""
+        return None
+    
+    def close(self):
+        """Release any resources held by the sink."""
+        pass
+    
+    def get_info(self) -> Dict[str, Any]:
+        """Get sink information."""
+        return {
+            'sink': self.name,
+            'frames_written': self.frames_written,
+            'last_write_ms': round(self.last_write_time * 1000, 3)
+        }
+
+class MemoryRingSink(SimulationSink):
+    """Keeps the last few frames in memory for the web interface."""
+    
+    name = 'memory'
+    
+    def __init__(self, size: int = 3):
+        super().__init__()
+        self.frames = deque(maxlen=max(1, size))
+        self.lock = threading.Lock()
+    
+    def _write(self, image: Image.Image):
+        # Frames are stored by reference; the display pipeline never mutates them
+        with self.lock:
+            self.frames.append((self.frames_written + 1, time.time(), image))
+    
+    def get_latest_frame(self) -> Optional[Image.Image]:
+        with self.lock:
+            return self.frames[-1][2] if self.frames else None
+    
+    def get_frames(self) -> List[Tuple[int, float, Image.Image]]:
+        """Return (sequence, timestamp, image) for every buffered frame, oldest first."""
+        with self.lock:
+            return list(self.frames)
+    
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info['buffered_frames'] = len(self.frames)
+        info['capacity'] = self.frames.maxlen
+        return info
+
+class FileSink(SimulationSink):
+    """Writes each frame to a file, replacing the previous one."""
+    
+    name = 'file'
+    
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+    
+    def _write(self, image: Image.Image):
+        # Write beside the target and rename so readers never see a partial frame
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            self._encode(image, f)
+        os.replace(temp_path, self.path)
+        self.logger.debug(f"Display simulated - image saved to {self.path}")
+    
+    @abstractmethod
+    def _encode(self, image: Image.Image, f):
+        """Write one frame in the sink's format to an open binary file."""
+    
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info['path'] = str(self.path)
+        return info
+
+class PNGFileSink(FileSink):
+    """Compressed PNG output (the original simulation behaviour)."""
+    
+    name = 'png'
+    
+    def _encode(self, image: Image.Image, f):
+        image.save(f, format='PNG')
+
+class PGMFileSink(FileSink):
+    """Uncompressed binary PGM (P5) output, readable by most image viewers."""
+    
+    name = 'pgm'
+    
+    def _encode(self, image: Image.Image, f):
+        f.write(f"P5\n{image.width} {image.height}\n255\n".encode('ascii'))
+        f.write(image.tobytes())
+
+class RawFileSink(FileSink):
+    """Headerless 8-bit grayscale output."""
+    
+    name = 'raw'
+    
+    def _encode(self, image: Image.Image, f):
+        f.write(image.tobytes())
+
+class SharedMemorySink(SimulationSink):
+    """POSIX shared-memory framebuffer that other processes can mmap.
+    
+    Layout is a fixed header (see SHM_HEADER) followed by width * height
+    8-bit pixels. The sequence number is odd while a frame is being written
+    and even once it is complete, so readers can detect torn frames.
+    """
+    
+    name = 'shm'
+    
+    def __init__(self, width: int, height: int, shm_name: str = 'bible_clock_fb'):
+        super().__init__()
+        from multiprocessing import shared_memory
+        
+        self.width = width
+        self.height = height
+        self.shm_name = shm_name
+        self.sequence = 0
+        size = SHM_HEADER.size + width * height
+        
+        try:
+            self.shm = shared_memory.SharedMemory(name=shm_name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous run; reuse it if it is large enough
+            self.shm = shared_memory.SharedMemory(name=shm_name)
+            if self.shm.size < size:
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = shared_memory.SharedMemory(name=shm_name, create=True, size=size)
+        
+        self._write_header(time.time())
+        self.logger.info(f"Shared framebuffer created: /dev/shm/{shm_name} ({size} bytes)")
+    
+    def _write_header(self, timestamp: float):
+        SHM_HEADER.pack_into(self.shm.buf, 0, SHM_MAGIC, self.width, self.height, self.sequence, timestamp)
+    
+    def _write(self, image: Image.Image):
+        if image.size != (self.width, self.height):
+            raise ValueError(f"Frame size {image.size} does not match framebuffer {self.width}x{self.height}")
+        
+        self.sequence += 1
+        self._write_header(time.time())
+        self.shm.buf[SHM_HEADER.size:SHM_HEADER.size + self.width * self.height] = image.tobytes()
+        self.sequence += 1
+        self._write_header(time.time())
+    
+    def get_latest_frame(self) -> Optional[Image.Image]:
+        frame = read_shared_framebuffer(self.shm_name)
+        return frame[0] if frame else None
+    
+    def close(self):
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except Exception as e:
+            self.logger.debug(f"Shared framebuffer cleanup failed: {e}")
+    
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info['shm_name'] = self.shm_name
+        info['sequence'] = self.sequence
+        return info
+
+def read_shared_framebuffer(shm_name: str = 'bible_clock_fb', retries: int = 3) -> Optional[Tuple[Image.Image, int, float]]:
+    """Read a consistent frame from a shared framebuffer.
+    
+    Maps /dev/shm directly rather than attaching through
+    multiprocessing.shared_memory, whose resource tracker would unlink the
+    segment when a reader process exits.
+    
+    Returns (image, sequence, timestamp), or None if the framebuffer does not
+    exist or no complete frame could be read.
+    """
+    try:
+        fd = os.open(f"/dev/shm/{shm_name}", os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    
+    try:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as buf:
+            for _ in range(retries):
+                magic, width, height, sequence, timestamp = SHM_HEADER.unpack_from(buf, 0)
+                if magic != SHM_MAGIC or sequence == 0 or sequence % 2:
+                    time.sleep(0.01)
+                    continue
+                
+                pixels = buf[SHM_HEADER.size:SHM_HEADER.size + width * height]
+                if SHM_HEADER.unpack_from(buf, 0)[3] == sequence:
+                    return Image.frombytes('L', (width, height), pixels), sequence, timestamp
+            return None
+    finally:
+        os.close(fd)
+
+def create_sink(kind: str, width: int, height: int) -> SimulationSink:
+    """Create a simulation sink from its configured name."""
+    kind = (kind or 'memory').lower()
+    
+    if kind == 'memory':
+        return MemoryRingSink(size=int(os.getenv('SIMULATION_RING_SIZE', '3')))
+    if kind == 'shm':
+        return SharedMemorySink(width, height, os.getenv('SIMULATION_SHM_NAME', 'bible_clock_fb'))
+    
+    file_sinks = {
+        'png': (PNGFileSink, 'current_display.png'),
+        'pgm': (PGMFileSink, 'current_display.pgm'),
+        'raw': (RawFileSink, 'current_display.raw')
+    }
+    if kind not in file_sinks:
+        raise ValueError(f"Unsupported simulation sink: {kind}")
+    
+    sink_class, default_path = file_sinks[kind]
+    return sink_class(os.getenv('SIMULATION_OUTPUT') or default_path)
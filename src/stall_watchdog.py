@@ -0,0 +1,253 @@
+"""
+Heartbeat watchdog that detects stalled threads and captures their stacks.
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+import threading
+import traceback
+import faulthandler
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Default budget for one in-flight operation (panel refresh, pipeline stage)
+STALL_BUDGET = float(os.getenv('WATCHDOG_STALL_BUDGET', '120'))
+
+class Heartbeat:
+    """Check-in deadlines of one component, per thread."""
+    
+    def __init__(self, name: str, budget: float):
+        self.name = name
+        self.budget = budget
+        self.deadlines = {}  # thread ident -> monotonic deadline
+        self.last_beat = None
+        self.stalls = 0
+        self.stalled_since = None
+    
+    def overdue(self, now: float) -> Optional[int]:
+        """Ident of a thread that missed its deadline, if any."""
+        for ident, deadline in list(self.deadlines.items()):
+            if now > deadline:
+                return ident
+        return None
+    
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            'state': 'stalled' if self.stalled_since else 'ok',
+            'budget': self.budget,
+            'in_flight': len(self.deadlines),
+            'seconds_since_beat': round(now - self.last_beat, 1) if self.last_beat else None,
+            'stalls': self.stalls,
+            'stalled_since': self.stalled_since.isoformat() if self.stalled_since else None
+        }
+
+class StallWatchdog:
+    """Flags components that miss their heartbeat and dumps every thread's stack.
+    
+    Loops call beat() once per iteration with the longest they may take to
+    come round again; one-off operations that might hang (an SPI transfer, an
+    OpenAI request) run inside watch(). When a deadline passes, the stacks of
+    all threads are captured into a ring buffer, the component is reported as
+    degraded, and it recovers on its next check-in.
+    
+    Under systemd, WATCHDOG=1 is sent while nothing is stalled, so a unit with
+    WatchdogSec= restarts the service if a hang does not clear.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = os.getenv('WATCHDOG_ENABLED', 'true').lower() == 'true'
+        self.interval = float(os.getenv('WATCHDOG_INTERVAL', '5'))
+        self.dumps = deque(maxlen=int(os.getenv('WATCHDOG_DUMP_HISTORY', '10')))
+        
+        self.heartbeats = {}  # name -> Heartbeat
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self._wakeup = threading.Event()
+        
+        # systemd sets these when the unit has WatchdogSec= and NotifyAccess=
+        self.notify_socket = os.getenv('NOTIFY_SOCKET')
+        watchdog_usec = os.getenv('WATCHDOG_USEC')
+        self.systemd_interval = int(watchdog_usec) / 1e6 / 2 if watchdog_usec and self.notify_socket else None
+    
+    def start(self):
+        """Start the watchdog thread and install faulthandler."""
+        if not self.enabled or self.running:
+            return
+        
+        # Fatal errors and `kill -USR1` print every thread's stack to stderr (the journal)
+        if not faulthandler.is_enabled():
+            faulthandler.enable()
+        if hasattr(signal, 'SIGUSR1'):
+            try:
+                faulthandler.register(signal.SIGUSR1, all_threads=True)
+            except (RuntimeError, ValueError) as e:
+                self.logger.debug(f"Could not register SIGUSR1 stack dump: {e}")
+        
+        self.running = True
+        self._wakeup.clear()
+        self.thread = threading.Thread(target=self._watch_loop, name='stall-watchdog', daemon=True)
+        self.thread.start()
+        self._notify_systemd('READY=1')
+        
+        systemd = f", notifying systemd every {self.systemd_interval:.0f}s" if self.systemd_interval else ""
+        self.logger.info(f"Stall watchdog started ({self.interval:.0f}s interval{systemd})")
+    
+    def stop(self):
+        """Stop the watchdog thread."""
+        self.running = False
+        self._wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        self._notify_systemd('STOPPING=1')
+    
+    def beat(self, name: str, budget: float):
+        """Check in from a loop; it must check in again within budget seconds."""
+        now = time.monotonic()
+        with self.lock:
+            heartbeat = self._heartbeat(name, budget)
+            heartbeat.budget = budget
+            heartbeat.deadlines = {threading.get_ident(): now + budget}
+            heartbeat.last_beat = now
+            self._recover(heartbeat, now)
+    
+    @contextmanager
+    def watch(self, name: str, budget: float = STALL_BUDGET):
+        """Flag the component if the enclosed block runs longer than budget seconds."""
+        ident = threading.get_ident()
+        with self.lock:
+            self._heartbeat(name, budget).deadlines[ident] = time.monotonic() + budget
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            with self.lock:
+                heartbeat = self.heartbeats.get(name)
+                if heartbeat:
+                    heartbeat.deadlines.pop(ident, None)
+                    heartbeat.last_beat = now
+                    self._recover(heartbeat, now)
+    
+    def forget(self, name: str):
+        """Stop watching a component, e.g. when its loop shuts down."""
+        with self.lock:
+            self.heartbeats.pop(name, None)
+    
+    def check(self) -> List[str]:
+        """Flag components past their deadline; returns the newly stalled names."""
+        now = time.monotonic()
+        stalled = []
+        with self.lock:
+            for heartbeat in self.heartbeats.values():
+                ident = heartbeat.overdue(now)
+                if ident is not None and heartbeat.stalled_since is None:
+                    heartbeat.stalled_since = datetime.now()
+                    heartbeat.stalls += 1
+                    stalled.append((heartbeat.name, ident))
+        
+        for name, ident in stalled:
+            dump = self.dump_stacks(f"{name} missed its heartbeat")
+            thread_name = self._thread_name(ident)
+            stack = ''.join(dump['threads'].get(thread_name, []))
+            self.logger.error(f"Component '{name}' stalled in thread {thread_name}:\n{stack}")
+        return [name for name, _ in stalled]
+    
+    def dump_stacks(self, reason: str) -> Dict[str, Any]:
+        """Capture the stack of every thread into the ring buffer."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        threads = {}
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+            threads[names.get(ident, f'thread-{ident}')] = traceback.format_stack(frame)
+        
+        dump = {'time': datetime.now().isoformat(), 'reason': reason, 'threads': threads}
+        with self.lock:
+            self.dumps.append(dump)
+        return dump
+    
+    def degraded(self) -> List[str]:
+        """Names of components currently stalled."""
+        with self.lock:
+            return sorted(name for name, heartbeat in self.heartbeats.items() if heartbeat.stalled_since)
+    
+    def get_stall_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return {name: heartbeat.stalls for name, heartbeat in self.heartbeats.items()}
+    
+    def get_dumps(self) -> List[Dict[str, Any]]:
+        """Full stack dumps, oldest first."""
+        with self.lock:
+            return list(self.dumps)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Watchdog status for /api/status."""
+        now = time.monotonic()
+        with self.lock:
+            components = {name: heartbeat.to_dict(now) for name, heartbeat in sorted(self.heartbeats.items())}
+            dumps = [{'time': dump['time'], 'reason': dump['reason'], 'threads': len(dump['threads'])}
+                     for dump in self.dumps]
+        degraded = [name for name, component in components.items() if component['state'] == 'stalled']
+        return {
+            'enabled': self.running,
+            'healthy': not degraded,
+            'degraded': degraded,
+            'components': components,
+            'systemd': self.systemd_interval is not None,
+            'dumps': dumps
+        }
+    
+    def _heartbeat(self, name: str, budget: float) -> Heartbeat:
+        """Get or create a heartbeat (caller holds the lock)."""
+        heartbeat = self.heartbeats.get(name)
+        if heartbeat is None:
+            heartbeat = self.heartbeats[name] = Heartbeat(name, budget)
+        return heartbeat
+    
+    def _recover(self, heartbeat: Heartbeat, now: float):
+        """Clear the stalled state once no thread is overdue (caller holds the lock)."""
+        if heartbeat.stalled_since and heartbeat.overdue(now) is None:
+            stalled_for = datetime.now() - heartbeat.stalled_since
+            heartbeat.stalled_since = None
+            self.logger.warning(f"Component '{heartbeat.name}' recovered after stalling for {stalled_for}")
+    
+    def _thread_name(self, ident: int) -> str:
+        for thread in threading.enumerate():
+            if thread.ident == ident:
+                return thread.name
+        return f'thread-{ident}'
+    
+    def _watch_loop(self):
+        interval = min(self.interval, self.systemd_interval) if self.systemd_interval else self.interval
+        while self.running:
+            try:
+                self.check()
+                if not self.degraded():
+                    self._notify_systemd('WATCHDOG=1')
+            except Exception as e:
+                self.logger.error(f"Stall watchdog error: {e}")
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+    
+    def _notify_systemd(self, state: str):
+        """Send an sd_notify message, if the service runs under systemd."""
+        if not self.notify_socket:
+            return
+        address = self.notify_socket
+        if address.startswith('@'):
+            address = '\0' + address[1:]  # Abstract namespace socket
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.sendto(state.encode(), address)
+        except OSError as e:
+            self.logger.debug(f"systemd notify failed: {e}")
+
+# Global watchdog shared by every component that checks in
+stall_watchdog = StallWatchdog()
@@ -0,0 +1,174 @@
+"""
+Shared background sampler for system metrics.
+"""
+
+import os
+import glob
+import time
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Tuple
+
+import psutil
+
+from stall_watchdog import stall_watchdog
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """Immutable system metrics taken at one point in time."""
+    timestamp: float
+    sequence: int
+    cpu_percent: float
+    memory_percent: float
+    memory_used: int
+    memory_available: int
+    memory_total: int
+    disk_percent: float
+    disk_used: int
+    disk_total: int
+    temperature: Optional[float]  # CPU temperature in °C, if available
+    load_average: Tuple[float, float, float]
+    uptime_seconds: float
+    process_rss: int  # Resident memory of this process in bytes
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class SystemMetricsSampler:
+    """Samples CPU, memory, disk, temperature and load on one background thread.
+    
+    Consumers call latest() and get the most recently published snapshot
+    without touching psutil or /sys, so the sampling cost stays fixed no
+    matter how many requests read it. CPU usage is measured between
+    samples instead of blocking for a second.
+    """
+    
+    def __init__(self, interval: Optional[float] = None, disk_path: str = '/'):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval or float(os.getenv('METRICS_SAMPLE_INTERVAL', '5'))
+        self.disk_path = disk_path
+        
+        self.running = False
+        self.thread = None
+        self.samples = 0
+        self.wakeups = 0  # Sampling loop iterations, for activity reporting
+        
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thermal_path = self._find_thermal_path()
+        self._boot_time = psutil.boot_time()
+        self._process = psutil.Process()
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter so the first sample is meaningful
+    
+    def latest(self) -> SystemSnapshot:
+        """Most recent snapshot; the first call samples once and starts the sampler."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+            self.start()
+        return snapshot
+    
+    def peek(self) -> Optional[SystemSnapshot]:
+        """Most recent snapshot without ever sampling; None before the first sample."""
+        return self._snapshot
+    
+    def refresh(self) -> SystemSnapshot:
+        """Take and publish a sample now, e.g. to see the effect of a GC run.
+        
+        CPU usage is carried over from the last scheduled sample: measuring
+        it here would restart the window the next scheduled sample covers.
+        """
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = self._sample(cpu_percent=previous.cpu_percent if previous else None)
+            return self._snapshot
+    
+    def _refresh_scheduled(self):
+        with self._lock:
+            self._snapshot = self._sample()
+    
+    def start(self):
+        """Start the background sampling thread."""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._wakeup.clear()
+            self.thread = threading.Thread(target=self._sample_loop, name='system-metrics', daemon=True)
+            self.thread.start()
+        self.logger.info(f"System metrics sampler started ({self.interval:.0f}s interval)")
+    
+    def stop(self):
+        """Stop the background sampling thread."""
+        self.running = False
+        self._wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        stall_watchdog.forget('system_metrics')
+    
+    def set_interval(self, interval: float):
+        """Change the sampling interval, e.g. to back off during quiet hours."""
+        self.interval = interval
+        self._wakeup.set()
+    
+    def _sample_loop(self):
+        while self.running:
+            self.wakeups += 1
+            stall_watchdog.beat('system_metrics', self.interval * 2 + 30)
+            try:
+                self._refresh_scheduled()
+            except Exception as e:
+                self.logger.error(f"System metrics sampling failed: {e}")
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+    
+    def _sample(self, cpu_percent: Optional[float] = None) -> SystemSnapshot:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        try:
+            load_average = os.getloadavg()
+        except OSError:
+            load_average = (0.0, 0.0, 0.0)
+        
+        if cpu_percent is None:
+            cpu_percent = psutil.cpu_percent(interval=None)  # Since the previous sample
+        
+        self.samples += 1
+        now = time.time()
+        return SystemSnapshot(
+            timestamp=now,
+            sequence=self.samples,
+            cpu_percent=cpu_percent,
+            memory_percent=memory.percent,
+            memory_used=memory.used,
+            memory_available=memory.available,
+            memory_total=memory.total,
+            disk_percent=disk.percent,
+            disk_used=disk.used,
+            disk_total=disk.total,
+            temperature=self._read_temperature(),
+            load_average=tuple(round(value, 2) for value in load_average),
+            uptime_seconds=now - self._boot_time,
+            process_rss=self._process.memory_info().rss
+        )
+    
+    def _find_thermal_path(self) -> Optional[str]:
+        """Locate a CPU thermal zone once (Raspberry Pi zone 0 first)."""
+        if os.path.exists('/sys/class/thermal/thermal_zone0/temp'):
+            return '/sys/class/thermal/thermal_zone0/temp'
+        thermal_files = sorted(glob.glob('/sys/class/thermal/thermal_zone*/temp'))
+        return thermal_files[0] if thermal_files else None
+    
+    def _read_temperature(self) -> Optional[float]:
+        if not self._thermal_path:
+            return None
+        try:
+            with open(self._thermal_path, 'r') as f:
+                return round(int(f.read().strip()) / 1000.0, 1)
+        except (OSError, ValueError):
+            return None
+
+# Global sampler shared by every consumer
+system_metrics = SystemMetricsSampler()
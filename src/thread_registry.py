@@ -0,0 +1,138 @@
+"""
+Per-thread and per-subsystem CPU accounting for Bible Clock.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import psutil
+
+# Thread name prefixes -> subsystem, checked in order
+SUBSYSTEM_PREFIXES = (
+    ('render-pipeline', 'rendering'),
+    ('scheduler', 'scheduler'),
+    ('display-', 'display'),
+    ('system-metrics', 'monitoring'),
+    ('performance-monitor', 'monitoring'),
+    ('stall-watchdog', 'monitoring'),
+    ('web-', 'web'),
+    ('voice-', 'voice'),
+    ('MainThread', 'main')
+)
+
+# Request threads started by the development server have generated names
+WEB_REQUEST_MARKER = 'process_request_thread'
+
+class ThreadRegistry:
+    """Samples CPU time of every thread and rolls it up by subsystem.
+    
+    Subsystems come from thread names (see SUBSYSTEM_PREFIXES) or from
+    register() for threads whose names cannot be chosen. Each sample()
+    records the CPU each subsystem used since the previous sample, so
+    the history shows its share of the process over time. CPU of native
+    threads Python does not know about is reported as 'native'.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.history = deque(maxlen=int(os.getenv('THREAD_CPU_HISTORY', '120')))
+        self.totals = {}  # subsystem -> CPU seconds since startup
+        self.thread_totals = {}  # native id -> (name, subsystem, CPU seconds)
+        self.lock = threading.Lock()
+        
+        self._process = psutil.Process()
+        self._overrides = {}  # thread ident -> subsystem
+        self._last_cpu = {}  # native id -> CPU seconds at the previous sample
+        self._last_sample = None
+    
+    def register(self, subsystem: str, thread: Optional[threading.Thread] = None):
+        """Attribute a thread (default: the calling one) to a subsystem."""
+        thread = thread or threading.current_thread()
+        self._overrides[thread.ident] = subsystem
+    
+    def subsystem_for(self, thread: threading.Thread) -> str:
+        subsystem = self._overrides.get(thread.ident)
+        if subsystem:
+            return subsystem
+        for prefix, subsystem in SUBSYSTEM_PREFIXES:
+            if thread.name.startswith(prefix):
+                return subsystem
+        if WEB_REQUEST_MARKER in thread.name:
+            return 'web'
+        return 'other'
+    
+    def sample(self) -> Dict[str, Any]:
+        """Record CPU used by each subsystem since the previous sample."""
+        now = time.monotonic()
+        threads = {thread.native_id: thread for thread in threading.enumerate()}
+        cpu_times = {t.id: t.user_time + t.system_time for t in self._process.threads()}
+        
+        with self.lock:
+            interval = now - self._last_sample if self._last_sample else None
+            used = {}
+            for native_id, cpu in cpu_times.items():
+                thread = threads.get(native_id)
+                name = thread.name if thread else f'native-{native_id}'
+                subsystem = self.subsystem_for(thread) if thread else 'native'
+                
+                # New threads count everything they used since they started
+                delta = max(0.0, cpu - self._last_cpu.get(native_id, 0.0))
+                used[subsystem] = used.get(subsystem, 0.0) + delta
+                self.totals[subsystem] = self.totals.get(subsystem, 0.0) + delta
+                self.thread_totals[native_id] = (name, subsystem, cpu)
+            
+            # Forget threads that have exited
+            self._last_cpu = cpu_times
+            for native_id in [n for n in self.thread_totals if n not in cpu_times]:
+                del self.thread_totals[native_id]
+            
+            self._last_sample = now
+            if interval is None:
+                return {}
+            
+            process_cpu = sum(used.values())
+            entry = {
+                'time': datetime.now().isoformat(),
+                'interval': round(interval, 1),
+                'subsystems': {
+                    subsystem: {
+                        'cpu_seconds': round(seconds, 3),
+                        'core_percent': round(100.0 * seconds / interval, 2),
+                        'share_percent': round(100.0 * seconds / process_cpu, 1) if process_cpu else 0.0
+                    }
+                    for subsystem, seconds in sorted(used.items(), key=lambda item: -item[1])
+                }
+            }
+            self.history.append(entry)
+            return entry
+    
+    def get_report(self, history: int = 10) -> Dict[str, Any]:
+        """CPU by subsystem and thread since startup, plus recent samples."""
+        with self.lock:
+            total = sum(self.totals.values())
+            subsystems = {
+                subsystem: {
+                    'cpu_seconds': round(seconds, 2),
+                    'share_percent': round(100.0 * seconds / total, 1) if total else 0.0
+                }
+                for subsystem, seconds in sorted(self.totals.items(), key=lambda item: -item[1])
+            }
+            threads = [
+                {'name': name, 'subsystem': subsystem, 'cpu_seconds': round(cpu, 2)}
+                for name, subsystem, cpu in sorted(self.thread_totals.values(), key=lambda entry: -entry[2])
+            ]
+            recent = list(self.history)[-history:]
+        return {'subsystems': subsystems, 'threads': threads, 'history': recent}
+    
+    def get_totals(self) -> Dict[str, float]:
+        """CPU seconds per subsystem since startup."""
+        with self.lock:
+            return dict(self.totals)
+
+# Global registry shared by every component that starts threads
+thread_registry = ThreadRegistry()
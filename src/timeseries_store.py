@@ -0,0 +1,271 @@
+"""
+Round-robin time-series store for long-term statistics.
+"""
+
+import os
+import time
+import struct
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# (name, step in seconds, rows): two days of minutes, four weeks of quarter hours, two years of days
+ARCHIVES = (
+    ('1m', 60, 2880),
+    ('15m', 900, 2688),
+    ('1d', 86400, 730)
+)
+
+# Series recorded by the service, with their units
+SERIES = {
+    'cpu_percent': '%',
+    'memory_percent': '%',
+    'temperature': '°C',
+    'render_ms': 'ms',
+    'commit_ms': 'ms',
+    'update_jitter_ms': 'ms'
+}
+
+# Completed buckets kept for retry while writes fail (a day of minute rows for every series)
+PENDING_LIMIT = len(SERIES) * 1440 * len(ARCHIVES)
+
+# One consolidated row: slot start (epoch seconds), sample count, sum, min, max
+ROW = struct.Struct('<qIddd')
+
+class Bucket:
+    """Samples consolidated into one archive slot."""
+    
+    __slots__ = ('slot', 'count', 'total', 'minimum', 'maximum', 'dirty')
+    
+    def __init__(self, slot: int, count: int = 0, total: float = 0.0,
+                 minimum: float = float('inf'), maximum: float = float('-inf')):
+        self.slot = slot
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+        self.dirty = False
+    
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.dirty = True
+    
+    def pack(self) -> bytes:
+        return ROW.pack(self.slot, self.count, self.total, self.minimum, self.maximum)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'time': datetime.fromtimestamp(self.slot).isoformat(),
+            'count': self.count,
+            'avg': round(self.total / self.count, 3),
+            'min': round(self.minimum, 3),
+            'max': round(self.maximum, 3)
+        }
+
+class RoundRobinArchive:
+    """Fixed-size file of consolidated rows; slot N lives at row N modulo the row count."""
+    
+    def __init__(self, path: Path, step: int, rows: int):
+        self.path = path
+        self.step = step
+        self.rows = rows
+        self.size = rows * ROW.size
+    
+    def slot_for(self, timestamp: float) -> int:
+        """Start of the slot containing a time, aligned to local midnight."""
+        offset = time.localtime(timestamp).tm_gmtoff
+        return int((timestamp + offset) // self.step * self.step - offset)
+    
+    def read_row(self, slot: int) -> Optional[Bucket]:
+        """The stored row for a slot, if the file holds one."""
+        if not self.path.exists():
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset(slot))
+            data = f.read(ROW.size)
+        if len(data) != ROW.size:
+            return None
+        row = ROW.unpack(data)
+        return Bucket(*row) if row[0] == slot and row[1] else None
+    
+    def read(self, start: float, end: float) -> List[Bucket]:
+        """Stored rows with slots between start and end, oldest first."""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'rb') as f:
+            data = f.read(self.size)
+        buckets = [Bucket(*row) for row in ROW.iter_unpack(data[:len(data) - len(data) % ROW.size])
+                   if row[1] and start <= row[0] <= end]
+        return sorted(buckets, key=lambda bucket: bucket.slot)
+    
+    def write(self, bucket: Bucket):
+        self._ensure_file()
+        with open(self.path, 'r+b') as f:
+            f.seek(self._offset(bucket.slot))
+            f.write(bucket.pack())
+    
+    def _offset(self, slot: int) -> int:
+        return (slot // self.step) % self.rows * ROW.size
+    
+    def _ensure_file(self):
+        """Create the file at its full size, replacing one with a different layout."""
+        if self.path.exists() and self.path.stat().st_size == self.size:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.truncate(self.size)
+
+class TimeSeriesStore:
+    """Minute, quarter-hour and daily rollups of each series in fixed-size files.
+    
+    record() only updates in-memory buckets, so it is cheap enough for the
+    render path; flush() writes changed buckets back in place. Disk use is
+    fixed by ARCHIVES and memory use by the number of series, however long
+    the clock runs. A bucket reopened after a restart continues from its
+    stored row, so daily rollups survive restarts.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = os.getenv('METRICS_STORE_ENABLED', 'true').lower() == 'true'
+        self.directory = Path(directory or os.getenv('METRICS_STORE_DIR', 'data/metrics'))
+        self.lock = threading.Lock()
+        
+        self.archives = {}  # (series, archive name) -> RoundRobinArchive
+        self.current = {}   # (series, archive name) -> Bucket being filled
+        self.pending = []   # Completed buckets not yet written: (archive, bucket)
+    
+    def record(self, series: str, value: float, timestamp: Optional[float] = None):
+        """Add a sample to every archive of a series."""
+        if not self.enabled or value is None:
+            return
+        timestamp = timestamp or time.time()
+        
+        with self.lock:
+            for name, _, _ in ARCHIVES:
+                key = (series, name)
+                archive = self._archive(series, name)
+                slot = archive.slot_for(timestamp)
+                bucket = self.current.get(key)
+                if bucket is None or bucket.slot != slot:
+                    if bucket is not None:
+                        self.pending.append((archive, bucket))
+                    bucket = self._open_bucket(archive, slot, seed=bucket is None)
+                    self.current[key] = bucket
+                bucket.add(value)
+    
+    def flush(self):
+        """Write completed and changed buckets to disk."""
+        if not self.enabled:
+            return
+        
+        with self.lock:
+            writes = [(archive, bucket) for archive, bucket in self.pending if bucket.dirty]
+            writes += [(self.archives[key], bucket) for key, bucket in self.current.items() if bucket.dirty]
+            for _, bucket in writes:
+                bucket.dirty = False
+            self.pending = []
+        
+        failed = []
+        failed_archives = set()
+        for archive, bucket in writes:
+            if archive in failed_archives:
+                failed.append((archive, bucket))
+                continue
+            try:
+                archive.write(bucket)
+            except OSError as e:
+                self.logger.error(f"Could not write {archive.path}: {e}")
+                failed_archives.add(archive)
+                failed.append((archive, bucket))
+        
+        if failed:
+            self._retry_later(failed)
+    
+    def _retry_later(self, failed: List[Tuple[RoundRobinArchive, Bucket]]):
+        """Mark unwritten buckets dirty again and queue completed ones for the next flush."""
+        with self.lock:
+            queued = {id(bucket) for _, bucket in self.pending}
+            queued.update(id(bucket) for bucket in self.current.values())
+            for archive, bucket in failed:
+                bucket.dirty = True
+                if id(bucket) not in queued:
+                    self.pending.append((archive, bucket))
+            if len(self.pending) > PENDING_LIMIT:
+                self.logger.warning(f"Dropping {len(self.pending) - PENDING_LIMIT} unwritten metric rows")
+                del self.pending[:-PENDING_LIMIT]
+    
+    def query(self, series: str, start: float, end: Optional[float] = None,
+              archive_name: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Consolidated points of a series between two times.
+        
+        Uses the finest archive that still covers start unless one is named.
+        Returns (archive name, points).
+        """
+        end = end or time.time()
+        if archive_name is None:
+            archive_name = self.archive_for(end - start)
+        with self.lock:
+            archive = self._archive(series, archive_name)
+        
+        buckets = {bucket.slot: bucket for bucket in archive.read(start, end)}
+        with self.lock:
+            bucket = self.current.get((series, archive_name))
+            if bucket is not None and bucket.count and start <= bucket.slot <= end:
+                buckets[bucket.slot] = bucket
+        return archive_name, [buckets[slot].to_dict() for slot in sorted(buckets)]
+    
+    def history(self, span: float, series: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Every series over the last span seconds, for the statistics page."""
+        start = time.time() - span
+        archive_name = self.archive_for(span)
+        step = next(step for name, step, _ in ARCHIVES if name == archive_name)
+        return {
+            'archive': archive_name,
+            'step': step,
+            'units': SERIES,
+            'series': {name: self.query(name, start, archive_name=archive_name)[1] for name in (series or SERIES)}
+        }
+    
+    def archive_for(self, span: float) -> str:
+        """Finest archive whose retention covers a span of seconds."""
+        for name, step, rows in ARCHIVES:
+            if step * rows >= span:
+                return name
+        return ARCHIVES[-1][0]
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'directory': str(self.directory),
+            'archives': {name: {'step': step, 'retention_days': round(step * rows / 86400, 1)}
+                         for name, step, rows in ARCHIVES},
+            'disk_bytes': len(SERIES) * sum(rows for _, _, rows in ARCHIVES) * ROW.size
+        }
+    
+    def _archive(self, series: str, name: str) -> RoundRobinArchive:
+        key = (series, name)
+        archive = self.archives.get(key)
+        if archive is None:
+            step, rows = next((step, rows) for archive_name, step, rows in ARCHIVES if archive_name == name)
+            archive = self.archives[key] = RoundRobinArchive(self.directory / f'{series}.{name}.rra', step, rows)
+        return archive
+    
+    def _open_bucket(self, archive: RoundRobinArchive, slot: int, seed: bool) -> Bucket:
+        """New bucket for a slot, continuing the stored row after a restart."""
+        if seed:
+            try:
+                stored = archive.read_row(slot)
+                if stored is not None:
+                    return stored
+            except OSError as e:
+                self.logger.error(f"Could not read {archive.path}: {e}")
+        return Bucket(slot)
+
+# Global store shared by the performance monitor and the web interface
+timeseries_store = TimeSeriesStore()
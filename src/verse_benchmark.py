@@ -0,0 +1,241 @@
+"""
+Verse-resolution throughput benchmark across every slot of each display mode.
+"""
+
+import time
+import random
+import hashlib
+import logging
+import importlib
+import tracemalloc
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional
+
+import clock
+from mock_bible_api import MockBibleAPI, MockBibleAPIAdapter
+from performance_monitor import performance_monitor
+
+# Scenario -> (display mode, time format); time and random modes cover one day, date mode a year
+SCENARIOS = {
+    'time-12h': ('time', '12'),
+    'time-24h': ('time', '24'),
+    'date': ('date', '12'),
+    'random': ('random', '12')
+}
+
+# How a lookup was resolved
+PATHS = ('api', 'local', 'summary', 'fallback')
+
+# Counters that tell the resolution paths apart
+PATH_COUNTERS = ('verses_from_api', 'verses_from_local', 'verses_from_fallback')
+
+DEFAULT_IMPLEMENTATION = 'verse_manager:VerseManager'
+
+def load_implementation(spec: str):
+    """Class named by "module:Class"; it must be constructible like VerseManager."""
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name or 'VerseManager')
+
+def classify(verse_data: Dict, counters: Dict[str, int]) -> str:
+    """Resolution path of one lookup, from its result and the counters it moved."""
+    if verse_data.get('is_summary'):
+        return 'summary'
+    if counters['verses_from_fallback'] or verse_data.get('date_match') == 'fallback':
+        return 'fallback'
+    if counters['verses_from_api']:
+        return 'api'
+    return 'local'
+
+class VerseBenchmark:
+    """Resolves every slot of each scenario with one or more implementations.
+    
+    Time modes (12h and 24h) and random mode resolve all 1440 minutes of a
+    day; date mode resolves every content change of every day in a year.
+    The network is either off (local data only) or a zero-latency
+    MockBibleAPI, so runs are repeatable. Each implementation gets the
+    same slots and random seed, and a digest of the verses it resolved is
+    compared with the first implementation's, so a faster index is only
+    an improvement if it resolves the same verses.
+    
+    Throughput is measured without tracing; allocations are measured in a
+    second pass over a sample of slots with tracemalloc, as the peak
+    bytes allocated during a lookup and the bytes still held after it.
+    """
+    
+    def __init__(self, implementations: Optional[List[str]] = None, scenarios: Optional[List[str]] = None,
+                 api: str = 'off', start: Optional[date] = None, date_days: int = 365, seed: int = 1,
+                 allocation_samples: int = 200):
+        self.logger = logging.getLogger(__name__)
+        self.implementations = implementations or [DEFAULT_IMPLEMENTATION]
+        self.scenarios = scenarios or list(SCENARIOS)
+        for name in self.scenarios:
+            if name not in SCENARIOS:
+                raise ValueError(f"Unknown scenario: {name}")
+        if api not in ('off', 'mock'):
+            raise ValueError(f"API must be 'off' or 'mock', got {api}")
+        self.api = api
+        self.start = start or date(clock.now().year, 1, 1)
+        self.date_days = date_days
+        self.seed = seed
+        self.allocation_samples = allocation_samples
+        self.clock = clock.SimulatedClock(datetime.combine(self.start, datetime.min.time()))
+    
+    def slots(self, scenario: str, manager) -> List[datetime]:
+        """Every slot a scenario resolves."""
+        day = datetime.combine(self.start, datetime.min.time())
+        if SCENARIOS[scenario][0] != 'date':
+            return [day + timedelta(minutes=minute) for minute in range(1440)]
+        
+        slots = []
+        end = day + timedelta(days=self.date_days)
+        slot = day
+        while slot < end:
+            slots.append(slot)
+            slot = manager.get_next_content_change(slot)
+        return slots
+    
+    def run(self) -> Dict[str, Any]:
+        previous = clock.use(self.clock)
+        try:
+            results = {spec: self._run_implementation(spec) for spec in self.implementations}
+        finally:
+            clock.use(previous)
+        
+        # Compare every implementation with the first
+        baseline = results[self.implementations[0]]
+        for spec, scenarios in results.items():
+            for name, result in scenarios.items():
+                reference = baseline[name]
+                result['matches_baseline'] = result['digest'] == reference['digest']
+                result['speedup'] = round(result['lookups_per_second'] / reference['lookups_per_second'], 2) \
+                    if reference['lookups_per_second'] else None
+        
+        return {
+            'api': self.api,
+            'start': self.start.isoformat(),
+            'date_days': self.date_days,
+            'seed': self.seed,
+            'implementations': results
+        }
+    
+    def _run_implementation(self, spec: str) -> Dict[str, Dict[str, Any]]:
+        started = time.perf_counter()
+        manager = self._build(load_implementation(spec))
+        setup = time.perf_counter() - started
+        
+        results = {}
+        for name in self.scenarios:
+            mode, time_format = SCENARIOS[name]
+            manager.set_display_mode(mode)
+            manager.time_format = time_format
+            slots = self.slots(name, manager)
+            results[name] = self._measure(manager, slots)
+            results[name]['setup_seconds'] = round(setup, 3)
+            self.logger.info(f"{spec} {name}: {results[name]['lookups_per_second']} lookups/s")
+        return results
+    
+    def _build(self, implementation):
+        manager = implementation()
+        if self.api == 'off':
+            manager.api_url = ''
+        elif manager.api_url:
+            manager.session.mount(manager.api_url, MockBibleAPIAdapter(MockBibleAPI(seed=self.seed)))
+        return manager
+    
+    def _measure(self, manager, slots: List[datetime]) -> Dict[str, Any]:
+        random.seed(self.seed)
+        digest = hashlib.sha1()
+        paths = {path: 0 for path in PATHS}
+        durations = []
+        
+        for slot in slots:
+            self.clock.set(slot)
+            before = self._path_counters()
+            start = time.perf_counter()
+            verse_data = manager.get_current_verse(at=slot)
+            durations.append(time.perf_counter() - start)
+            after = self._path_counters()
+            
+            paths[classify(verse_data, {name: after[name] - before[name] for name in PATH_COUNTERS})] += 1
+            digest.update(f"{verse_data.get('reference')}|{verse_data.get('text')}\n".encode('utf-8'))
+        
+        durations.sort()
+        total = sum(durations)
+        return {
+            'lookups': len(slots),
+            'seconds': round(total, 3),
+            'lookups_per_second': round(len(slots) / total, 1) if total else None,
+            'p50_us': round(self._percentile(durations, 50) * 1e6, 1),
+            'p99_us': round(self._percentile(durations, 99) * 1e6, 1),
+            'max_us': round(durations[-1] * 1e6, 1) if durations else None,
+            'paths': paths,
+            'allocations': self._measure_allocations(manager, slots),
+            'digest': digest.hexdigest()[:16]
+        }
+    
+    def _measure_allocations(self, manager, slots: List[datetime]) -> Optional[Dict[str, float]]:
+        """Peak and retained bytes per lookup over an evenly spaced sample of slots."""
+        if not self.allocation_samples or not slots:
+            return None
+        
+        step = max(1, len(slots) // self.allocation_samples)
+        sample = slots[::step][:self.allocation_samples]
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        
+        peaks, retained = [], []
+        try:
+            for slot in sample:
+                self.clock.set(slot)
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                manager.get_current_verse(at=slot)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                retained.append(current - before)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        
+        return {
+            'samples': len(sample),
+            'peak_bytes_avg': round(sum(peaks) / len(peaks)),
+            'peak_bytes_max': max(peaks),
+            'retained_bytes_avg': round(sum(retained) / len(retained), 1)
+        }
+    
+    def _path_counters(self) -> Dict[str, int]:
+        counters = performance_monitor.get_counters()
+        return {name: counters[name] for name in PATH_COUNTERS}
+    
+    def _percentile(self, ordered: List[float], percent: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text table of a benchmark report."""
+    lines = [
+        f"Verse resolution benchmark (API {report['api']}, seed {report['seed']}, "
+        f"date mode {report['date_days']} days from {report['start']})",
+        ""
+    ]
+    header = (f"{'scenario':<10}{'lookups':>8}{'lookups/s':>11}{'p50 us':>9}{'p99 us':>9}"
+              f"{'peak KiB':>10}{'kept B':>8}  {'paths':<40}{'match':>6}{'speedup':>9}")
+    for spec, scenarios in report['implementations'].items():
+        lines.append(spec)
+        lines.append(header)
+        for name, result in scenarios.items():
+            allocations = result['allocations'] or {}
+            paths = ' '.join(f"{path}={count}" for path, count in result['paths'].items() if count)
+            peak = allocations.get('peak_bytes_avg')
+            kept = allocations.get('retained_bytes_avg')
+            lines.append(
+                f"{name:<10}{result['lookups']:>8}{result['lookups_per_second']:>11}{result['p50_us']:>9}"
+                f"{result['p99_us']:>9}{peak / 1024 if peak is not None else 0:>10.1f}"
+                f"{kept if kept is not None else 0:>8.0f}  {paths:<40}"
+                f"{'yes' if result['matches_baseline'] else 'NO':>6}{result['speedup']:>9}"
+            )
+        lines.append("")
+    return "\n".join(lines)
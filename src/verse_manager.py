@@ -7,17 +7,21 @@ import os
 import random
 import requests
 import logging
-from datetime import datetime, time, date
+from datetime import datetime, time, date, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 import calendar
 
+from performance_monitor import performance_monitor, span
+import clock
+
 class VerseManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.api_url = os.getenv('BIBLE_API_URL', 'https://bible-api.com')
         self.translation = os.getenv('DEFAULT_TRANSLATION', 'kjv')
         self.timeout = int(os.getenv('REQUEST_TIMEOUT', '10'))
+        self.session = requests.Session()  # Keeps connections alive; simulations mount a mock adapter
         
         # Enhanced features
         self.display_mode = 'time'  # 'time', 'date', 'random'
@@ -31,8 +35,11 @@ class VerseManager:
             'translation_usage': {},
             'mode_usage': {'time': 0, 'date': 0, 'random': 0}
         }
-        self.start_time = datetime.now()
-        self.daily_reset_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start_time = clock.now()
+        self.daily_reset_time = clock.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.statistics_path = Path(os.getenv('METRICS_STORE_DIR', 'data/metrics')) / 'verse_statistics.json'
+        self._saved_verse_count = None
+        self._load_statistics()
         
         # Load local data
         self._load_fallback_verses()
@@ -277,41 +284,89 @@ class VerseManager:
             }
         ]
     
-    def get_current_verse(self) -> Dict:
-        """Get verse based on current display mode."""
+    def get_current_verse(self, at: Optional[datetime] = None, offline: bool = False, record: bool = True) -> Dict:
+        """Get verse based on current display mode.
+        
+        Args:
+            at: Time slot to resolve the verse for (defaults to now), so a
+                frame can be prepared ahead of the minute it is shown in.
+            offline: Resolve from local data only, skipping API requests.
+            record: Count the verse in the display statistics; False for
+                lookups that are not shown on the panel.
+        """
         # Check if we need to reset daily counter
-        now = datetime.now()
+        now = at or clock.now()
         if now.date() > self.daily_reset_time.date():
             self.statistics['verses_today'] = 0
             self.daily_reset_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        self.statistics['verses_displayed'] += 1
-        self.statistics['verses_today'] += 1
-        
-        if self.display_mode == 'date':
-            verse_data = self._get_date_based_verse()
-        elif self.display_mode == 'random':
-            verse_data = self._get_random_verse()
-        else:  # time mode
-            verse_data = self._get_time_based_verse()
+        if record:
+            self.statistics['verses_displayed'] += 1
+            self.statistics['verses_today'] += 1
         
-        # Add parallel translation if enabled (for all modes)
-        if self.parallel_mode and verse_data and not verse_data.get('is_summary') and not verse_data.get('is_date_event'):
-            verse_data = self._add_parallel_translation(verse_data)
+        with span('verse_resolve'):
+            if self.display_mode == 'date':
+                verse_data = self._get_date_based_verse(now)
+                performance_monitor.increment('verses_from_local')
+            elif self.display_mode == 'random':
+                verse_data = self._get_random_verse()
+                performance_monitor.increment('verses_from_local')
+            else:  # time mode
+                verse_data = self._get_time_based_verse(now, offline)
+            
+            # Copy so shared fallback entries are never modified, and record the slot
+            verse_data = dict(verse_data)
+            verse_data['slot_time'] = now.isoformat()
+            
+            # Add parallel translation if enabled (for all modes)
+            if self.parallel_mode and not offline and verse_data and not verse_data.get('is_summary') and not verse_data.get('is_date_event'):
+                verse_data = self._add_parallel_translation(verse_data)
         
         # Update statistics
-        self.statistics['mode_usage'][self.display_mode] += 1
-        if verse_data.get('book'):
-            self.statistics['books_accessed'].add(verse_data['book'])
-        
-        translation = getattr(self, 'translation', 'kjv')
-        self.statistics['translation_usage'][translation] = self.statistics['translation_usage'].get(translation, 0) + 1
+        if record:
+            self.statistics['mode_usage'][self.display_mode] += 1
+            if verse_data.get('book'):
+                self.statistics['books_accessed'].add(verse_data['book'])
+            
+            translation = getattr(self, 'translation', 'kjv')
+            self.statistics['translation_usage'][translation] = self.statistics['translation_usage'].get(translation, 0) + 1
         
         return verse_data
     
-    def _get_time_based_verse(self) -> Dict:
+    def get_next_content_change(self, after: Optional[datetime] = None) -> datetime:
+        """First minute boundary after the given time at which the verse changes.
+        
+        Time and random modes change every minute. Date mode changes every
+        DEVOTIONAL_INTERVAL minutes, with the cycle restarting each hour.
+        """
+        after = after or clock.now()
+        boundary = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        if self.display_mode != 'date':
+            return boundary
+        
+        interval = max(1, int(os.getenv('DEVOTIONAL_INTERVAL', '15')))
+        minute = boundary.minute
+        if minute % interval:
+            next_minute = min(60, (minute // interval + 1) * interval)
+            boundary += timedelta(minutes=next_minute - minute)
+        return boundary
+    
+    def content_changes_at(self, at: datetime) -> bool:
+        """Whether a new verse is due at the given minute boundary."""
+        return self.get_next_content_change(at - timedelta(seconds=1)) <= at
+    
+    def restamp_verse(self, verse_data: Dict, at: datetime) -> Dict:
+        """Copy of verse data re-stamped for a later minute that shows the same verse."""
+        verse_data = dict(verse_data)
+        verse_data['slot_time'] = at.isoformat()
+        if verse_data.get('next_verse_minutes'):
+            interval = int(os.getenv('DEVOTIONAL_INTERVAL', '15'))
+            verse_data['next_verse_minutes'] = interval - (at.minute % interval)
+        return verse_data
+    
+    def _get_time_based_verse(self, now: Optional[datetime] = None, offline: bool = False) -> Dict:
         """Time-based verse logic: HH:MM = Chapter:Verse, minute 00 = book summary."""
-        now = datetime.now()
+        now = now or clock.now()
         hour_24 = now.hour
         minute = now.minute
         
@@ -339,18 +394,23 @@ class VerseManager:
         
         verse = minute
         
-        verse_data = self._get_verse_from_api(chapter, verse)
-        if not verse_data:
+        verse_data = None if offline else self._get_verse_from_api(chapter, verse, now)
+        if verse_data:
+            performance_monitor.increment('verses_from_api')
+        else:
             verse_data = self._get_verse_from_local_data(chapter, verse)
+            if verse_data:
+                performance_monitor.increment('verses_from_local')
         if not verse_data:
             # No exact verse found - check if we should show a summary instead
-            verse_data = self._get_time_based_summary_or_fallback(chapter, verse)
+            performance_monitor.increment('verses_from_fallback')
+            verse_data = self._get_time_based_summary_or_fallback(chapter, verse, now)
         
         return verse_data
     
-    def _get_time_based_summary_or_fallback(self, chapter: int, verse: int) -> Dict:
+    def _get_time_based_summary_or_fallback(self, chapter: int, verse: int, now: Optional[datetime] = None) -> Dict:
         """Get a time-based book summary when no exact verse exists, or fallback."""
-        now = datetime.now()
+        now = now or clock.now()
         
         # Get books that have the requested chapter
         books_with_chapter = []
@@ -371,12 +431,12 @@ class VerseManager:
             
             # If no book has the exact verse, show summary instead
             if not has_exact_verse:
-                return self._get_time_based_book_summary(selected_book, chapter, verse)
+                return self._get_time_based_book_summary(selected_book, chapter, verse, now)
         
         # Final fallback to random verse
         return random.choice(self.fallback_verses)
     
-    def _get_time_based_book_summary(self, book: str, chapter: int, verse: int) -> Dict:
+    def _get_time_based_book_summary(self, book: str, chapter: int, verse: int, now: Optional[datetime] = None) -> Dict:
         """Get a book summary for time-based display when exact verse doesn't exist."""
         # Get book summary
         if self.book_summaries and book in self.book_summaries:
@@ -388,7 +448,7 @@ class VerseManager:
                 'summary': f'{book} is a book of the Bible containing wisdom and spiritual guidance.'
             }
         
-        now = datetime.now()
+        now = now or clock.now()
         # Format time with leading zeros for hours
         if self.time_format == '12':
             hour_12 = now.hour % 12
@@ -412,9 +472,9 @@ class VerseManager:
             'time_correlation': f'Time {time_display} → Chapter {chapter:02d}:Verse {verse:02d} → {book} Summary'
         }
     
-    def _get_date_based_verse(self) -> Dict:
+    def _get_date_based_verse(self, now: Optional[datetime] = None) -> Dict:
         """Get verse based on today's date and biblical events with 15-minute cycling."""
-        now = datetime.now()
+        now = now or clock.now()
         today = now.date()
         
         # Calculate which verse to show based on configurable devotional interval
@@ -551,8 +611,7 @@ class VerseManager:
             if translation != 'kjv':
                 url += f"?translation={translation}"
             
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            response = self._api_get(url)
             
             data = response.json()
             verse_text = data.get('text', '').strip()
@@ -574,6 +633,18 @@ class VerseManager:
             self.logger.debug(f"API request failed for {translation} {book} {chapter}:{verse}: {e}")
             return None
     
+    def _api_get(self, url: str) -> requests.Response:
+        """GET from the Bible API, counting requests and failures."""
+        performance_monitor.increment('api_requests')
+        try:
+            with span('api_fetch'):
+                response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException:
+            performance_monitor.increment('api_failures')
+            raise
+    
     def _get_random_verse(self) -> Dict:
         """Get a completely random verse."""
         return random.choice(self.fallback_verses)
@@ -600,11 +671,13 @@ class VerseManager:
             'is_summary': True
         }
     
-    def _get_verse_from_api(self, chapter: int, verse: int) -> Optional[Dict]:
+    def _get_verse_from_api(self, chapter: int, verse: int, now: Optional[datetime] = None) -> Optional[Dict]:
         """Get verse from API using systematic book selection and comprehensive validation."""
         if not self.api_url:
             return None
         
+        now = now or clock.now()
+        
         try:
             # Get all books that have this chapter systematically
             all_candidate_books = self._get_all_books_with_valid_verse(chapter, verse)
@@ -618,13 +691,11 @@ class VerseManager:
             
             if exact_match_books:
                 # Use time-based selection among books with exact verse match
-                now = datetime.now()
                 book_index = (now.hour + now.minute) % len(exact_match_books)
                 selected_book_data = exact_match_books[book_index]
                 self.logger.debug(f"Selected exact match: {selected_book_data['book']} {chapter}:{selected_book_data['verse']}")
             else:
                 # Fall back to any valid book
-                now = datetime.now()
                 book_index = (now.hour + now.minute) % len(all_candidate_books)
                 selected_book_data = all_candidate_books[book_index]
                 self.logger.debug(f"Selected adjusted verse: {selected_book_data['book']} {chapter}:{selected_book_data['verse']} (requested {verse})")
@@ -637,8 +708,7 @@ class VerseManager:
                 url += f"?translation={self.translation}"
             
             try:
-                response = requests.get(url, timeout=self.timeout)
-                response.raise_for_status()
+                response = self._api_get(url)
                 
                 data = response.json()
                 verse_text = data.get('text', '').strip()
@@ -801,6 +871,45 @@ class VerseManager:
             }
         }
     
+    def _load_statistics(self):
+        """Restore usage statistics saved by a previous run."""
+        if not self.statistics_path.exists():
+            return
+        try:
+            with open(self.statistics_path, 'r') as f:
+                saved = json.load(f)
+            
+            self.statistics['verses_displayed'] = saved.get('verses_displayed', 0)
+            self.statistics['books_accessed'] = set(saved.get('books_accessed', []))
+            self.statistics['translation_usage'] = saved.get('translation_usage', {})
+            self.statistics['mode_usage'].update(saved.get('mode_usage', {}))
+            if saved.get('date') == self.daily_reset_time.date().isoformat():
+                self.statistics['verses_today'] = saved.get('verses_today', 0)
+            
+            self._saved_verse_count = self.statistics['verses_displayed']
+            self.logger.info(f"Restored statistics ({self._saved_verse_count} verses displayed)")
+        except Exception as e:
+            self.logger.error(f"Failed to load statistics: {e}")
+    
+    def save_statistics(self):
+        """Save usage statistics so they survive restarts (skipped when unchanged)."""
+        if self.statistics['verses_displayed'] == self._saved_verse_count:
+            return
+        try:
+            saved = self.get_statistics()
+            saved['date'] = self.daily_reset_time.date().isoformat()
+            del saved['uptime']
+            
+            # Write then rename, so a power cut never leaves a truncated file
+            self.statistics_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.statistics_path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump(saved, f)
+            os.replace(temp_path, self.statistics_path)
+            self._saved_verse_count = saved['verses_displayed']
+        except Exception as e:
+            self.logger.error(f"Failed to save statistics: {e}")
+    
     def get_statistics(self) -> Dict:
         """Get usage statistics."""
         stats = self.statistics.copy()
@@ -833,8 +942,7 @@ class VerseManager:
             if self.secondary_translation != 'kjv':
                 url += f"?translation={self.secondary_translation}"
             
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            response = self._api_get(url)
             
             secondary_data = response.json()
             secondary_text = secondary_data.get('text', '').strip()
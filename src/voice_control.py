@@ -12,6 +12,11 @@ from typing import Optional, Callable, Dict, Any, List
 import queue
 from datetime import datetime
 
+from performance_monitor import performance_monitor
+from stall_watchdog import stall_watchdog
+from current_state import current_state
+from event_bus import event_bus
+
 class BibleClockVoiceControl:
     """
     Bible Clock voice control with automatic Porcupine/SpeechRecognition selection.
@@ -70,6 +75,7 @@ class BibleClockVoiceControl:
         self.microphone = None
         self.tts_engine = None
         self.listening = False
+        self.voice_state = 'stopped'  # stopped, idle, listening, processing or speaking
         self.command_queue = queue.Queue()
         self.voice_selection = 'default'  # Store current voice selection
         
@@ -433,8 +439,9 @@ class BibleClockVoiceControl:
             return
         
         self.listening = True
-        listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
-        command_thread = threading.Thread(target=self._command_processor, daemon=True)
+        self._set_voice_state('idle')
+        listen_thread = threading.Thread(target=self._listen_loop, name='voice-listen', daemon=True)
+        command_thread = threading.Thread(target=self._command_processor, name='voice-commands', daemon=True)
         
         listen_thread.start()
         command_thread.start()
@@ -445,6 +452,7 @@ class BibleClockVoiceControl:
     def stop_listening(self):
         """Stop voice control."""
         self.listening = False
+        self._set_voice_state('stopped')
         self.logger.info("Bible Clock voice control stopped")
     
     def _listen_loop(self):
@@ -474,7 +482,8 @@ class BibleClockVoiceControl:
                 
                 try:
                     # Recognize speech
-                    text = self.recognizer.recognize_google(audio).lower()
+                    with performance_monitor.time_operation('voice_recognize'):
+                        text = self.recognizer.recognize_google(audio).lower()
                     self.logger.debug(f"Heard: {text}")
                     
                     # Check for wake word "Bible Clock"
@@ -495,6 +504,7 @@ class BibleClockVoiceControl:
     
     def _handle_wake_word_detection(self, initial_text: str):
         """Handle wake word detection and capture full command."""
+        self._set_voice_state('listening')
         try:
             # Extract command after wake word
             wake_word_index = initial_text.find(self.wake_word)
@@ -511,17 +521,20 @@ class BibleClockVoiceControl:
             
             if full_command:
                 self.command_queue.put(('process_command', full_command))
+            else:
+                self._set_voice_state('idle')
             
         except Exception as e:
             self.logger.error(f"Error handling wake word: {e}")
             self._speak("I'm sorry, I didn't understand that. Say 'Bible Clock help' for assistance.")
+            self._set_voice_state('idle')
     
     def _listen_for_command(self) -> Optional[str]:
         """Listen for the actual command after wake word detection."""
         try:
             import speech_recognition as sr
             
-            with self.microphone as source:
+            with self.microphone as source, performance_monitor.time_operation('voice_listen'):
                 self.logger.info("Listening for command...")
                 # Listen for longer phrase with extended timeout
                 audio = self.recognizer.listen(
@@ -530,7 +543,8 @@ class BibleClockVoiceControl:
                     phrase_time_limit=self.phrase_limit
                 )
             
-            command = self.recognizer.recognize_google(audio)
+            with performance_monitor.time_operation('voice_recognize'):
+                command = self.recognizer.recognize_google(audio)
             self.logger.info(f"Command received: {command}")
             return command.strip()
             
@@ -554,7 +568,13 @@ class BibleClockVoiceControl:
                 command_type, command_data = self.command_queue.get(timeout=1)
                 
                 if command_type == 'process_command':
-                    self._process_command(command_data)
+                    performance_monitor.increment('voice_commands')
+                    self._set_voice_state('processing')
+                    try:
+                        with performance_monitor.time_operation('voice_command'):
+                            self._process_command(command_data)
+                    finally:
+                        self._set_voice_state('idle')
                 elif command_type == 'speak':
                     self._speak(command_data)
                 
@@ -569,9 +589,9 @@ class BibleClockVoiceControl:
         """Process voice commands with help system and ChatGPT integration."""
         text_lower = text.lower().strip()
         
-        # Update current verse context
+        # Update current verse context from the frame on the panel
         try:
-            self.current_verse_context = self.verse_manager.get_current_verse()
+            self.current_verse_context = current_state.verse_data(self.verse_manager)
         except Exception as e:
             self.logger.error(f"Error getting current verse: {e}")
         
@@ -777,13 +797,16 @@ class BibleClockVoiceControl:
             messages.append({"role": "user", "content": question})
             
             # Call ChatGPT API
-            response = openai.ChatCompletion.create(
-                model=self.chatgpt_model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                timeout=self.chatgpt_timeout
-            )
+            performance_monitor.increment('chatgpt_requests')
+            with performance_monitor.time_operation('voice_chatgpt'), \
+                    stall_watchdog.watch('chatgpt', self.chatgpt_timeout + 30):
+                response = openai.ChatCompletion.create(
+                    model=self.chatgpt_model,
+                    messages=messages,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    timeout=self.chatgpt_timeout
+                )
             
             # Calculate response time
             response_time = time.time() - start_time
@@ -793,6 +816,8 @@ class BibleClockVoiceControl:
             total_tokens = token_usage.get('total_tokens', 0)
             prompt_tokens = token_usage.get('prompt_tokens', 0)
             completion_tokens = token_usage.get('completion_tokens', 0)
+            performance_monitor.increment('chatgpt_prompt_tokens', prompt_tokens)
+            performance_monitor.increment('chatgpt_completion_tokens', completion_tokens)
             
             # Update token usage statistics
             self._update_token_stats(total_tokens, response_time, True)
@@ -824,6 +849,7 @@ class BibleClockVoiceControl:
             # Update failed request stats
             response_time = time.time() - start_time
             self._update_token_stats(0, response_time, False)
+            performance_monitor.increment('chatgpt_failures')
             
             self.logger.error(f"ChatGPT processing error: {e}")
             self._speak("I'm sorry, I'm having trouble accessing my biblical knowledge base right now. Please try again later.")
@@ -884,7 +910,7 @@ class BibleClockVoiceControl:
     def _speak_current_verse(self):
         """Speak the current verse aloud."""
         try:
-            verse_data = self.verse_manager.get_current_verse()
+            verse_data = current_state.verse_data(self.verse_manager)
             
             if verse_data.get('is_summary'):
                 text_to_speak = f"Here is a summary for the book of {verse_data['book']}. {verse_data['text']}"
@@ -902,7 +928,7 @@ class BibleClockVoiceControl:
     def _speak_current_verse_info(self):
         """Speak information about the current verse."""
         try:
-            verse_data = self.verse_manager.get_current_verse()
+            verse_data = current_state.verse_data(self.verse_manager)
             
             if verse_data.get('is_summary'):
                 info = f"Currently displaying a summary for the book of {verse_data['book']}"
@@ -1069,10 +1095,11 @@ class BibleClockVoiceControl:
     def _speak_system_status(self):
         """Speak system status information."""
         try:
-            import psutil
+            from system_metrics import system_metrics
             
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory_percent = psutil.virtual_memory().percent
+            metrics = system_metrics.latest()
+            cpu_percent = metrics.cpu_percent
+            memory_percent = metrics.memory_percent
             
             # Determine status description
             if cpu_percent < 50 and memory_percent < 70:
@@ -1098,9 +1125,10 @@ class BibleClockVoiceControl:
     def _refresh_display(self):
         """Refresh the display with current verse."""
         try:
-            verse_data = self.verse_manager.get_current_verse()
+            verse_data = current_state.verse_data(self.verse_manager)
             image = self.image_generator.create_verse_image(verse_data)
             self.display_manager.display_image(image, force_refresh=True)
+            event_bus.publish('refresh', {'source': 'voice', 'reference': verse_data.get('reference')})
             
             self._speak("Display has been refreshed")
             
@@ -1128,12 +1156,15 @@ class BibleClockVoiceControl:
             self.logger.warning(f"TTS not available - would speak: {text[:100]}{'...' if len(text) > 100 else ''}")
             return
         
+        previous_state = self.voice_state
         try:
             # Log what's being spoken (truncated for readability)
             self.logger.info(f"Speaking: {text[:100]}{'...' if len(text) > 100 else ''}")
             
             # Enhance speech for better clarity
             enhanced_text = self._enhance_speech_text(text)
+            start = time.perf_counter()
+            self._set_voice_state('speaking')
             
             # Configure audio output device (USB audio preferred, ReSpeaker legacy)
             if self.usb_audio_enabled and self.audio_output_enabled:
@@ -1159,9 +1190,21 @@ class BibleClockVoiceControl:
                 self.tts_engine.say(enhanced_text)
                 self.tts_engine.runAndWait()
             
+            performance_monitor.record_operation_time('voice_speak', time.perf_counter() - start)
+        
         except Exception as e:
             self.logger.error(f"TTS error: {e}")
             self.logger.warning(f"Failed to speak: {text[:100]}{'...' if len(text) > 100 else ''}")
+        finally:
+            if self.voice_state == 'speaking':
+                self._set_voice_state(previous_state)
+    
+    def _set_voice_state(self, state: str):
+        """Record the assistant's state and push it to the dashboard."""
+        if state == self.voice_state:
+            return
+        self.voice_state = state
+        event_bus.publish('voice', {'state': state})
     
     def _enhance_speech_text(self, text: str) -> str:
         """Enhance text for better speech synthesis."""
@@ -1218,6 +1261,7 @@ class BibleClockVoiceControl:
         return {
             'enabled': self.enabled,
             'listening': self.listening,
+            'state': self.voice_state,
             'wake_word': self.wake_word,
             'chatgpt_enabled': self.chatgpt_enabled,
             'help_enabled': self.help_enabled,
@@ -2,23 +2,51 @@
 Enhanced web interface for Bible Clock with full configuration and statistics.
 """
 
+import contextlib
+import functools
+import hmac
+import io
 import json
 import logging
 import os
+import time
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, render_template, send_file
+from flask import Flask, Response, g, jsonify, request, render_template, send_file
 from pathlib import Path
-import psutil
 from src.conversation_manager import ConversationManager
+from performance_monitor import span
+from system_metrics import system_metrics
+from metrics_exporter import MetricsExporter, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from sampling_profiler import profiler
+from memory_diagnostics import memory_diagnostics
+from thread_registry import thread_registry
+from stall_watchdog import stall_watchdog
+from timeseries_store import timeseries_store
+from current_state import current_state
+from event_bus import event_bus
+from frame_encoder import FrameEncoder
+
+# Statistics page history ranges, in days
+HISTORY_RANGES = {'1d': 1, '7d': 7, '28d': 28, '365d': 365}
+
+# Requests slower than this are logged with their spans (seconds)
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '1.0'))
+
+# Event stream timing (seconds): keep-alive comments, metrics pushes, and how long one
+# stream holds a web worker before the browser is asked to reconnect
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', '15'))
+EVENTS_METRICS_INTERVAL = float(os.getenv('EVENTS_METRICS_INTERVAL', '30'))
+EVENTS_STREAM_SECONDS = float(os.getenv('EVENTS_STREAM_SECONDS', '600'))
 
 def create_app(verse_manager, image_generator, display_manager, service_manager, performance_monitor):
     """Create enhanced Flask application."""
     app = Flask(__name__, template_folder='templates', static_folder='static')
     app.logger.setLevel(logging.INFO)
     
-    # Disable template caching for development
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
-    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+    # Reload templates and disable static caching only while developing
+    debug = os.getenv('WEB_DEBUG', 'false').lower() == 'true'
+    app.config['TEMPLATES_AUTO_RELOAD'] = debug
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0 if debug else int(os.getenv('WEB_STATIC_MAX_AGE', '600'))
     
     # Store component references
     app.verse_manager = verse_manager
@@ -27,6 +55,56 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
     app.service_manager = service_manager
     app.performance_monitor = performance_monitor
     app.conversation_manager = ConversationManager()
+    memory_diagnostics.register('conversation_sessions', lambda: app.conversation_manager.sessions)
+    app.metrics_exporter = MetricsExporter(performance_monitor, service_manager) if performance_monitor else None
+    app.frame_encoder = FrameEncoder()
+    
+    def _require_admin(view):
+        """Allow a view only for requests carrying the ADMIN_TOKEN bearer token."""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            token = os.getenv('ADMIN_TOKEN', '')
+            if not token:
+                return jsonify({'success': False, 'error': 'Admin endpoints are disabled (ADMIN_TOKEN not set)'}), 403
+            
+            auth = request.headers.get('Authorization', '')
+            supplied = auth[7:] if auth.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+            return view(*args, **kwargs)
+        return wrapper
+    
+    # === Request Timing ===
+    
+    @app.before_request
+    def _start_request_timing():
+        """Collect the spans of this request for its Server-Timing header."""
+        if performance_monitor:
+            g.request_trace_stack = contextlib.ExitStack()
+            g.request_trace = g.request_trace_stack.enter_context(performance_monitor.trace_request())
+    
+    @app.after_request
+    def _finish_request_timing(response):
+        """Record the route's latency and report where the time went."""
+        trace = g.pop('request_trace', None)
+        if trace is None:
+            return response
+        
+        duration = time.perf_counter() - trace.started
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        performance_monitor.record_operation_time(f'http.{route}', duration)
+        
+        timing = trace.server_timing(duration)
+        response.headers['Server-Timing'] = timing
+        if duration > SLOW_REQUEST_SECONDS:
+            app.logger.warning(f"Slow request {route}: {timing}")
+        return response
+    
+    @app.teardown_request
+    def _end_request_timing(error=None):
+        stack = g.pop('request_trace_stack', None)
+        if stack:
+            stack.close()
     
     @app.route('/')
     def index():
@@ -48,51 +126,129 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
         """Voice control page."""
         return render_template('voice_control.html')
     
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics from in-memory counters."""
+        if not app.metrics_exporter:
+            return Response('performance monitoring unavailable\n', status=503, mimetype='text/plain')
+        return Response(app.metrics_exporter.render(), content_type=METRICS_CONTENT_TYPE)
+    
     # === API Endpoints ===
     
     @app.route('/api/verse', methods=['GET'])
     def get_current_verse():
-        """Get the current verse as JSON."""
+        """Get the verse on the panel as JSON."""
         try:
-            verse_data = app.verse_manager.get_current_verse()
+            # Read the committed frame; resolving again would count as a display
+            snapshot = current_state.get()
+            verse_data = current_state.verse_data(app.verse_manager)
             verse_data['timestamp'] = datetime.now().isoformat()
             
             return jsonify({
                 'success': True,
-                'data': verse_data
+                'data': verse_data,
+                'frame': snapshot.to_dict() if snapshot else None
             })
         except Exception as e:
             app.logger.error(f"API error: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
+    @app.route('/api/events', methods=['GET'])
+    def stream_events():
+        """Server-Sent Events stream of verse, settings, voice, refresh and metrics updates."""
+        subscription = event_bus.subscribe(request.headers.get('Last-Event-ID'))
+        if subscription is None:
+            # Every stream holds a web worker; refused clients keep polling
+            return jsonify({'success': False, 'error': 'Too many live update streams'}), 503, {'Retry-After': '60'}
+        web_server = getattr(app.service_manager, 'web_server', None)
+        
+        def stream():
+            try:
+                yield f"retry: {int(EVENTS_HEARTBEAT * 1000)}\n\n".encode()
+                yield _metrics_event()
+                now = time.monotonic()
+                deadline = now + EVENTS_STREAM_SECONDS
+                next_metrics = now + EVENTS_METRICS_INTERVAL
+                while time.monotonic() < deadline:
+                    timeout = max(0.0, min(EVENTS_HEARTBEAT, next_metrics - time.monotonic()))
+                    event = subscription.get(timeout)
+                    if event is not None:
+                        yield event.encode()
+                        continue
+                    if subscription.closed:
+                        break
+                    if web_server is not None and web_server.saturated():
+                        break  # Hand the worker to a queued request; the browser reconnects
+                    if time.monotonic() >= next_metrics:
+                        next_metrics = time.monotonic() + EVENTS_METRICS_INTERVAL
+                        yield _metrics_event()
+                    else:
+                        yield b": keep-alive\n\n"
+            finally:
+                event_bus.unsubscribe(subscription)
+        
+        return Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    def _metrics_event() -> bytes:
+        """Dashboard status figures as an unnumbered 'metrics' event, from the latest sample."""
+        metrics = system_metrics.latest()
+        data = {
+            'verses_today': getattr(app.verse_manager, 'statistics', {}).get('verses_today', 0),
+            'system': {
+                'cpu_percent': metrics.cpu_percent,
+                'memory_percent': metrics.memory_percent,
+                'cpu_temperature': _get_cpu_temperature(metrics),
+                'sampled_at': datetime.fromtimestamp(metrics.timestamp).isoformat()
+            }
+        }
+        return f"event: metrics\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+    
     @app.route('/api/status', methods=['GET'])
     def get_status():
         """Get comprehensive system status."""
         try:
             # Check simulation mode from display manager
             simulation_mode = getattr(app.display_manager, 'simulation_mode', False)
+            emulation_mode = getattr(app.display_manager, 'emulation_mode', False)
             
+            if emulation_mode:
+                hardware_mode = 'Emulator'
+            else:
+                hardware_mode = 'Simulation' if simulation_mode else 'Hardware'
+            
+            metrics = system_metrics.latest()
             status = {
                 'timestamp': datetime.now().isoformat(),
                 'translation': app.verse_manager.translation,
                 'api_url': app.verse_manager.api_url,
                 'display_mode': getattr(app.verse_manager, 'display_mode', 'time'),
                 'simulation_mode': simulation_mode,
-                'hardware_mode': 'Simulation' if simulation_mode else 'Hardware',
+                'hardware_mode': hardware_mode,
                 'current_background': app.image_generator.get_current_background_info(),
                 'verses_today': getattr(app.verse_manager, 'statistics', {}).get('verses_today', 0),
                 'system': {
-                    'cpu_percent': psutil.cpu_percent(),
-                    'memory_percent': psutil.virtual_memory().percent,
-                    'disk_percent': psutil.disk_usage('/').percent,
-                    'cpu_temperature': _get_cpu_temperature(),
-                    'uptime': _get_uptime()
+                    'cpu_percent': metrics.cpu_percent,
+                    'memory_percent': metrics.memory_percent,
+                    'disk_percent': metrics.disk_percent,
+                    'cpu_temperature': _get_cpu_temperature(metrics),
+                    'load_average': metrics.load_average,
+                    'uptime': _get_uptime(metrics),
+                    'sampled_at': datetime.fromtimestamp(metrics.timestamp).isoformat()
                 }
             }
             
             if app.performance_monitor:
                 status['performance'] = app.performance_monitor.get_performance_summary()
             
+            status['memory'] = memory_diagnostics.get_status()
+            status['threads'] = thread_registry.get_report(history=5)
+            status['watchdog'] = stall_watchdog.get_status()
+            status['frames'] = app.frame_encoder.get_status()
+            
+            if emulation_mode:
+                status['emulator'] = app.display_manager.get_emulator_stats()
+            
             return jsonify({'success': True, 'data': status})
         except Exception as e:
             app.logger.error(f"Status API error: {e}")
@@ -189,10 +345,9 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             
             # Force display update
             if data.get('update_display', False):
-                verse_data = app.verse_manager.get_current_verse()
-                image = app.image_generator.create_verse_image(verse_data)
-                app.display_manager.display_image(image, force_refresh=True)
+                _redraw_display(new_verse=True)
             
+            event_bus.publish('settings', {'changed': sorted(key for key in data if key != 'update_display')})
             return jsonify({'success': True, 'message': 'Settings updated successfully'})
             
         except Exception as e:
@@ -223,8 +378,12 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
     
     @app.route('/api/statistics', methods=['GET'])
     def get_statistics():
-        """Get usage statistics."""
+        """Get usage statistics, with long-term history for ?range=1d|7d|28d|365d."""
         try:
+            days = HISTORY_RANGES.get(request.args.get('range', '7d'))
+            if days is None:
+                return jsonify({'success': False, 'error': f"range must be one of {', '.join(HISTORY_RANGES)}"}), 400
+            
             if hasattr(app.verse_manager, 'get_statistics'):
                 stats = app.verse_manager.get_statistics()
             else:
@@ -246,6 +405,7 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
                     'daily_usage': {}
                 }
             
+            stats['history'] = timeseries_store.history(days * 86400)
             return jsonify({'success': True, 'data': stats})
         except Exception as e:
             app.logger.error(f"Statistics API error: {e}")
@@ -255,10 +415,9 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
     def force_refresh():
         """Force display refresh."""
         try:
-            verse_data = app.verse_manager.get_current_verse()
-            image = app.image_generator.create_verse_image(verse_data)
-            app.display_manager.display_image(image, force_refresh=True)
+            verse_data = _redraw_display()
             
+            event_bus.publish('refresh', {'source': 'web', 'reference': verse_data.get('reference')})
             return jsonify({'success': True, 'message': 'Display refreshed'})
         except Exception as e:
             app.logger.error(f"Refresh error: {e}")
@@ -272,10 +431,9 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             
             # Update display if requested
             if request.get_json() and request.get_json().get('update_display', False):
-                verse_data = app.verse_manager.get_current_verse()
-                image = app.image_generator.create_verse_image(verse_data)
-                app.display_manager.display_image(image, force_refresh=True)
+                _redraw_display()
             
+            event_bus.publish('settings', {'changed': ['background']})
             return jsonify({
                 'success': True, 
                 'message': 'Background cycled',
@@ -293,10 +451,9 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             
             # Update display if requested
             if request.get_json() and request.get_json().get('update_display', False):
-                verse_data = app.verse_manager.get_current_verse()
-                image = app.image_generator.create_verse_image(verse_data)
-                app.display_manager.display_image(image, force_refresh=True)
+                _redraw_display()
             
+            event_bus.publish('settings', {'changed': ['background']})
             return jsonify({
                 'success': True, 
                 'message': 'Background randomized',
@@ -316,6 +473,7 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             
             app.image_generator.set_background_cycling(enabled, interval)
             
+            event_bus.publish('settings', {'changed': ['background_cycling']})
             return jsonify({
                 'success': True,
                 'message': 'Background cycling updated',
@@ -373,19 +531,16 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
                         reference_size=sizes.get('reference_size')
                     )
                 
-                # Generate preview
-                verse_data = app.verse_manager.get_current_verse()
-                image = app.image_generator.create_verse_image(verse_data)
-                
-                # Save preview image
-                preview_path = Path('src/web_interface/static/preview.png')
-                preview_path.parent.mkdir(exist_ok=True)
-                image.save(preview_path)
+                # Generate preview; it is kept in memory and encoded when fetched
+                verse_data = current_state.verse_data(app.verse_manager)
+                with span('preview_render'):
+                    image = app.image_generator.create_verse_image(verse_data)
+                preview_id = app.frame_encoder.add_preview(image)
                 
                 # Return success with metadata
                 return jsonify({
                     'success': True, 
-                    'preview_url': f'/static/preview.png?t={datetime.now().timestamp()}',
+                    'preview_url': f'/api/preview/{preview_id}',
                     'timestamp': datetime.now().isoformat(),
                     'background_name': f"Background {app.image_generator.current_background_index + 1}",
                     'font_name': app.image_generator.current_font_name,
@@ -409,6 +564,67 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             app.logger.error(f"Preview error: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
+    @app.route('/api/preview/<preview_id>', methods=['GET'])
+    def get_preview_image(preview_id):
+        """Serve a rendered preview from memory (?format=png|webp, ?width=N)."""
+        try:
+            image = app.frame_encoder.get_preview(preview_id)
+            if image is None:
+                return jsonify({'success': False, 'error': 'Preview expired, generate it again'}), 404
+            # The id is the preview's content hash, so the URL never changes meaning
+            return _send_frame(image, 'private, max-age=3600, immutable')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Preview image error: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
+    @app.route('/api/display/frame', methods=['GET'])
+    def get_display_frame():
+        """Serve the frame on the panel from memory (?format=png|webp, ?width=N)."""
+        try:
+            # The simulation sink's frame includes badges; otherwise use the committed frame
+            frame = app.display_manager.get_latest_frame() or getattr(app.display_manager, 'current_frame', None)
+            if frame is None:
+                return jsonify({'success': False, 'error': 'No frame available'}), 404
+            # Browsers revalidate each time and get a 304 while the panel is unchanged
+            return _send_frame(frame, 'no-cache')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Display frame error: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def _redraw_display(new_verse: bool = False) -> dict:
+        """Redraw the panel with a full refresh and publish the frame to current_state.
+        
+        new_verse resolves the verse again (after a mode or translation
+        change); otherwise the verse on the panel is redrawn.
+        """
+        pipeline = getattr(app.service_manager, 'render_pipeline', None)
+        if pipeline is not None:
+            return pipeline.show_now(force_refresh=True) if new_verse else pipeline.redraw()
+        
+        # Without a service there is no pipeline to commit through
+        verse_data = app.verse_manager.get_current_verse() if new_verse else current_state.verse_data(app.verse_manager)
+        image, clock_layout = app.image_generator.create_verse_frame(verse_data)
+        app.display_manager.display_image(image, force_refresh=True, clock_layout=clock_layout,
+                                          content_key=app.image_generator.get_content_key(verse_data))
+        return verse_data
+    
+    def _send_frame(image, cache_control: str) -> Response:
+        """Encoded image response with a content-hash ETag, answering If-None-Match with 304."""
+        fmt = app.frame_encoder.negotiate(request.args.get('format'), request.headers.get('Accept', ''))
+        width = request.args.get('width', type=int)
+        encoded = app.frame_encoder.encode(image, fmt, width)
+        
+        response = Response(encoded.data, mimetype=encoded.mimetype)
+        response.set_etag(encoded.etag)
+        response.headers['Cache-Control'] = cache_control
+        if 'format' not in request.args:
+            response.vary.add('Accept')
+        return response.make_conditional(request)
+    
     @app.route('/api/voice/status', methods=['GET'])
     def get_voice_status():
         """Get voice control status."""
@@ -551,6 +767,7 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
                                 voice_control.tts_engine.setProperty('voice', voices[1].id)
                         # 'default' uses system default (no change needed)
             
+            event_bus.publish('settings', {'changed': sorted('voice.' + key for key in data)})
             return jsonify({'success': True, 'message': 'Voice settings updated successfully'})
             
         except Exception as e:
@@ -702,24 +919,26 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             try:
                 # Try to find piper binary
                 piper_cmd = None
-                for cmd in ['piper', '/usr/local/bin/piper', './piper/piper']:
-                    try:
-                        result = subprocess.run([cmd, '--help'], capture_output=True, timeout=5)
-                        if result.returncode == 0:
-                            piper_cmd = cmd
-                            break
-                    except:
-                        continue
+                with span('piper_lookup'):
+                    for cmd in ['piper', '/usr/local/bin/piper', './piper/piper']:
+                        try:
+                            result = subprocess.run([cmd, '--help'], capture_output=True, timeout=5)
+                            if result.returncode == 0:
+                                piper_cmd = cmd
+                                break
+                        except:
+                            continue
                 
                 if not piper_cmd:
                     return jsonify({'success': False, 'error': 'Piper TTS not found. Please install Piper first.'}), 500
                 
                 # Run Piper TTS
-                result = subprocess.run([
-                    piper_cmd,
-                    '--model', str(voice_model),
-                    '--output_file', temp_path
-                ], input=preview_text, text=True, capture_output=True, timeout=30)
+                with span('piper'):
+                    result = subprocess.run([
+                        piper_cmd,
+                        '--model', str(voice_model),
+                        '--output_file', temp_path
+                    ], input=preview_text, text=True, capture_output=True, timeout=30)
                 
                 if result.returncode == 0:
                     file_size = os.path.getsize(temp_path)
@@ -727,8 +946,9 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
                     # Try to play the audio
                     play_success = False
                     try:
-                        play_result = subprocess.run(['aplay', temp_path], 
-                                                   capture_output=True, timeout=10)
+                        with span('aplay'):
+                            play_result = subprocess.run(['aplay', temp_path], 
+                                                       capture_output=True, timeout=10)
                         play_success = play_result.returncode == 0
                     except:
                         pass
@@ -859,7 +1079,8 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             import subprocess
             
             # Get playback devices
-            playback_result = subprocess.run(['aplay', '-l'], capture_output=True, text=True)
+            with span('aplay'):
+                playback_result = subprocess.run(['aplay', '-l'], capture_output=True, text=True)
             playback_devices = []
             if playback_result.returncode == 0:
                 for line in playback_result.stdout.split('\n'):
@@ -875,7 +1096,8 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
                             })
             
             # Get recording devices
-            recording_result = subprocess.run(['arecord', '-l'], capture_output=True, text=True)
+            with span('arecord'):
+                recording_result = subprocess.run(['arecord', '-l'], capture_output=True, text=True)
             recording_devices = []
             if recording_result.returncode == 0:
                 for line in recording_result.stdout.split('\n'):
@@ -1076,53 +1298,86 @@ def create_app(verse_manager, image_generator, display_manager, service_manager,
             app.logger.error(f"Audio volume API error: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    # === Admin Endpoints ===
+    
+    @app.route('/api/admin/profile', methods=['POST'])
+    @_require_admin
+    def run_profile():
+        """Sample every thread's stack for a while and return collapsed stacks."""
+        try:
+            seconds = float(request.args.get('seconds', '10'))
+            interval_ms = request.args.get('interval_ms')
+            interval = float(interval_ms) / 1000 if interval_ms else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'seconds and interval_ms must be numbers'}), 400
+        
+        try:
+            result = profiler.profile(seconds, interval)
+        except RuntimeError as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
+        
+        if request.args.get('format') == 'json':
+            return jsonify({'success': True, 'data': result.to_dict()})
+        
+        filename = f"bible-clock-{result.started.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        return Response(result.collapsed(), mimetype='text/plain', headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Profile-Samples': str(result.samples)
+        })
+    
+    @app.route('/api/admin/memory/snapshot', methods=['GET'])
+    @_require_admin
+    def download_memory_snapshot():
+        """Download a tracemalloc snapshot (load with tracemalloc.Snapshot.load)."""
+        data = memory_diagnostics.dump_snapshot()
+        if data is None:
+            return jsonify({'success': False, 'error': 'tracemalloc is not running (set MEMORY_TRACEMALLOC=true)'}), 409
+        
+        filename = f"bible-clock-{datetime.now().strftime('%Y%m%d-%H%M%S')}.tracemalloc"
+        return send_file(io.BytesIO(data), mimetype='application/octet-stream',
+                         as_attachment=True, download_name=filename)
+    
+    @app.route('/api/admin/stacks', methods=['GET'])
+    @_require_admin
+    def get_stack_dumps():
+        """Thread stacks captured by the stall watchdog; ?capture=true takes one now."""
+        if request.args.get('capture', 'false').lower() == 'true':
+            stall_watchdog.dump_stacks('requested via web interface')
+        return jsonify({'success': True, 'data': {
+            'degraded': stall_watchdog.degraded(),
+            'dumps': stall_watchdog.get_dumps()
+        }})
+    
     @app.route('/health')
     def health_check():
         """Health check endpoint."""
+        degraded = stall_watchdog.degraded()
         return jsonify({
-            'status': 'healthy',
+            'status': 'degraded' if degraded else 'healthy',
+            'degraded': degraded,
             'timestamp': datetime.now().isoformat(),
             'version': '2.0.0'
         })
     
-    def _get_uptime():
+    def _get_uptime(metrics=None):
         """Get system uptime."""
-        try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.readline().split()[0])
-                return str(timedelta(seconds=int(uptime_seconds)))
-        except:
-            return "Unknown"
+        metrics = metrics or system_metrics.latest()
+        return str(timedelta(seconds=int(metrics.uptime_seconds)))
     
-    def _get_cpu_temperature():
+    def _get_cpu_temperature(metrics=None):
         """Get CPU temperature."""
-        try:
-            # Try Raspberry Pi thermal zone first
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp_millidegrees = int(f.read().strip())
-                temp_celsius = temp_millidegrees / 1000.0
-                return round(temp_celsius, 1)
-        except:
-            try:
-                # Try alternative thermal zones
-                import glob
-                thermal_files = glob.glob('/sys/class/thermal/thermal_zone*/temp')
-                if thermal_files:
-                    with open(thermal_files[0], 'r') as f:
-                        temp_millidegrees = int(f.read().strip())
-                        temp_celsius = temp_millidegrees / 1000.0
-                        return round(temp_celsius, 1)
-            except:
-                pass
-            
-            # Simulation mode - return simulated temperature
-            import random
-            simulation_mode = os.getenv('SIMULATION_MODE', 'false').lower() == 'true'
-            if simulation_mode:
-                # Return a realistic simulated temperature
-                return round(45.0 + random.uniform(-5, 10), 1)
-            
-            return None
+        metrics = metrics or system_metrics.latest()
+        if metrics.temperature is not None:
+            return metrics.temperature
+        
+        # Simulation mode - return simulated temperature
+        import random
+        simulation_mode = os.getenv('SIMULATION_MODE', 'false').lower() == 'true'
+        if simulation_mode:
+            # Return a realistic simulated temperature
+            return round(45.0 + random.uniform(-5, 10), 1)
+        
+        return None
     
     def _generate_basic_statistics():
         """Generate basic statistics."""
@@ -13,10 +13,13 @@ const BibleClock = {
         backgrounds: '/api/backgrounds',
         fonts: '/api/fonts',
         refresh: '/api/refresh',
-        preview: '/api/preview'
+        preview: '/api/preview',
+        events: '/api/events'
     },
     settings: {},
     isOnline: true,
+    liveUpdates: false,  // True while the event stream is connected; polling pauses
+    eventSource: null,
     refreshInterval: null,
     charts: {}
 };
@@ -51,9 +54,44 @@ function initializeApp() {
     }
     
     // Start global monitoring
+    startLiveUpdates();
     startStatusMonitoring();
 }
 
+/**
+ * Connect to the server's event stream and re-dispatch its events as
+ * `bibleclock:<type>` DOM events. Pages poll only while it is down.
+ */
+function startLiveUpdates() {
+    if (!window.EventSource) {
+        return;
+    }
+    
+    const source = new EventSource(BibleClock.apiEndpoints.events);
+    BibleClock.eventSource = source;
+    
+    source.addEventListener('open', () => {
+        BibleClock.liveUpdates = true;
+        BibleClock.isOnline = true;
+        updateConnectionStatus(true);
+    });
+    
+    source.addEventListener('error', () => {
+        BibleClock.liveUpdates = false;
+        if (source.readyState === EventSource.CLOSED) {
+            // Refused (stream limit reached) or failed; poll for a while, then try again
+            BibleClock.eventSource = null;
+            setTimeout(startLiveUpdates, 60000);
+        }
+    });
+    
+    ['verse', 'settings', 'voice', 'refresh', 'metrics'].forEach(type => {
+        source.addEventListener(type, event => {
+            document.dispatchEvent(new CustomEvent(`bibleclock:${type}`, { detail: JSON.parse(event.data) }));
+        });
+    });
+}
+
 /**
  * Initialize dashboard functionality
  */
@@ -148,6 +186,10 @@ function startStatusMonitoring() {
  * Check if the API is responding
  */
 function checkOnlineStatus() {
+    if (BibleClock.liveUpdates) {
+        return;  // The open event stream already shows the server is up
+    }
+    
     fetch('/health', { 
         method: 'GET',
         cache: 'no-cache',
@@ -577,6 +619,7 @@ function hideTooltip() {
 
 // Export global functions for use in templates
 window.BibleClock = BibleClock;
+window.startLiveUpdates = startLiveUpdates;
 window.refreshDisplay = refreshDisplay;
 window.generatePreview = generatePreview;
 window.showNotification = showNotification;
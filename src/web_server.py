@@ -0,0 +1,294 @@
+"""
+Production WSGI server for the web interface.
+"""
+
+import os
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+from wsgiref.simple_server import ServerHandler, WSGIRequestHandler, WSGIServer
+
+# Sent when every worker is busy and the queue is full
+OVERLOADED_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Retry-After: 1\r\n"
+    b"Content-Length: 0\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+# Seconds a new connection may wait for idle keep-alive connections to hand back their slots
+IDLE_RELEASE_WAIT = 0.5
+
+class RequestBody:
+    """wsgi.input limited to the request's Content-Length."""
+    
+    def __init__(self, stream, length: int):
+        self.stream = stream
+        self.remaining = length
+    
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        return data
+    
+    def readline(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.stream.readline(size)
+        self.remaining -= len(data)
+        return data
+    
+    def readlines(self, hint: int = -1):
+        return list(self)
+    
+    def __iter__(self):
+        return iter(self.readline, b'')
+    
+    def drain(self) -> bool:
+        """Discard what the application left unread; False if the client went away."""
+        while self.remaining > 0:
+            if not self.read(min(self.remaining, 65536)):
+                return False
+        return True
+
+class KeepAliveServerHandler(ServerHandler):
+    """HTTP/1.1 response writer that marks the connection for closing when it must."""
+    
+    http_version = '1.1'
+    
+    def cleanup_headers(self):
+        super().cleanup_headers()
+        # Without a length, only closing the connection marks the end of the body
+        if 'Content-Length' not in self.headers:
+            self.request_handler.close_connection = True
+        if self.request_handler.close_connection:
+            self.headers['Connection'] = 'close'
+    
+    def log_exception(self, exc_info):
+        # Errors while streaming a response body; Flask handles the rest itself
+        self.request_handler.server.logger.error("Error writing web response", exc_info=exc_info)
+
+class PooledRequestHandler(WSGIRequestHandler):
+    """Keep-alive request handler with separate request and idle timeouts.
+    
+    The standard library handler answers one request per connection. This
+    one serves requests on a connection until the client asks to close,
+    idles past the keep-alive timeout, or sends something whose end cannot
+    be found (a chunked body, or a response without a length). Bodies the
+    application did not read are drained so the next request line is found.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def handle(self):
+        self.requests_handled = 0
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            self.handle_one_request()
+    
+    def handle_one_request(self):
+        # Between requests a kept-alive connection may only idle briefly
+        idle = self.requests_handled > 0
+        self.connection.settimeout(self.server.keepalive_timeout if idle else self.server.request_timeout)
+        if idle:
+            self.server.idle_connections.add(self.connection)
+        try:
+            if idle and (self.server.stopping or self.server.saturated()):
+                raise ConnectionError
+            self.raw_requestline = self.rfile.readline(65537)
+        except (TimeoutError, ConnectionError, OSError):
+            self.close_connection = True
+            return
+        finally:
+            self.server.idle_connections.discard(self.connection)
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ''
+            self.send_error(414)
+            return
+        
+        self.connection.settimeout(self.server.request_timeout)
+        if not self.parse_request():
+            return
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            self.send_error(411, 'Chunked request bodies are not supported')
+            return
+        try:
+            length = max(0, int(self.headers.get('Content-Length') or 0))
+        except ValueError:
+            self.send_error(400, 'Bad Content-Length')
+            return
+        
+        # Hand the worker back when others are waiting for one, or on shutdown
+        if self.server.stopping or self.server.saturated():
+            self.close_connection = True
+        
+        body = RequestBody(self.rfile, length)
+        handler = KeepAliveServerHandler(body, self.wfile, self.get_stderr(), self.get_environ(),
+                                         multithread=True)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+        self.requests_handled += 1
+        
+        if not self.close_connection and not body.drain():
+            self.close_connection = True
+    
+    def log_message(self, format, *args):
+        self.server.logger.debug(f"{self.address_string()} {format % args}")
+
+class PooledWSGIServer(WSGIServer):
+    """Multi-threaded WSGI server with a fixed pool of worker threads.
+    
+    Connections are handled by at most `workers` threads; up to
+    `queue_limit` more wait for one, and beyond that new connections get an
+    immediate 503 instead of piling up threads. Keep-alive connections are
+    closed after an idle `keepalive_timeout`, or as soon as others are
+    queued (idle ones at once, busy ones after their current request), so a
+    few open browser tabs cannot hold every worker. Socket reads and writes
+    time out after `request_timeout`.
+    
+    Workers run at a lower CPU priority (WEB_WORKER_NICE, Linux only) so a
+    burst of dashboard requests yields to the render and display threads.
+    stop() stops accepting, lets in-flight requests finish within a grace
+    period, then closes the socket.
+    """
+    
+    def __init__(self, host: str, port: int, app, workers: int = 8, queue_limit: int = 32,
+                 request_timeout: float = 30.0, keepalive_timeout: float = 5.0, backlog: int = 64,
+                 worker_nice: int = 0):
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.request_queue_size = backlog  # listen() backlog
+        self.worker_nice = worker_nice
+        self.stopping = False
+        
+        self.slots = threading.BoundedSemaphore(workers + queue_limit)
+        self.cond = threading.Condition()
+        self.connections = 0  # Connections in a worker or waiting for one
+        self.stats = {'connections': 0, 'rejected': 0}
+        self.idle_connections = set()  # Kept-alive sockets waiting for their next request
+        self.idle_closing = set()  # Idle sockets shut down whose worker has not yet released its slot
+        
+        super().__init__((host, port), PooledRequestHandler)
+        self.set_app(app)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='web-worker',
+                                           initializer=self._init_worker)
+    
+    @classmethod
+    def from_env(cls, host: str, port: int, app) -> 'PooledWSGIServer':
+        """Build the server from WEB_* settings."""
+        return cls(
+            host, port, app,
+            workers=int(os.getenv('WEB_WORKERS', '8')),
+            queue_limit=int(os.getenv('WEB_QUEUE_LIMIT', '32')),
+            request_timeout=float(os.getenv('WEB_REQUEST_TIMEOUT', '30')),
+            keepalive_timeout=float(os.getenv('WEB_KEEPALIVE_TIMEOUT', '5')),
+            backlog=int(os.getenv('WEB_BACKLOG', '64')),
+            worker_nice=int(os.getenv('WEB_WORKER_NICE', '5'))
+        )
+    
+    def process_request(self, request, client_address):
+        """Queue a new connection for the worker pool, or refuse it when full."""
+        if self.stopping or not self._acquire_slot():
+            self.stats['rejected'] += 1
+            try:
+                request.sendall(OVERLOADED_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        
+        with self.cond:
+            self.connections += 1
+            self.stats['connections'] += 1
+        if self.saturated():
+            self._close_idle_connections()
+        self.executor.submit(self._process, request, client_address)
+    
+    def _acquire_slot(self) -> bool:
+        """Take a connection slot, reclaiming those held by idle keep-alive connections if needed."""
+        if self.slots.acquire(blocking=False):
+            return True
+        if self._close_idle_connections() or self.idle_closing:
+            return self.slots.acquire(timeout=IDLE_RELEASE_WAIT)
+        return self.slots.acquire(blocking=False)
+    
+    def _close_idle_connections(self) -> int:
+        """Shut down kept-alive connections waiting for a request; returns how many."""
+        closed = 0
+        for connection in list(self.idle_connections):
+            self.idle_closing.add(connection)
+            try:
+                connection.shutdown(socket.SHUT_RDWR)  # Wakes the worker waiting on it
+                closed += 1
+            except OSError:
+                self.idle_closing.discard(connection)
+        return closed
+    
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+            self.idle_closing.discard(request)
+            with self.cond:
+                self.connections -= 1
+                self.cond.notify_all()
+    
+    def handle_error(self, request, client_address):
+        self.logger.exception(f"Error serving web connection from {client_address[0]}")
+    
+    def _init_worker(self):
+        if self.worker_nice and hasattr(os, 'setpriority'):
+            try:
+                # On Linux the "process" priority of a thread id applies to that thread only
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.worker_nice)
+            except OSError as e:
+                self.logger.debug(f"Could not lower web worker priority: {e}")
+    
+    def saturated(self) -> bool:
+        """Whether connections are waiting for a worker."""
+        return self.connections > self.workers
+    
+    def stop(self, grace: float = 10.0) -> bool:
+        """Stop accepting, wait up to grace seconds for open requests; True if all finished."""
+        self.stopping = True
+        self.shutdown()  # Ends serve_forever()
+        self.server_close()
+        self._close_idle_connections()
+        with self.cond:
+            drained = self.cond.wait_for(lambda: self.connections == 0, timeout=grace)
+        self.executor.shutdown(wait=False)
+        if not drained:
+            self.logger.warning(f"{self.connections} web connection(s) still open after {grace:.0f}s")
+        return drained
+    
+    def get_status(self) -> Dict[str, Any]:
+        with self.cond:
+            connections = self.connections
+        return {
+            'server': 'pooled',
+            'workers': self.workers,
+            'busy_workers': min(connections, self.workers),
+            'queued': max(0, connections - self.workers),
+            'queue_limit': self.queue_limit,
+            'connections_total': self.stats['connections'],
+            'rejected_total': self.stats['rejected'],
+            'request_timeout': self.request_timeout,
+            'keepalive_timeout': self.keepalive_timeout
+        }
@@ -0,0 +1,68 @@
+"""
+Tests for the Server-Sent Events bus.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from event_bus import EventBus
+
+def drain(subscription):
+    """Ids of the events waiting in a subscription."""
+    ids = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return ids
+        ids.append(event.id)
+
+def test_subscribers_receive_published_events():
+    bus = EventBus(max_subscribers=2)
+    subscription = bus.subscribe()
+    event_id = bus.publish('verse', {'reference': 'John 3:16'})
+    
+    event = subscription.get(timeout=1)
+    assert event.id == event_id
+    assert event.encode() == b'id: 1\nevent: verse\ndata: {"reference":"John 3:16"}\n\n'
+
+def test_reconnect_replays_events_after_last_event_id():
+    bus = EventBus(max_subscribers=2)
+    ids = [bus.publish('tick', {'n': n}) for n in range(5)]
+    
+    subscription = bus.subscribe(last_event_id=str(ids[1]))
+    bus.publish('tick', {'n': 5})
+    
+    assert drain(subscription) == ids[2:] + [ids[-1] + 1]
+
+def test_replay_is_limited_to_the_history():
+    bus = EventBus(max_subscribers=2, history=3)
+    for n in range(10):
+        bus.publish('tick', {'n': n})
+    
+    assert drain(bus.subscribe(last_event_id='2')) == [8, 9, 10]
+    assert drain(bus.subscribe(last_event_id='not-a-number')) == []
+
+def test_subscribers_beyond_the_cap_are_refused():
+    bus = EventBus(max_subscribers=1)
+    first = bus.subscribe()
+    assert bus.subscribe() is None
+    
+    bus.unsubscribe(first)
+    assert bus.subscribe() is not None
+    assert bus.get_status()['refused'] == 1
+
+def test_slow_subscriber_is_closed_on_overflow():
+    bus = EventBus(max_subscribers=2, queue_size=2)
+    slow = bus.subscribe()
+    for n in range(3):
+        last_id = bus.publish('tick', {'n': n})
+    
+    assert slow.closed and slow.overflowed
+    assert drain(slow) == [1, 2]
+    bus.unsubscribe(slow)
+    assert bus.get_status()['overflowed'] == 1
+    
+    # The client catches up by reconnecting from the last event it saw
+    assert drain(bus.subscribe(last_event_id='2')) == [last_id]
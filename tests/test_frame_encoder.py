@@ -0,0 +1,82 @@
+"""
+Tests for in-memory frame encoding and the frame endpoint's ETags.
+"""
+
+import io
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from frame_encoder import FrameEncoder
+from web_interface.app import create_app
+
+def panel_frame(fill: int = 0) -> Image.Image:
+    image = Image.new('L', (1872, 1404), 255)
+    ImageDraw.Draw(image).rectangle((100, 100, 900, 700), fill=fill)
+    return image
+
+@pytest.fixture
+def encoder():
+    return FrameEncoder(cache_size=4)
+
+@pytest.fixture
+def client():
+    """Test client for the web interface showing a fixed panel frame."""
+    display_manager = MagicMock()
+    display_manager.get_latest_frame.return_value = None
+    display_manager.current_frame = panel_frame()
+    app = create_app(MagicMock(), MagicMock(), display_manager, MagicMock(web_server=None), None)
+    return app.test_client()
+
+def test_identical_pixels_share_an_etag(encoder):
+    first = encoder.encode(panel_frame())
+    redrawn = encoder.encode(panel_frame())
+    changed = encoder.encode(panel_frame(fill=128))
+    
+    assert first.etag == redrawn.etag
+    assert changed.etag != first.etag
+    assert first.etag.endswith('-full-png')
+
+def test_variants_get_their_own_etag(encoder):
+    image = panel_frame()
+    small = encoder.encode(image, 'png', 468)
+    
+    assert small.etag.endswith('-468-png')
+    assert Image.open(io.BytesIO(small.data)).size == (468, 351)
+    assert encoder.encode(image, 'png', 5000).etag == encoder.encode(image).etag
+    assert encoder.encode(image, 'png', 1).etag.endswith('-64-png')
+
+def test_repeat_encodes_hit_the_cache(encoder):
+    image = panel_frame()
+    first = encoder.encode(image)
+    
+    assert encoder.encode(image) is first
+    assert encoder.stats == {'encodes': 1, 'cache_hits': 1}
+
+def test_unknown_format_is_rejected(encoder):
+    with pytest.raises(ValueError):
+        encoder.negotiate('gif')
+    assert encoder.negotiate(None, 'text/html') == 'png'
+
+def test_frame_endpoint_answers_if_none_match_with_304(client):
+    response = client.get('/api/display/frame')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+    
+    revalidated = client.get('/api/display/frame', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    
+    resized = client.get('/api/display/frame?width=468', headers={'If-None-Match': etag})
+    assert resized.status_code == 200
+    assert resized.headers['ETag'] != etag
+
+def test_frame_endpoint_rejects_unknown_format(client):
+    assert client.get('/api/display/frame?format=gif').status_code == 400
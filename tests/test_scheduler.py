@@ -0,0 +1,109 @@
+"""
+Tests for the deadline-driven scheduler's dispatch policies.
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import clock
+from quiet_hours import QuietHours
+from scheduler import AdvancedScheduler, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_LOW
+
+START = datetime(2024, 1, 1, 22, 59, 30)
+
+@pytest.fixture
+def sim_clock():
+    simulated = clock.SimulatedClock(START)
+    previous = clock.use(simulated)
+    yield simulated
+    clock.use(previous)
+
+@pytest.fixture
+def scheduler(sim_clock):
+    """A scheduler whose dispatcher and workers are driven by the test."""
+    scheduler = AdvancedScheduler(workers=1)
+    scheduler.running = True
+    return scheduler
+
+def dispatch(scheduler, name: str, late: float = 0.0):
+    """Hand a job's run to the workers as if it came due late seconds ago."""
+    job = scheduler.jobs[name]
+    with scheduler._lock:
+        scheduler._dispatch(job, time.monotonic() - late, job.next_target)
+
+def run_ready(scheduler):
+    """Run queued work on the calling thread until the queue is empty."""
+    scheduler._sequence += 1
+    scheduler._ready.put((PRIORITY_LOW + 1, float('inf'), scheduler._sequence, None, None))
+    scheduler._run_worker()
+
+def test_due_jobs_run_by_priority(scheduler):
+    order = []
+    for name, priority in (('low', PRIORITY_LOW), ('critical', PRIORITY_CRITICAL), ('normal', PRIORITY_NORMAL)):
+        scheduler.schedule_custom(name, 'hourly', lambda name=name: order.append(name), priority=priority)
+        dispatch(scheduler, name)
+    
+    run_ready(scheduler)
+    
+    assert order == ['critical', 'normal', 'low']
+
+@pytest.mark.parametrize('overlap, runs, skipped, cancelled', [
+    ('skip', 1, 1, 0),
+    ('queue', 2, 0, 0),
+    ('cancel', 2, 0, 1),
+])
+def test_overlap_policies(scheduler, overlap, runs, skipped, cancelled):
+    cancel_seen = []
+    
+    def slow_job(cancel_event=None):
+        if job.run_count == 1:
+            dispatch(scheduler, 'slow')  # Comes due again while still running
+            cancel_seen.append(cancel_event is not None and cancel_event.is_set())
+    
+    scheduler.schedule_custom('slow', 'hourly', slow_job, overlap=overlap)
+    job = scheduler.jobs['slow']
+    dispatch(scheduler, 'slow')
+    run_ready(scheduler)
+    
+    assert job.run_count == runs
+    assert job.skipped_runs == skipped
+    assert job.cancelled_runs == cancelled
+    assert cancel_seen == [overlap == 'cancel']
+    assert not job.in_flight and job.pending is None
+
+def test_runs_past_max_delay_are_missed(scheduler):
+    runs = []
+    scheduler.schedule_custom('frame', 'hourly', lambda: runs.append(1), max_delay=5)
+    job = scheduler.jobs['frame']
+    
+    dispatch(scheduler, 'frame', late=10)
+    run_ready(scheduler)
+    assert runs == [] and job.missed_deadlines == 1
+    
+    dispatch(scheduler, 'frame', late=1)
+    run_ready(scheduler)
+    assert runs == [1] and job.missed_deadlines == 1
+
+def test_quiet_hours_policies(scheduler, sim_clock):
+    scheduler.schedule_minute_job('verse', lambda target: None, quiet='skip')
+    scheduler.schedule_custom('poll', 'every_5_minutes', lambda: None, quiet='backoff')
+    scheduler.schedule_daily('backup', (START + timedelta(minutes=30)).time(), lambda: None)
+    
+    scheduler.set_quiet_hours(QuietHours('23:00', '06:00', enabled=True), backoff=3600)
+    
+    jobs = scheduler.jobs
+    next_morning = datetime(2024, 1, 2, 6, 0)
+    assert jobs['verse'].next_target == next_morning
+    assert jobs['poll'].next_target == START + timedelta(hours=1)
+    assert jobs['backup'].next_target == datetime(2024, 1, 1, 23, 29)
+    
+    # Outside quiet hours the minute job is back to every minute
+    sim_clock.set(next_morning)
+    scheduler.rearm('verse')
+    assert jobs['verse'].next_target == next_morning + timedelta(minutes=1)
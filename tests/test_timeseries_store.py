@@ -0,0 +1,91 @@
+"""
+Tests for the round-robin time-series store.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from timeseries_store import TimeSeriesStore, RoundRobinArchive
+
+DAY = datetime(2024, 1, 1).timestamp()
+DAY_END = DAY + 86399
+
+def open_store(directory) -> TimeSeriesStore:
+    store = TimeSeriesStore(str(directory))
+    store.enabled = True
+    return store
+
+def record_minutes(store, minutes, series: str = 'cpu_percent'):
+    """One sample per minute, valued by its minute of the day."""
+    for minute in minutes:
+        store.record(series, float(minute), DAY + minute * 60)
+
+def stored(directory, archive_name: str, series: str = 'cpu_percent'):
+    """Points as a freshly started store reads them from disk."""
+    return open_store(directory).query(series, DAY, DAY_END, archive_name)[1]
+
+def test_samples_roll_up_into_every_archive(tmp_path):
+    store = open_store(tmp_path)
+    record_minutes(store, range(30))
+    store.flush()
+    
+    assert [point['avg'] for point in stored(tmp_path, '1m')] == [float(minute) for minute in range(30)]
+    assert [(point['count'], point['avg']) for point in stored(tmp_path, '15m')] == [(15, 7.0), (15, 22.0)]
+    [day] = stored(tmp_path, '1d')
+    assert (day['count'], day['min'], day['max'], day['avg']) == (30, 0.0, 29.0, 14.5)
+
+def test_query_includes_the_bucket_being_filled(tmp_path):
+    store = open_store(tmp_path)
+    record_minutes(store, range(3))
+    
+    _, points = store.query('cpu_percent', DAY, DAY_END, '1d')
+    assert [point['count'] for point in points] == [3]
+    assert stored(tmp_path, '1d') == []
+
+def test_daily_rollup_resumes_after_restart(tmp_path):
+    before = open_store(tmp_path)
+    record_minutes(before, range(3))
+    before.flush()
+    
+    after = open_store(tmp_path)
+    record_minutes(after, range(10, 12))
+    after.flush()
+    
+    [day] = stored(tmp_path, '1d')
+    assert (day['count'], day['min'], day['max']) == (5, 0.0, 11.0)
+    assert len(stored(tmp_path, '1m')) == 5
+
+def test_failed_flush_is_retried(tmp_path, monkeypatch):
+    store = open_store(tmp_path)
+    record_minutes(store, range(5))
+    
+    write = RoundRobinArchive.write
+    
+    def minute_archive_fails(archive, bucket):
+        if archive.step == 60:
+            raise OSError('read-only file system')
+        write(archive, bucket)
+    
+    monkeypatch.setattr(RoundRobinArchive, 'write', minute_archive_fails)
+    store.flush()
+    
+    # The other archives were still written; the minute rows wait for the next flush
+    assert [point['count'] for point in stored(tmp_path, '1d')] == [5]
+    assert stored(tmp_path, '1m') == []
+    assert len(store.pending) == 4
+    assert all(bucket.dirty for _, bucket in store.pending)
+    
+    monkeypatch.setattr(RoundRobinArchive, 'write', write)
+    store.flush()
+    
+    assert store.pending == []
+    assert len(stored(tmp_path, '1m')) == 5
+
+@pytest.mark.parametrize('span, expected', [(3600, '1m'), (7 * 86400, '15m'), (90 * 86400, '1d')])
+def test_archive_for_span(tmp_path, span, expected):
+    assert open_store(tmp_path).archive_for(span) == expected
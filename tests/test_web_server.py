@@ -0,0 +1,190 @@
+"""
+Tests for the pooled keep-alive WSGI server.
+"""
+
+import sys
+import time
+import socket
+import threading
+import http.client
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from web_server import PooledWSGIServer
+
+def hello_app(environ, start_response):
+    body = environ['PATH_INFO'].encode()
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('Content-Length', str(len(body)))])
+    return [body]
+
+class BlockingApp:
+    """Holds requests under /wait until released, counting how many are held."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+    
+    def __call__(self, environ, start_response):
+        if environ['PATH_INFO'].startswith('/wait'):
+            with self.lock:
+                self.active += 1
+            self.release.wait(10)
+            with self.lock:
+                self.active -= 1
+        return hello_app(environ, start_response)
+    
+    def wait_active(self, count: int, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.active >= count:
+                return True
+            time.sleep(0.01)
+        return False
+
+@pytest.fixture
+def serve():
+    servers = []
+    
+    def start(app, **options):
+        options.setdefault('worker_nice', 0)
+        server = PooledWSGIServer('127.0.0.1', 0, app, **options)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        if not server.stopping:
+            server.stop(grace=1)
+
+def connect(server) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+
+def get(server, path: str = '/'):
+    """One request on a fresh connection; returns (status, body)."""
+    conn = connect(server)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_keepalive_reuses_connection(serve):
+    server = serve(hello_app)
+    conn = connect(server)
+    for path in ('/one', '/two', '/three'):
+        conn.request('GET', path)
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.read() == path.encode()
+        assert response.getheader('Connection') is None
+    conn.close()
+    
+    assert server.stats['connections'] == 1
+
+def test_close_requested_by_client(serve):
+    server = serve(hello_app)
+    conn = connect(server)
+    conn.request('GET', '/', headers={'Connection': 'close'})
+    response = conn.getresponse()
+    
+    assert response.getheader('Connection') == 'close'
+    assert response.read() == b'/'
+
+def test_unread_body_is_drained(serve):
+    server = serve(hello_app)  # Never reads wsgi.input
+    conn = connect(server)
+    conn.request('POST', '/upload', body=b'x' * 100000)
+    response = conn.getresponse()
+    assert response.read() == b'/upload'
+    
+    conn.request('GET', '/next')
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.read() == b'/next'
+    assert server.stats['connections'] == 1
+
+def test_chunked_body_rejected(serve):
+    server = serve(hello_app)
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(b'POST / HTTP/1.1\r\nHost: test\r\nTransfer-Encoding: chunked\r\n\r\n'
+                     b'3\r\nabc\r\n0\r\n\r\n')
+        response = sock.makefile('rb').read()
+    
+    assert response.startswith(b'HTTP/1.1 411')
+
+def test_overload_gets_503(serve):
+    app = BlockingApp()
+    server = serve(app, workers=1, queue_limit=0)
+    first = threading.Thread(target=get, args=(server, '/wait'))
+    first.start()
+    assert app.wait_active(1)
+    
+    status, _ = get(server)
+    app.release.set()
+    first.join()
+    
+    assert status == 503
+    assert server.stats['rejected'] == 1
+
+def test_idle_keepalive_connections_yield_to_new_ones(serve):
+    app = BlockingApp()
+    server = serve(app, workers=2, queue_limit=1, keepalive_timeout=30)
+    idle = connect(server)
+    idle.request('GET', '/idle')
+    idle.getresponse().read()
+    assert wait_for(lambda: server.idle_connections)
+    
+    # As many new connections as there are worker and queue slots
+    results = []
+    clients = [threading.Thread(target=lambda: results.append(get(server, '/wait'))) for _ in range(3)]
+    for client in clients:
+        client.start()
+    assert app.wait_active(2)
+    app.release.set()
+    for client in clients:
+        client.join()
+    
+    assert [status for status, _ in results] == [200, 200, 200]
+    assert server.stats['rejected'] == 0
+
+def test_stop_waits_for_inflight_requests(serve):
+    app = BlockingApp()
+    server = serve(app)
+    results = []
+    client = threading.Thread(target=lambda: results.append(get(server, '/wait')))
+    client.start()
+    assert app.wait_active(1)
+    
+    threading.Timer(0.2, app.release.set).start()
+    assert server.stop(grace=5)
+    client.join()
+    
+    assert results == [(200, b'/wait')]
+
+def test_stop_closes_idle_keepalive_connections(serve):
+    server = serve(hello_app, keepalive_timeout=30)
+    conn = connect(server)
+    conn.request('GET', '/')
+    conn.getresponse().read()
+    assert wait_for(lambda: server.idle_connections)
+    
+    start = time.monotonic()
+    assert server.stop(grace=5)
+    assert time.monotonic() - start < 2
+    
+    with pytest.raises(OSError):
+        socket.create_connection(server.server_address, timeout=1).recv(1)
@@ -19,6 +19,13 @@ import threading
 import queue
 import contextlib
 
+# Service modules are imported by name, as main.py does, so they share its singletons
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from current_state import current_state
+from event_bus import event_bus
+from performance_monitor import performance_monitor
+from stall_watchdog import stall_watchdog
+
 # Suppress ALSA error messages - minimal approach
 os.environ['ALSA_QUIET'] = '1'
 os.environ['JACK_NO_START_SERVER'] = '1'
@@ -28,6 +35,18 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Visual feedback state -> state pushed to the dashboard (same names as BibleClockVoiceControl)
+VOICE_STATES = {
+    'listening': 'idle',  # Waiting for the wake word
+    'ready': 'idle',
+    'wake_detected': 'listening',
+    'recording': 'listening',
+    'processing': 'processing',
+    'thinking': 'processing',
+    'speaking': 'speaking',
+    'shutdown': 'stopped'
+}
+
 class VoiceAssistant:
     """Professional voice assistant with wake word detection, VAD, and streaming responses."""
     
@@ -48,6 +67,7 @@ class VoiceAssistant:
         # API configuration
         self.openai_api_key = os.getenv('OPENAI_API_KEY', '').replace('\n', '').replace('\r', '').replace(' ', '')
         self.chatgpt_model = os.getenv('CHATGPT_MODEL', 'gpt-3.5-turbo')
+        self.openai_timeout = 60.0  # Seconds per OpenAI request, long enough for TTS streaming
         
         # TTS configuration from environment variables
         self.tts_engine = os.getenv('TTS_ENGINE', 'openai')
@@ -90,6 +110,7 @@ class VoiceAssistant:
         
         # Visual feedback
         self.visual_feedback = visual_feedback_callback
+        self.voice_state = 'stopped'
         
         # TTS queue for preventing overlapping speech
         self.tts_queue = queue.Queue()
@@ -118,7 +139,12 @@ class VoiceAssistant:
             self._initialize_components()
     
     def _update_visual_state(self, state, message=None):
-        """Update visual feedback if callback is provided."""
+        """Update visual feedback if callback is provided, and push the state to the dashboard."""
+        voice_state = VOICE_STATES.get(state)
+        if voice_state and voice_state != self.voice_state:
+            self.voice_state = voice_state
+            event_bus.publish('voice', {'state': voice_state})
+        
         if self.visual_feedback:
             try:
                 self.visual_feedback(state, message)
@@ -235,7 +261,7 @@ class VoiceAssistant:
             from openai import OpenAI
             self.openai_client = OpenAI(
             api_key=self.openai_api_key,
-            timeout=60.0  # 60 second timeout for TTS streaming
+            timeout=self.openai_timeout
         )
             self.api_version = "modern"
             logger.info("Using modern OpenAI API (1.0+)")
@@ -447,7 +473,8 @@ class VoiceAssistant:
                         audio = self.recognizer.record(source)
                     
                     try:
-                        text = self.recognizer.recognize_google(audio).lower()
+                        with performance_monitor.time_operation('voice_recognize'):
+                            text = self.recognizer.recognize_google(audio).lower()
                         logger.info(f"Heard: '{text}'")
                         
                         # Check for wake word variations
@@ -519,31 +546,32 @@ class VoiceAssistant:
             logger.info("Recording with VAD - speak now...")
             recording_started = False
             
-            while total_chunks < max_chunks:
-                # Read audio chunk
-                audio_data = stream.read(chunk_size, exception_on_overflow=False)
-                audio_chunk = np.frombuffer(audio_data, dtype=np.int16)
-                
-                # Detect if this chunk contains speech
-                is_silent = self._detect_silence(audio_chunk, silence_threshold)
-                
-                if not is_silent:
-                    # Speech detected
-                    recording_started = True
-                    silence_chunks = 0
-                    audio_chunks.append(audio_data)
-                elif recording_started:
-                    # Silence after speech started
-                    silence_chunks += 1
-                    audio_chunks.append(audio_data)
+            with performance_monitor.time_operation('voice_listen'):
+                while total_chunks < max_chunks:
+                    # Read audio chunk
+                    audio_data = stream.read(chunk_size, exception_on_overflow=False)
+                    audio_chunk = np.frombuffer(audio_data, dtype=np.int16)
                     
-                    # Check if we've had enough silence to end recording
-                    if silence_chunks >= silence_chunks_needed:
-                        logger.info("Silence detected, ending recording")
-                        break
+                    # Detect if this chunk contains speech
+                    is_silent = self._detect_silence(audio_chunk, silence_threshold)
+                    
+                    if not is_silent:
+                        # Speech detected
+                        recording_started = True
+                        silence_chunks = 0
+                        audio_chunks.append(audio_data)
+                    elif recording_started:
+                        # Silence after speech started
+                        silence_chunks += 1
+                        audio_chunks.append(audio_data)
+                        
+                        # Check if we've had enough silence to end recording
+                        if silence_chunks >= silence_chunks_needed:
+                            logger.info("Silence detected, ending recording")
+                            break
+                    
+                    total_chunks += 1
                 
-                total_chunks += 1
-            
             stream.stop_stream()
             stream.close()
             
@@ -584,7 +612,8 @@ class VoiceAssistant:
             with sr.AudioFile(temp_path) as source:
                 audio = self.recognizer.record(source)
             
-            command = self.recognizer.recognize_google(audio).lower()
+            with performance_monitor.time_operation('voice_recognize'):
+                command = self.recognizer.recognize_google(audio).lower()
             print(f"✅ Command: '{command}'")
             
             # Record command end time
@@ -632,7 +661,7 @@ class VoiceAssistant:
         """Start background thread to detect wake word interrupts during TTS."""
         if self.porcupine and not self.interrupt_detection_active:
             self.interrupt_detection_active = True
-            self.interrupt_thread = threading.Thread(target=self._interrupt_detector, daemon=True)
+            self.interrupt_thread = threading.Thread(target=self._interrupt_detector, name='voice-interrupt', daemon=True)
             self.interrupt_thread.start()
             logger.info("Interrupt detection started")
     
@@ -709,7 +738,7 @@ class VoiceAssistant:
     def _start_tts_worker(self):
         """Start the TTS worker thread to prevent overlapping speech."""
         self.tts_thread_running = True
-        self.tts_thread = threading.Thread(target=self._tts_worker, daemon=True)
+        self.tts_thread = threading.Thread(target=self._tts_worker, name='voice-tts', daemon=True)
         self.tts_thread.start()
         logger.info("TTS worker thread started")
     
@@ -789,7 +818,8 @@ class VoiceAssistant:
                 # self._start_interrupt_detection()
                 
                 # Speak the text (this will block until complete)
-                self._speak_with_amy_direct(tts_text)
+                with performance_monitor.time_operation('voice_speak'):
+                    self._speak_with_amy_direct(tts_text)
                 
                 # self._stop_interrupt_detection()
                 
@@ -969,7 +999,7 @@ class VoiceAssistant:
             # Get current verse context
             current_verse = ""
             if self.verse_manager:
-                verse_data = self.verse_manager.get_current_verse()
+                verse_data = current_state.verse_data(self.verse_manager)
                 if verse_data:
                     current_verse = f"Current verse displayed: {verse_data.get('reference', '')} - {verse_data.get('text', '')}"
             
@@ -991,52 +1021,75 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
             # Record GPT start time for metrics
             self.metrics['gpt_start_time'] = time_module.time()
             
+            performance_monitor.increment('chatgpt_requests')
+            
             # Use streaming for real-time response
             if self.api_version == "modern":
-                response_stream = self.openai_client.chat.completions.create(
-                    model=self.chatgpt_model,
-                    messages=[
-                        {"role": "system", "content": full_system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    max_tokens=self.max_tokens,
-                    temperature=0.7,
-                    stream=True  # Enable streaming for real-time response
-                )
-                
                 # Collect response with early TTS optimization
                 full_response = ""
                 word_count = 0
-                early_tts_sent = False
+                early_response = None
                 
-                for chunk in response_stream:
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_response += content
-                        word_count += len(content.split())
-                        
-                        # Record first response time
-                        if self.metrics['gpt_first_response_time'] is None:
-                            self.metrics['gpt_first_response_time'] = time_module.time()
-                        
-                        # Early TTS optimization: if we have a complete sentence (~15+ words)
-                        # and it ends with punctuation, start TTS immediately
-                        if (not early_tts_sent and word_count >= 15 and 
-                            any(punct in content for punct in ['.', '!', '?']) and
-                            len(full_response.strip()) > 30):
+                # The timeout applies per read, so a slow stream is caught by the watchdog
+                with performance_monitor.time_operation('voice_chatgpt'), \
+                        stall_watchdog.watch('chatgpt', self.openai_timeout + 30):
+                    request = dict(
+                        model=self.chatgpt_model,
+                        messages=[
+                            {"role": "system", "content": full_system_prompt},
+                            {"role": "user", "content": question}
+                        ],
+                        max_tokens=self.max_tokens,
+                        temperature=0.7,
+                        stream=True  # Enable streaming for real-time response
+                    )
+                    try:
+                        # Last chunk carries the token usage
+                        response_stream = self.openai_client.chat.completions.create(
+                            stream_options={"include_usage": True}, **request)
+                    except TypeError:
+                        # openai < 1.26 has no stream_options; stream without usage numbers
+                        response_stream = self.openai_client.chat.completions.create(**request)
+                    
+                    for chunk in response_stream:
+                        self._count_tokens(getattr(chunk, 'usage', None))
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            content = chunk.choices[0].delta.content
+                            full_response += content
+                            word_count += len(content.split())
+                            
+                            # Record first response time
+                            if self.metrics['gpt_first_response_time'] is None:
+                                self.metrics['gpt_first_response_time'] = time_module.time()
                             
-                            # Check if this looks like a complete thought
-                            trimmed_response = full_response.strip()
-                            if any(trimmed_response.endswith(punct) for punct in ['.', '!', '?']):
-                                logger.info("🚀 Early TTS trigger - sending partial response")
-                                self._play_openai_tts_stream(trimmed_response)
-                                early_tts_sent = True
-                                return trimmed_response
+                            # Early TTS optimization: if we have a complete sentence (~15+ words)
+                            # and it ends with punctuation, start TTS immediately
+                            if (word_count >= 15 and 
+                                any(punct in content for punct in ['.', '!', '?']) and
+                                len(full_response.strip()) > 30):
+                                
+                                # Check if this looks like a complete thought
+                                trimmed_response = full_response.strip()
+                                if any(trimmed_response.endswith(punct) for punct in ['.', '!', '?']):
+                                    logger.info("🚀 Early TTS trigger - sending partial response")
+                                    early_response = trimmed_response
+                                    break
+                
+                if early_response:
+                    with performance_monitor.time_operation('voice_speak'):
+                        self._play_openai_tts_stream(early_response)
+                    # The rest of the stream arrived while speaking; only its usage is kept
+                    with contextlib.suppress(Exception), \
+                            stall_watchdog.watch('chatgpt', self.openai_timeout + 30):
+                        for chunk in response_stream:
+                            self._count_tokens(getattr(chunk, 'usage', None))
+                    return early_response
                 
                 # Use OpenAI TTS for the complete response if early TTS wasn't triggered
-                if not early_tts_sent and full_response.strip():
+                if full_response.strip():
                     tts_start_time = time_module.time()
-                    self._play_openai_tts_stream(full_response.strip())
+                    with performance_monitor.time_operation('voice_speak'):
+                        self._play_openai_tts_stream(full_response.strip())
                     self.timing_metrics['tts_generation_time'] = time_module.time() - tts_start_time
                 
                 # Record conversation with metrics
@@ -1048,15 +1101,18 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
                 
             else:
                 # Legacy API fallback (non-streaming)
-                response = self.openai_client.ChatCompletion.create(
-                    model=self.chatgpt_model,
-                    messages=[
-                        {"role": "system", "content": full_system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    max_tokens=self.max_tokens,
-                    temperature=0.7
-                )
+                with performance_monitor.time_operation('voice_chatgpt'), \
+                        stall_watchdog.watch('chatgpt', self.openai_timeout + 30):
+                    response = self.openai_client.ChatCompletion.create(
+                        model=self.chatgpt_model,
+                        messages=[
+                            {"role": "system", "content": full_system_prompt},
+                            {"role": "user", "content": question}
+                        ],
+                        max_tokens=self.max_tokens,
+                        temperature=0.7
+                    )
+                self._count_tokens(response.usage)
                 answer = response.choices[0].message.content.strip()
                 
                 # Record first response time for legacy API
@@ -1066,7 +1122,8 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
                 # Use OpenAI TTS for legacy API response too
                 if answer.strip():
                     tts_start_time = time_module.time()
-                    self._play_openai_tts_stream(answer.strip())
+                    with performance_monitor.time_operation('voice_speak'):
+                        self._play_openai_tts_stream(answer.strip())
                     self.timing_metrics['tts_generation_time'] = time_module.time() - tts_start_time
                 
                 # Record conversation with metrics for legacy API
@@ -1077,13 +1134,25 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
                 return answer
             
         except Exception as e:
+            performance_monitor.increment('chatgpt_failures')
             logger.error(f"ChatGPT query failed: {e}")
             error_msg = f"I'm sorry, I encountered an error processing your question: {str(e)}"
             self._update_visual_state("error", error_msg)
             return error_msg
     
+    def _count_tokens(self, usage):
+        """Add a response's token usage, if it reports one, to the ChatGPT counters."""
+        if usage:
+            performance_monitor.increment('chatgpt_prompt_tokens', usage.prompt_tokens)
+            performance_monitor.increment('chatgpt_completion_tokens', usage.completion_tokens)
+    
     def process_voice_command(self, command_text):
         """Process the voice command."""
+        performance_monitor.increment('voice_commands')
+        with performance_monitor.time_operation('voice_command'):
+            self._process_voice_command(command_text)
+    
+    def _process_voice_command(self, command_text):
         try:
             self._update_visual_state("processing", f"Processing: {command_text}")
             
@@ -1094,7 +1163,7 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
             elif 'next verse' in command_text or 'next' in command_text:
                 if self.verse_manager:
                     self.verse_manager.next_verse()
-                    current_verse = self.verse_manager.get_current_verse()
+                    current_verse = current_state.verse_data(self.verse_manager)
                     response = f"Next verse: {current_verse.get('reference', '')} - {current_verse.get('text', '')}"
                 else:
                     response = "Verse manager not available."
@@ -1102,14 +1171,14 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
             elif 'previous verse' in command_text or 'previous' in command_text:
                 if self.verse_manager:
                     self.verse_manager.previous_verse()
-                    current_verse = self.verse_manager.get_current_verse()
+                    current_verse = current_state.verse_data(self.verse_manager)
                     response = f"Previous verse: {current_verse.get('reference', '')} - {current_verse.get('text', '')}"
                 else:
                     response = "Verse manager not available."
                 
             elif any(phrase in command_text for phrase in ['current verse', 'read verse', 'this verse']):
                 if self.verse_manager:
-                    current_verse = self.verse_manager.get_current_verse()
+                    current_verse = current_state.verse_data(self.verse_manager)
                     if current_verse:
                         response = f"{current_verse.get('reference', '')}: {current_verse.get('text', '')}"
                     else:
@@ -1120,7 +1189,7 @@ For follow-up questions like "continue", "tell me more", or "explain further", r
             elif any(phrase in command_text for phrase in ['explain this verse', 'explain verse', 'what does this mean', 'explain this']):
                 # Send current verse explanation to ChatGPT
                 if self.verse_manager:
-                    current_verse = self.verse_manager.get_current_verse()
+                    current_verse = current_state.verse_data(self.verse_manager)
                     if current_verse:
                         explanation_query = f"Explain this Bible verse: {current_verse.get('reference', '')} - {current_verse.get('text', '')}"
                         response = self.query_chatgpt(explanation_query)